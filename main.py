@@ -6,8 +6,10 @@ A tool for generating podcast episodes using LLMs and text-to-speech conversion.
 """
 
 import argparse
+import json
 import os
 import sys
+from dataclasses import asdict
 from pathlib import Path
 from typing import Optional
 
@@ -16,13 +18,20 @@ sys.path.append(str(Path(__file__).parent / "src"))
 
 from langchain_core.messages import HumanMessage
 from llm.graph import graph
+from llm.blob_store import get_blob_store
+from llm.translation import language_name
 from audio_conversion.convert_audio import convert_all_subtopics
-from audio_conversion.combine_audio import combine_all_audio_in_directory
+from audio_conversion.combine_audio import combine_all_audio_in_directory, get_export_targets, list_audio_files, EXPORT_PRESETS
+from audio_conversion.tts_backends import available_backends
+from audio_conversion.text_preprocessing import TextPreprocessor, DEFAULT_PREPROCESSOR, RULE_NAMES
+from pipeline.hedging import HedgePolicy
 
 
-def validate_environment():
+def validate_environment(tts_backends: tuple = ("elevenlabs",)):
     """Check if required environment variables are set."""
-    required_vars = ["ELEVENLABS_API_KEY", "ANTHROPIC_API_KEY"]
+    required_vars = ["ANTHROPIC_API_KEY"]
+    if "elevenlabs" in tts_backends:
+        required_vars.insert(0, "ELEVENLABS_API_KEY")
     missing_vars = []
     
     for var in required_vars:
@@ -60,13 +69,21 @@ def check_output_directories_empty() -> None:
     print("✅ Output directories are empty")
 
 
-def generate_text_content(topic: str, user_message: str, reference_path: Optional[str] = None) -> bool:
+def generate_text_content(
+    topic: str,
+    user_message: str,
+    reference_path: Optional[str] = None,
+    speakers: Optional[list[str]] = None,
+    hedge: Optional[HedgePolicy] = None,
+    min_words: int = 2500,
+    max_words: int = 4000,
+    queue_db: Optional[str] = None) -> bool:
     """Generate podcast text content from a topic and user message."""
     try:
         print(f"🎙️ Generating podcast text content for topic: {topic}")
         
-        # Validate environment first (check API keys)
-        if not validate_environment():
+        # Validate environment first (check API keys); distributed runs need them on the workers instead
+        if not queue_db and not validate_environment():
             print("❌ Environment validation failed")
             return False
         
@@ -86,11 +103,33 @@ def generate_text_content(topic: str, user_message: str, reference_path: Optiona
             except Exception as e:
                 print(f"⚠️ Warning: Could not load reference document: {e}")
         
+        if queue_db:
+            # Hand the whole episode to a worker; the graph itself is sequential per subtopic
+            from pipeline.distributed import distribute_generate
+            from pipeline.task_queue import TaskQueue
+            
+            print(f"📮 Submitting generation to the task queue: {queue_db}")
+            result = distribute_generate(TaskQueue(queue_db), {
+                'topic': topic,
+                'message': user_message,
+                'reference': reference_content,
+                'speakers': speakers or [],
+                'text_dir': "data/text_output",
+                'hedge': asdict(hedge) if hedge else None,
+                'word_budget': {'min_words': min_words, 'max_words': max_words}
+            })
+            print(f"✅ Generated {result['subtopics']} subtopics")
+            print(f"📁 Text files saved to: data/text_output/")
+            return True
+        
         # Initialize the graph state
         initial_state = {
             'messages': messages,
             'topic': topic,
-            'reference_document': reference_content
+            'reference_document_ref': get_blob_store().put(reference_content) if reference_content else '',
+            'speakers': speakers or [],
+            'hedge_policy': asdict(hedge) if hedge else {},
+            'word_budget': {'min_words': min_words, 'max_words': max_words}
         }
         
         # Run the graph to generate content
@@ -106,13 +145,23 @@ def generate_text_content(topic: str, user_message: str, reference_path: Optiona
         return False
 
 
-def convert_audio_content() -> bool:
+def convert_audio_content(
+    tts_backend: str = "elevenlabs",
+    tts_fallback: Optional[str] = None,
+    voices: Optional[dict[str, str]] = None,
+    turn_gap_ms: int = 350,
+    hls: bool = False,
+    segment_seconds: float = 6.0,
+    preprocessor: Optional[TextPreprocessor] = DEFAULT_PREPROCESSOR,
+    tts_workers: int = 4,
+    hedge: Optional[HedgePolicy] = None,
+    queue_db: Optional[str] = None) -> bool:
     """Convert generated text content to audio files."""
     try:
-        print("🎵 Converting text content to audio...")
+        print(f"🎵 Converting text content to audio (TTS backend: {tts_backend})...")
         
-        # Validate environment first (check API keys)
-        if not validate_environment():
+        # Validate environment first (check API keys); distributed runs need them on the workers instead
+        if not queue_db and not validate_environment((tts_backend, tts_fallback)):
             print("❌ Environment validation failed")
             return False
         
@@ -123,10 +172,34 @@ def convert_audio_content() -> bool:
             print("Please run 'generate' command first to create text content.")
             return False
         
+        if queue_db:
+            # One task per subtopic; any number of 'worker' processes synthesize them
+            from pipeline.distributed import distribute_convert
+            from pipeline.task_queue import TaskQueue
+            
+            if hls:
+                print("⚠️ --hls is not available with --distributed; segments finish out of order on the workers")
+            tasks = distribute_convert(TaskQueue(queue_db), tts_backend, tts_fallback, voices, turn_gap_ms,
+                                       tts_workers, preprocessor, hedge=hedge)
+            print(f"✅ {len(tasks)} audio files saved to: data/audio_output/")
+            return True
+        
         # Convert text to speech for each subtopic
-        convert_all_subtopics()
+        convert_all_subtopics(
+            backend=tts_backend,
+            fallback_backend=tts_fallback,
+            voices=voices,
+            turn_gap_ms=turn_gap_ms,
+            hls_dir="data/audio_output/hls" if hls else None,
+            segment_seconds=segment_seconds,
+            preprocessor=preprocessor,
+            max_workers=tts_workers,
+            hedge=hedge
+        )
         
         print(f"✅ Audio files saved to: data/audio_output/")
+        if hls:
+            print("📡 HLS stream saved to: data/audio_output/hls/episode.m3u8")
         return True
         
     except Exception as e:
@@ -134,7 +207,48 @@ def convert_audio_content() -> bool:
         return False
 
 
-def combine_audio_files() -> bool:
+def qa_audio_content(
+    fix: bool = True,
+    tts_backend: str = "elevenlabs",
+    tts_fallback: Optional[str] = None,
+    voices: Optional[dict[str, str]] = None,
+    turn_gap_ms: int = 350,
+    preprocessor: Optional[TextPreprocessor] = DEFAULT_PREPROCESSOR,
+    hedge: Optional[HedgePolicy] = None) -> bool:
+    """Check converted segments for silence, clipping, loudness and length problems and re-synthesize bad ones."""
+    try:
+        from audio_conversion.audio_qa import qa_episode
+        from audio_conversion.tts_backends import get_backend
+        
+        print("🔍 Checking audio segments...")
+        
+        audio_dir = Path("data/audio_output")
+        if not audio_dir.exists() or not list(audio_dir.glob("subtopic_*.mp3")):
+            print("❌ No audio files found in data/audio_output/")
+            print("Please run 'convert' command first to create audio files.")
+            return False
+        
+        backend = None
+        if fix:
+            if not validate_environment((tts_backend, tts_fallback)):
+                print("❌ Environment validation failed")
+                return False
+            backend = get_backend(tts_backend, fallback=tts_fallback, hedge=hedge)
+        
+        reports = qa_episode(backend=backend, voices=voices, turn_gap_ms=turn_gap_ms, preprocessor=preprocessor)
+        flagged = [r.file for r in reports if not r.ok]
+        if flagged:
+            print(f"⚠️ Segments still flagged: {', '.join(flagged)}")
+        else:
+            print("✅ All segments passed QA")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error checking audio: {e}")
+        return False
+
+
+def combine_audio_files(export_formats: Optional[list[str]] = None, tags: Optional[dict[str, str]] = None) -> bool:
     """Combine all audio files into a single episode."""
     try:
         print("🎵 Combining audio files...")
@@ -146,13 +260,24 @@ def combine_audio_files() -> bool:
             print("Please run 'convert' command first to create audio files.")
             return False
         
+        # Default the episode title to the topic from summary.json
+        metadata = dict(tags or {})
+        summary_path = Path("data/text_output") / "summary.json"
+        if "title" not in metadata and summary_path.exists():
+            with open(summary_path, 'r', encoding='utf-8') as f:
+                metadata["title"] = json.load(f).get("topic", "")
+        
         # Combine all audio files
-        combine_all_audio_in_directory(
+        targets = get_export_targets(export_formats) if export_formats else None
+        output_path = combine_all_audio_in_directory(
             output_filename="combined_episode.mp3",
-            audio_dir="data/audio_output"
+            audio_dir="data/audio_output",
+            targets=targets,
+            metadata=metadata,
+            summary_path=str(summary_path)
         )
         print("✅ Audio combination completed")
-        print(f"🎉 Final episode saved as: data/audio_output/combined_episode.mp3")
+        print(f"🎉 Final episode saved as: {output_path}")
         return True
         
     except Exception as e:
@@ -162,21 +287,94 @@ def combine_audio_files() -> bool:
         return False
 
 
-def create_podcast_episode(topic: str, user_message: str, reference_path: Optional[str] = None) -> bool:
+def translate_languages(
+    languages: list[str],
+    tts_backend: str = "elevenlabs",
+    tts_fallback: Optional[str] = None,
+    voices: Optional[dict[str, str]] = None,
+    turn_gap_ms: int = 350,
+    preprocessor: Optional[TextPreprocessor] = DEFAULT_PREPROCESSOR,
+    tts_workers: int = 4,
+    translate_workers: int = 8,
+    export_formats: Optional[list[str]] = None,
+    tags: Optional[dict[str, str]] = None,
+    hedge: Optional[HedgePolicy] = None) -> bool:
+    """Translate the generated episode and render one combined episode per language."""
+    try:
+        from pipeline.multilingual import render_languages
+        
+        print(f"🌍 Rendering the episode in: {', '.join(languages)}")
+        
+        if not validate_environment((tts_backend, tts_fallback)):
+            print("❌ Environment validation failed")
+            return False
+        
+        if not (Path("data/text_output") / "summary.json").exists():
+            print("❌ No generated episode found in data/text_output/")
+            print("Please run 'generate' command first to create text content.")
+            return False
+        
+        outputs = render_languages(languages, tts_backend=tts_backend, tts_fallback=tts_fallback, voices=voices,
+                                   turn_gap_ms=turn_gap_ms, preprocessor=preprocessor, tts_workers=tts_workers,
+                                   translate_workers=translate_workers, export_formats=export_formats, tags=tags,
+                                   hedge=hedge)
+        for language, output_path in outputs.items():
+            print(f"🎉 {language} episode saved as: {output_path}")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error rendering languages: {e}")
+        return False
+
+
+def create_podcast_episode(
+    topic: str,
+    user_message: str,
+    reference_path: Optional[str] = None,
+    tts_backend: str = "elevenlabs",
+    tts_fallback: Optional[str] = None,
+    speakers: Optional[list[str]] = None,
+    voices: Optional[dict[str, str]] = None,
+    turn_gap_ms: int = 350,
+    export_formats: Optional[list[str]] = None,
+    tags: Optional[dict[str, str]] = None,
+    hls: bool = False,
+    segment_seconds: float = 6.0,
+    preprocessor: Optional[TextPreprocessor] = DEFAULT_PREPROCESSOR,
+    tts_workers: int = 4,
+    hedge: Optional[HedgePolicy] = None,
+    min_words: int = 2500,
+    max_words: int = 4000,
+    qa: bool = False,
+    queue_db: Optional[str] = None,
+    languages: Optional[list[str]] = None,
+    translate_workers: int = 8) -> bool:
     """Create a complete podcast episode from a topic and user message (all-in-one)."""
     try:
         print(f"🎙️ Creating podcast episode for topic: {topic}")
         
         # Step 1: Generate text content
-        if not generate_text_content(topic, user_message, reference_path):
+        if not generate_text_content(topic, user_message, reference_path, speakers, hedge, min_words, max_words,
+                                     queue_db):
             return False
         
         # Step 2: Convert to audio
-        if not convert_audio_content():
+        if not convert_audio_content(tts_backend, tts_fallback, voices, turn_gap_ms, hls, segment_seconds,
+                                     preprocessor, tts_workers, hedge, queue_db):
+            return False
+        
+        # Optional: check segments and re-synthesize bad ones before combining
+        if qa and not qa_audio_content(True, tts_backend, tts_fallback, voices, turn_gap_ms, preprocessor, hedge):
             return False
         
         # Step 3: Combine audio files
-        if not combine_audio_files():
+        if not combine_audio_files(export_formats, tags):
+            return False
+        
+        # Optional: reuse the generated script for the other languages
+        if languages and not translate_languages(languages, tts_backend, tts_fallback, voices, turn_gap_ms,
+                                                 preprocessor, tts_workers, translate_workers, export_formats,
+                                                 tags, hedge):
             return False
         
         print(f"🎉 Podcast episode created successfully!")
@@ -188,6 +386,263 @@ def create_podcast_episode(topic: str, user_message: str, reference_path: Option
         return False
 
 
+def build_podcast_episode(
+    topic: str,
+    user_message: str,
+    reference_path: Optional[str] = None,
+    tts_backend: str = "elevenlabs",
+    tts_fallback: Optional[str] = None,
+    speakers: Optional[list[str]] = None,
+    voices: Optional[dict[str, str]] = None,
+    turn_gap_ms: int = 350,
+    export_formats: Optional[list[str]] = None,
+    tags: Optional[dict[str, str]] = None,
+    preprocessor: Optional[TextPreprocessor] = DEFAULT_PREPROCESSOR,
+    tts_workers: int = 4,
+    hedge: Optional[HedgePolicy] = None,
+    min_words: int = 2500,
+    max_words: int = 4000,
+    dry_run: bool = False) -> bool:
+    """Bring an episode up to date, regenerating only the artifacts whose inputs changed."""
+    try:
+        from pipeline.build import BuildSpec, build_episode
+        from pipeline.distributed import preprocessor_params
+        
+        print(f"🏗️ {'Checking' if dry_run else 'Building'} podcast episode for topic: {topic}")
+        
+        if not dry_run and not validate_environment((tts_backend, tts_fallback)):
+            print("❌ Environment validation failed")
+            return False
+        
+        spec = BuildSpec(
+            topic=topic,
+            message=user_message,
+            reference_path=reference_path,
+            speakers=speakers or [],
+            min_words=min_words,
+            max_words=max_words,
+            tts_backend=tts_backend,
+            tts_fallback=tts_fallback,
+            voices=voices or {},
+            turn_gap_ms=turn_gap_ms,
+            preprocess=preprocessor_params(preprocessor),
+            export_formats=export_formats or ["mp3_128"],
+            tags=tags or {}
+        )
+        actions = build_episode(spec, hedge=hedge, tts_workers=tts_workers, dry_run=dry_run)
+        
+        rebuilt = [name for name, action in actions.items() if action != "fresh"]
+        if not rebuilt:
+            print("✅ Everything is up to date")
+        elif dry_run:
+            print(f"📋 {len(rebuilt)} artifact(s) out of date")
+        else:
+            print(f"✅ Updated {len(rebuilt)} artifact(s); episode saved to: data/audio_output/")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error building podcast episode: {e}")
+        return False
+
+
+def plan_episode(
+    topic: str,
+    user_message: str,
+    reference_path: Optional[str] = None,
+    outline_path: Optional[str] = None,
+    tts_concurrency: int = 5,
+    llm_rpm: int = 50,
+    llm_output_tpm: int = 8000,
+    json_path: Optional[str] = None) -> bool:
+    """Dry run: outline the episode and estimate tokens, characters, time and cost."""
+    try:
+        from pipeline.planner import RateLimits, estimate_episode, load_outline, print_plan
+        
+        print(f"🧮 Planning podcast episode for topic: {topic}")
+        
+        reference_content = ""
+        if reference_path:
+            with open(reference_path, 'r', encoding='utf-8') as f:
+                reference_content = f.read()
+        
+        if outline_path:
+            # Reuse an existing outline, no LLM calls at all
+            _, subtopics = load_outline(outline_path)
+            print(f"📋 Loaded cached outline: {outline_path}")
+        else:
+            if not validate_environment(()):
+                return False
+            
+            # Only the outline agent runs; generation and TTS are estimated
+            from llm.agents.subtopic_agent import subtopic_agent
+            command = subtopic_agent({
+                'messages': [HumanMessage(content=user_message)],
+                'topic': topic,
+                'reference_document_ref': get_blob_store().put(reference_content) if reference_content else ''
+            })
+            subtopics = command.update['subtopics']
+        
+        if not subtopics:
+            print("❌ The outline has no subtopics")
+            return False
+        
+        plan = estimate_episode(
+            topic,
+            subtopics,
+            reference_chars=len(reference_content),
+            rate_limits=RateLimits(llm_rpm, llm_output_tpm, tts_concurrency)
+        )
+        print_plan(plan)
+        
+        if json_path:
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump(plan.to_dict(), f, indent=2, ensure_ascii=False)
+            print(f"📁 Plan saved to: {json_path}")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error planning episode: {e}")
+        return False
+
+
+def serve_jobs(
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    workers: int = 2,
+    db_path: str = "data/jobs.db",
+    tts_backend: str = "elevenlabs",
+    tts_fallback: Optional[str] = None,
+    tts_workers: int = 4,
+    hedge: Optional[HedgePolicy] = None) -> bool:
+    """Run the long-lived worker service with a local HTTP API and job queue."""
+    if not validate_environment((tts_backend, tts_fallback)):
+        return False
+    
+    from pipeline.server import serve
+    
+    print("🛰️ Starting episode worker service...")
+    serve(host, port, workers, db_path, tts_backend, tts_fallback, tts_workers, hedge)
+    return True
+
+
+def run_worker(
+    queue_db: str = "data/tasks.db",
+    concurrency: int = 1,
+    lease_seconds: float = 60,
+    kinds: Optional[list[str]] = None,
+    exit_when_idle: bool = False) -> bool:
+    """Lease segment and generation tasks from a shared queue and run them until stopped."""
+    try:
+        from pipeline.distributed import TASK_HANDLERS, TaskWorker
+        from pipeline.task_queue import TaskQueue
+        
+        unknown = set(kinds or []) - set(TASK_HANDLERS)
+        if unknown:
+            print(f"❌ Unknown task kinds: {', '.join(sorted(unknown))}. Available: {', '.join(TASK_HANDLERS)}")
+            return False
+        
+        worker = TaskWorker(TaskQueue(queue_db), concurrency, lease_seconds, kinds)
+        print(f"🛠️ Worker {worker.worker_id} pulling tasks from {queue_db} ({concurrency} thread(s))")
+        worker.run(exit_when_idle)
+        print(f"✅ Worker finished: {worker.completed} task(s) completed")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error running worker: {e}")
+        return False
+
+
+def show_stats(metrics_file: str = "data/metrics/stage_metrics.jsonl", compare_hedged: bool = False) -> bool:
+    """Print per-stage latency percentiles and hedging activity from recorded runs."""
+    from pipeline.metrics import load_stage_metrics, summarize_stage_metrics
+    
+    records = load_stage_metrics(metrics_file)
+    if not records:
+        print(f"❌ No stage metrics recorded yet in {metrics_file}")
+        return False
+    
+    groups = {"": records}
+    if compare_hedged:
+        # Split the same stages into hedged and unhedged runs to see the tail difference
+        groups = {
+            " (hedged)": [r for r in records if r.get("hedged")],
+            " (unhedged)": [r for r in records if not r.get("hedged")]
+        }
+    
+    print("📊 Stage latency (seconds):")
+    print(f"{'Stage':<32} {'Count':>6} {'Mean':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+    print("-" * 74)
+    for suffix, group in groups.items():
+        for stage, stats in sorted(summarize_stage_metrics(group).items()):
+            if stage == "hedge":
+                continue
+            print(f"{stage + suffix:<32} {stats['count']:>6} {stats['mean_seconds']:>8.2f} "
+                  f"{stats['p50_seconds']:>8.2f} {stats['p95_seconds']:>8.2f} {stats['p99_seconds']:>8.2f}")
+    
+    state_records = [r for r in records if r["stage"] == "graph_state"]
+    if state_records:
+        # The state is copied at every node transition, so its size is a per-step cost
+        print("📦 Graph state per step (bytes, serialization ms):")
+        by_node: dict[str, list[dict]] = {}
+        for record in state_records:
+            by_node.setdefault(record["node"], []).append(record)
+        for node, node_records in sorted(by_node.items()):
+            sizes = [r["state_bytes"] for r in node_records]
+            serialize_ms = sum(r["duration_seconds"] for r in node_records) / len(node_records) * 1000
+            print(f"   {node:<28} mean {sum(sizes) / len(sizes):>10,.0f}  max {max(sizes):>10,}  {serialize_ms:>7.2f} ms")
+    
+    hedges = [r for r in records if r["stage"] == "hedge"]
+    if hedges:
+        backup_wins = sum(1 for r in hedges if r.get("backup_won"))
+        print(f"🪁 Hedged requests: {len(hedges)} ({backup_wins} won by the backup request)")
+    return True
+
+
+def show_audio_info(path: str = "data/audio_output/combined_episode.mp3") -> bool:
+    """Report an episode's layout in milliseconds from MP3 frame headers (no decoding)."""
+    try:
+        from audio_conversion.id3_chapters import read_chapters
+        from audio_conversion.mp3_info import format_ms, scan_mp3
+        
+        target = Path(path)
+        if target.is_dir():
+            # Layout of the per-subtopic files as they would be combined
+            files = [target / name for name in list_audio_files(str(target))]
+            if not files:
+                print(f"❌ No MP3 files found in {target}")
+                return False
+            print(f"🎧 {len(files)} segment(s) in {target}:")
+            print(f"{'Start':>14} {'Duration ms':>12}  File")
+            offset = 0.0
+            for file in files:
+                info = scan_mp3(str(file))
+                print(f"{format_ms(offset):>14} {info.duration_ms:>12.0f}  {file.name}")
+                offset += info.duration_ms
+            print(f"Total: {format_ms(offset)} ({offset:.0f} ms)")
+            return True
+        
+        info = scan_mp3(str(target))
+        print(f"🎧 {target}")
+        print(f"  MPEG-{info.mpeg_version} Layer III, {info.sample_rate} Hz, "
+              f"{'mono' if info.channels == 1 else 'stereo'}, ~{info.bitrate_kbps:.0f} kbps")
+        print(f"  {info.frames:,} frames, encoder delay/padding {info.encoder_delay}/{info.encoder_padding} samples")
+        print(f"  Duration: {format_ms(info.duration_ms)} ({info.duration_ms:.0f} ms)")
+        
+        chapters = read_chapters(str(target))
+        if not chapters:
+            print("  No chapter markers")
+            return True
+        print(f"  {len(chapters)} chapter(s):")
+        for i, chapter in enumerate(chapters, 1):
+            print(f"  {i:>3}. {format_ms(chapter.start_ms)} → {format_ms(chapter.end_ms)} "
+                  f"({chapter.end_ms - chapter.start_ms} ms)  {chapter.title}")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error reading audio info: {e}")
+        return False
+
+
 def list_episodes() -> None:
     """List existing podcast episodes."""
     audio_dir = Path("data") / "audio_output"
@@ -234,13 +689,20 @@ def test_environment() -> bool:
         return False
 
 
-def reconvert_single_file(text_filename: str) -> bool:
+def reconvert_single_file(
+    text_filename: str,
+    tts_backend: str = "elevenlabs",
+    tts_fallback: Optional[str] = None,
+    voices: Optional[dict[str, str]] = None,
+    turn_gap_ms: int = 350,
+    preprocessor: Optional[TextPreprocessor] = DEFAULT_PREPROCESSOR,
+    hedge: Optional[HedgePolicy] = None) -> bool:
     """Reconvert a single text file to audio."""
     try:
         print(f"🎵 Reconverting single file: {text_filename}")
         
         # Validate environment first (check API keys)
-        if not validate_environment():
+        if not validate_environment((tts_backend, tts_fallback)):
             print("❌ Environment validation failed")
             return False
         
@@ -255,9 +717,24 @@ def reconvert_single_file(text_filename: str) -> bool:
         
         # Import and use the convert_text function
         from audio_conversion.convert_audio import convert_text
+        from audio_conversion.dialogue import convert_dialogue_files
+        from audio_conversion.tts_backends import get_backend
+        
+        # Dialogue episodes keep their per-speaker rendering
+        summary = {}
+        summary_path = Path("data/text_output") / "summary.json"
+        if summary_path.exists():
+            with open(summary_path, 'r', encoding='utf-8') as f:
+                summary = json.load(f)
         
         # Convert the single file
-        convert_text(input_file_name=text_filename, output_file_name=output_filename)
+        backend = get_backend(tts_backend, fallback=tts_fallback, hedge=hedge)
+        if summary.get('format') == 'dialogue':
+            convert_dialogue_files([text_filename], backend, speakers=summary.get('speakers'),
+                                   voices=voices, turn_gap_ms=turn_gap_ms, preprocessor=preprocessor)
+        else:
+            convert_text(input_file_name=text_filename, output_file_name=output_filename, backend=backend,
+                         preprocessor=preprocessor)
         
         print(f"✅ Successfully reconverted: {text_filename} → {output_filename}")
         return True
@@ -267,6 +744,83 @@ def reconvert_single_file(text_filename: str) -> bool:
         return False
 
 
+def parse_speakers(value: Optional[str]) -> list[str]:
+    """Parse a comma separated speaker list (e.g. "HOST,GUEST") into upper-case tags."""
+    if not value:
+        return []
+    return [speaker.strip().upper() for speaker in value.split(",") if speaker.strip()]
+
+
+def parse_voices(values: Optional[list[str]]) -> dict[str, str]:
+    """Parse repeated SPEAKER=VOICE options into a speaker → voice mapping."""
+    voices = {}
+    for value in values or []:
+        if "=" not in value:
+            raise ValueError(f"Invalid --voice '{value}'. Expected SPEAKER=VOICE_ID.")
+        speaker, voice = value.split("=", 1)
+        voices[speaker.strip().upper()] = voice.strip()
+    return voices
+
+
+def parse_tags(values: Optional[list[str]]) -> dict[str, str]:
+    """Parse repeated KEY=VALUE options into a metadata tag mapping."""
+    tags = {}
+    for value in values or []:
+        if "=" not in value:
+            raise ValueError(f"Invalid --tag '{value}'. Expected KEY=VALUE.")
+        key, tag_value = value.split("=", 1)
+        tags[key.strip()] = tag_value.strip()
+    return tags
+
+
+def build_preprocessor(no_preprocess: bool, skip_rules: Optional[str]) -> Optional[TextPreprocessor]:
+    """Build the TTS text preprocessor from CLI options (None when disabled)."""
+    if no_preprocess:
+        return None
+    disabled = [name.strip() for name in (skip_rules or "").split(",") if name.strip()]
+    return TextPreprocessor(disabled_rules=disabled)
+
+
+def build_hedge_policy(enabled: bool, hedge_percentile: float, hedge_budget: float) -> Optional[HedgePolicy]:
+    """Build the request hedging policy from CLI options (None when disabled)."""
+    if not enabled:
+        return None
+    if not 0 < hedge_percentile < 1:
+        raise ValueError("--hedge-percentile must be between 0 and 1 (e.g. 0.95)")
+    if not 0 <= hedge_budget <= 1:
+        raise ValueError("--hedge-budget must be between 0 and 1 (e.g. 0.10)")
+    return HedgePolicy(percentile=hedge_percentile, budget_fraction=hedge_budget)
+
+
+def validate_word_budget(min_words: int, max_words: int) -> None:
+    """Check the subtopic length options before any generation starts."""
+    if min_words <= 0 or max_words <= 0:
+        raise ValueError("--min-words and --max-words must be positive")
+    if min_words > max_words:
+        raise ValueError(f"--min-words ({min_words}) cannot be larger than --max-words ({max_words})")
+
+
+def parse_languages(value: Optional[str]) -> list[str]:
+    """Parse a comma separated list of language codes (e.g. "de,fr,es").
+
+    Raises:
+        ValueError: If a language is not supported, before any generation starts.
+    """
+    if not value:
+        return []
+    languages = [language.strip().lower() for language in value.split(",") if language.strip()]
+    for language in languages:
+        language_name(language)
+    return languages
+
+
+def parse_formats(value: Optional[str]) -> list[str]:
+    """Parse a comma separated list of export presets (e.g. "mp3_128,mp3_64,opus")."""
+    if not value:
+        return []
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
 def main():
     """Main CLI entry point."""
     parser = argparse.ArgumentParser(
@@ -282,6 +836,53 @@ Examples:
   python main.py convert
   python main.py combine
   
+  # Offline draft render, or fall back to the local engine if ElevenLabs keeps failing
+  python main.py convert --tts-backend espeak
+  python main.py convert --tts-fallback espeak
+  
+  # Two-host dialogue episode with a voice per speaker
+  python main.py create "leetcode prep" "A general overview with 2 subtopics." --speakers HOST,GUEST --voice GUEST=pNInz6obpgDQGcFmaJgB
+  
+  # Publish several renditions from a single decode
+  python main.py combine --formats mp3_128,mp3_64,opus --tag artist="LLM Podcaster"
+  
+  # Listen while converting: serve the live HLS playlist from another terminal
+  python main.py convert --hls
+  python -m http.server 8000 --directory data/audio_output/hls
+  
+  # Incremental rebuild: after editing a subtopic, the reference or a voice, redo only what changed
+  python main.py build "leetcode prep" "A general overview with 2 subtopics." --dry-run
+  python main.py build "leetcode prep" "A general overview with 2 subtopics."
+  
+  # Same episode in German, French and Spanish: generated once, translated concurrently
+  python main.py create "leetcode prep" "A general overview with 2 subtopics." --languages de,fr,es
+  python main.py translate it,pt
+  
+  # Dry run: estimate tokens, TTS characters, wall time and cost before creating
+  python main.py plan "leetcode prep" "A general overview with 2 subtopics."
+  python main.py plan "leetcode prep" "" --outline data/text_output/summary.json
+  
+  # Warm worker service: submit many episodes over HTTP
+  python main.py serve --workers 4
+  curl -X POST localhost:8765/jobs -d '{"topic": "leetcode prep", "message": "An overview with 2 subtopics."}'
+  curl -N localhost:8765/jobs/<job_id>/events
+  
+  # Hedge slow TTS/LLM requests, then compare tail latency with earlier runs
+  python main.py create "leetcode prep" "A general overview with 2 subtopics." --hedge
+  python main.py stats --compare-hedged
+  
+  # Spread TTS over several processes or hosts sharing the data/ directory
+  python main.py worker --concurrency 2        # on every node, as many as you like
+  python main.py convert --distributed
+  
+  # Find truncated, silent or clipped segments and re-synthesize only those
+  python main.py qa
+  python main.py convert --qa
+  
+  # Chapter layout of the combined episode (read from frame headers, nothing decoded)
+  python main.py info
+  python main.py info data/audio_output
+  
   # Other commands
   python main.py list
   python main.py test
@@ -290,23 +891,146 @@ Examples:
     
     subparsers = parser.add_subparsers(dest="command", help="Available commands")
     
+    # Shared TTS options
+    tts_parser = argparse.ArgumentParser(add_help=False)
+    tts_parser.add_argument("--tts-backend", default="elevenlabs", choices=available_backends(),
+                            help="Text-to-speech engine to use (default: elevenlabs)")
+    tts_parser.add_argument("--tts-fallback", choices=available_backends(),
+                            help="Engine to switch to after repeated failures of --tts-backend")
+    tts_parser.add_argument("--voice", action="append", metavar="SPEAKER=VOICE",
+                            help="Voice for a dialogue speaker (repeatable)")
+    tts_parser.add_argument("--turn-gap-ms", type=int, default=350,
+                            help="Silence between dialogue turns in milliseconds (default: 350)")
+    tts_parser.add_argument("--hls", action="store_true",
+                            help="Also stream HLS segments and a live playlist to data/audio_output/hls/")
+    tts_parser.add_argument("--segment-seconds", type=float, default=6.0,
+                            help="Length of each HLS segment in seconds (default: 6)")
+    tts_parser.add_argument("--tts-workers", type=int, default=4,
+                            help="Concurrent TTS requests (default: 4; see 'plan' for a recommendation)")
+    tts_parser.add_argument("--no-preprocess", action="store_true",
+                            help="Send text to TTS exactly as written (skip markdown/number/URL cleanup)")
+    tts_parser.add_argument("--skip-rules",
+                            help=f"Comma separated preprocessing rules to disable ({', '.join(RULE_NAMES)})")
+    
+    # Shared export options
+    export_parser = argparse.ArgumentParser(add_help=False)
+    export_parser.add_argument("--formats",
+                               help=f"Comma separated renditions to encode in one pass ({', '.join(EXPORT_PRESETS)})")
+    export_parser.add_argument("--tag", action="append", metavar="KEY=VALUE",
+                               help="Metadata tag for the combined episode, e.g. artist=... (repeatable)")
+    
+    # Shared generation options
+    generation_parser = argparse.ArgumentParser(add_help=False)
+    generation_parser.add_argument("--speakers",
+                                   help="Comma separated speaker tags for a dialogue episode (e.g. HOST,GUEST)")
+    generation_parser.add_argument("--min-words", type=int, default=2500,
+                                   help="Extend subtopics shorter than this with a continuation request (default: 2500)")
+    generation_parser.add_argument("--max-words", type=int, default=4000,
+                                   help="Stop subtopics at the first sentence end past this many words (default: 4000)")
+    
+    # Shared request hedging options
+    hedge_parser = argparse.ArgumentParser(add_help=False)
+    hedge_parser.add_argument("--hedge", action="store_true",
+                              help="Send a duplicate TTS/LLM request when one is slower than recent calls")
+    hedge_parser.add_argument("--hedge-percentile", type=float, default=0.95,
+                              help="Latency percentile of recent calls that triggers a duplicate (default: 0.95)")
+    hedge_parser.add_argument("--hedge-budget", type=float, default=0.10,
+                              help="Maximum fraction of requests that may be duplicated (default: 0.10)")
+    
+    # Shared distributed execution options
+    distributed_parser = argparse.ArgumentParser(add_help=False)
+    distributed_parser.add_argument("--distributed", action="store_true",
+                                    help="Queue the work for 'worker' processes instead of running it here")
+    distributed_parser.add_argument("--queue-db", default="data/tasks.db",
+                                    help="Task queue on storage shared with the workers (default: data/tasks.db)")
+    
     # Create command (all-in-one)
-    create_parser = subparsers.add_parser("create", help="Create a complete podcast episode (all steps)")
+    create_parser = subparsers.add_parser("create", parents=[tts_parser, generation_parser, export_parser, hedge_parser, distributed_parser], help="Create a complete podcast episode (all steps)")
     create_parser.add_argument("topic", help="Topic for the podcast episode")
     create_parser.add_argument("message", help="User message describing what to create")
     create_parser.add_argument("--reference", "-r", help="Path to reference document file")
+    create_parser.add_argument("--languages",
+                               help="Also render the episode in these languages, e.g. de,fr,es (translated once, combined per language)")
+    create_parser.add_argument("--translate-workers", type=int, default=8,
+                               help="Concurrent translation requests (default: 8)")
+    create_parser.add_argument("--qa", action="store_true",
+                               help="Check segments for silence/clipping/loudness/length and re-synthesize bad ones")
     
     # Generate command (text only)
-    generate_parser = subparsers.add_parser("generate", help="Generate podcast text content only")
+    generate_parser = subparsers.add_parser("generate", parents=[generation_parser, hedge_parser, distributed_parser], help="Generate podcast text content only")
     generate_parser.add_argument("topic", help="Topic for the podcast episode")
     generate_parser.add_argument("message", help="User message describing what to create")
     generate_parser.add_argument("--reference", "-r", help="Path to reference document file")
     
+    # Build command (incremental)
+    build_parser = subparsers.add_parser("build", parents=[tts_parser, generation_parser, export_parser, hedge_parser],
+                                         help="Rebuild only the parts of an episode whose inputs changed")
+    build_parser.add_argument("topic", help="Topic for the podcast episode")
+    build_parser.add_argument("message", help="User message describing what to create")
+    build_parser.add_argument("--reference", "-r", help="Path to reference document file")
+    build_parser.add_argument("--dry-run", action="store_true", help="Only show which artifacts are out of date")
+    
+    # Translate command
+    translate_parser = subparsers.add_parser("translate", parents=[tts_parser, export_parser, hedge_parser],
+                                             help="Render the generated episode in other languages")
+    translate_parser.add_argument("languages", help="Comma separated language codes, e.g. de,fr,es")
+    translate_parser.add_argument("--translate-workers", type=int, default=8,
+                                  help="Concurrent translation requests (default: 8)")
+    
+    # Plan command (dry run estimate)
+    plan_parser = subparsers.add_parser("plan", help="Estimate tokens, TTS characters, wall time and cost without generating")
+    plan_parser.add_argument("topic", help="Topic for the podcast episode")
+    plan_parser.add_argument("message", help="User message describing what to create")
+    plan_parser.add_argument("--reference", "-r", help="Path to reference document file")
+    plan_parser.add_argument("--outline", help="Reuse a cached outline (summary.json or *_subtopics.txt) instead of calling the LLM")
+    plan_parser.add_argument("--tts-concurrency", type=int, default=5, help="TTS plan concurrent request limit (default: 5)")
+    plan_parser.add_argument("--llm-rpm", type=int, default=50, help="LLM requests per minute limit (default: 50)")
+    plan_parser.add_argument("--llm-output-tpm", type=int, default=8000, help="LLM output tokens per minute limit (default: 8000)")
+    plan_parser.add_argument("--json", dest="json_path", help="Also write the plan as JSON to this path")
+    
+    # Serve command (long-running worker)
+    serve_parser = subparsers.add_parser("serve", parents=[tts_parser, hedge_parser],
+                                         help="Run a warm worker service with an HTTP job API")
+    serve_parser.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: 127.0.0.1)")
+    serve_parser.add_argument("--port", type=int, default=8765, help="Port to bind (default: 8765)")
+    serve_parser.add_argument("--workers", type=int, default=2, help="Episodes to run concurrently (default: 2)")
+    serve_parser.add_argument("--db", default="data/jobs.db", help="SQLite job queue path (default: data/jobs.db)")
+    
+    # Worker command (distributed task runner)
+    worker_parser = subparsers.add_parser("worker", help="Run queued TTS segment and generation tasks (start as many as you like)")
+    worker_parser.add_argument("--queue-db", default="data/tasks.db",
+                               help="Task queue on storage shared with the submitter (default: data/tasks.db)")
+    worker_parser.add_argument("--concurrency", type=int, default=1, help="Tasks run at once by this process (default: 1)")
+    worker_parser.add_argument("--lease-seconds", type=float, default=60,
+                               help="Lease length; a task is retried elsewhere if heartbeats stop this long (default: 60)")
+    worker_parser.add_argument("--kinds", help="Comma separated task kinds to accept (default: all)")
+    worker_parser.add_argument("--exit-when-idle", action="store_true", help="Exit once no task is left to lease")
+    
     # Convert command (text to audio)
-    subparsers.add_parser("convert", help="Convert generated text content to audio files")
+    convert_parser = subparsers.add_parser("convert", parents=[tts_parser, hedge_parser, distributed_parser], help="Convert generated text content to audio files")
+    convert_parser.add_argument("--qa", action="store_true",
+                                help="Check segments for silence/clipping/loudness/length and re-synthesize bad ones")
+    
+    # QA command (check and repair converted audio)
+    qa_parser = subparsers.add_parser("qa", parents=[tts_parser, hedge_parser],
+                                      help="Check audio segments and re-synthesize the bad ones")
+    qa_parser.add_argument("--report-only", action="store_true",
+                           help="Only write data/audio_output/qa_report.json, do not re-synthesize")
     
     # Combine command (audio combination)
-    subparsers.add_parser("combine", help="Combine audio files into final episode")
+    subparsers.add_parser("combine", parents=[export_parser], help="Combine audio files into final episode")
+    
+    # Stats command (recorded stage latencies)
+    stats_parser = subparsers.add_parser("stats", help="Show p50/p95/p99 stage latency from previous runs")
+    stats_parser.add_argument("--metrics", default="data/metrics/stage_metrics.jsonl",
+                              help="Stage metrics log (default: data/metrics/stage_metrics.jsonl)")
+    stats_parser.add_argument("--compare-hedged", action="store_true",
+                              help="Report hedged and unhedged calls separately")
+    
+    # Info command (MP3 layout and chapters)
+    info_parser = subparsers.add_parser("info", help="Show episode duration and chapter layout in milliseconds")
+    info_parser.add_argument("path", nargs="?", default="data/audio_output/combined_episode.mp3",
+                             help="MP3 file, or a directory of segments (default: data/audio_output/combined_episode.mp3)")
     
     # List command
     subparsers.add_parser("list", help="List existing podcast episodes")
@@ -315,7 +1039,7 @@ Examples:
     subparsers.add_parser("test", help="Test the environment and dependencies")
     
     # Reconvert command (single file)
-    reconvert_parser = subparsers.add_parser("reconvert", help="Reconvert a single text file to audio")
+    reconvert_parser = subparsers.add_parser("reconvert", parents=[tts_parser, hedge_parser], help="Reconvert a single text file to audio")
     reconvert_parser.add_argument("filename", help="Name of the text file to reconvert (e.g., subtopic_00.txt)")
     
     args = parser.parse_args()
@@ -325,23 +1049,115 @@ Examples:
         return
     
     try:
+        if hasattr(args, "min_words"):
+            validate_word_budget(args.min_words, args.max_words)
+
         if args.command == "create":
-            success = create_podcast_episode(args.topic, args.message, args.reference)
+            success = create_podcast_episode(args.topic, args.message, args.reference,
+                                             args.tts_backend, args.tts_fallback,
+                                             parse_speakers(args.speakers), parse_voices(args.voice),
+                                             args.turn_gap_ms, parse_formats(args.formats),
+                                             parse_tags(args.tag), args.hls, args.segment_seconds,
+                                             build_preprocessor(args.no_preprocess, args.skip_rules),
+                                             args.tts_workers,
+                                             build_hedge_policy(args.hedge, args.hedge_percentile, args.hedge_budget),
+                                             args.min_words, args.max_words, args.qa,
+                                             args.queue_db if args.distributed else None,
+                                             parse_languages(args.languages), args.translate_workers)
             if not success:
                 sys.exit(1)
                 
         elif args.command == "generate":
-            success = generate_text_content(args.topic, args.message, args.reference)
+            success = generate_text_content(args.topic, args.message, args.reference,
+                                            parse_speakers(args.speakers),
+                                            build_hedge_policy(args.hedge, args.hedge_percentile, args.hedge_budget),
+                                            args.min_words, args.max_words,
+                                            args.queue_db if args.distributed else None)
+            if not success:
+                sys.exit(1)
+                
+        elif args.command == "build":
+            if args.hls:
+                print("⚠️ --hls is ignored by 'build'; use 'convert --hls' to stream a full conversion")
+            success = build_podcast_episode(args.topic, args.message, args.reference,
+                                            args.tts_backend, args.tts_fallback,
+                                            parse_speakers(args.speakers), parse_voices(args.voice),
+                                            args.turn_gap_ms, parse_formats(args.formats), parse_tags(args.tag),
+                                            build_preprocessor(args.no_preprocess, args.skip_rules),
+                                            args.tts_workers,
+                                            build_hedge_policy(args.hedge, args.hedge_percentile, args.hedge_budget),
+                                            args.min_words, args.max_words, args.dry_run)
+            if not success:
+                sys.exit(1)
+                
+        elif args.command == "translate":
+            if args.hls:
+                print("⚠️ --hls is ignored by 'translate'")
+            success = translate_languages(parse_languages(args.languages), args.tts_backend, args.tts_fallback,
+                                          parse_voices(args.voice), args.turn_gap_ms,
+                                          build_preprocessor(args.no_preprocess, args.skip_rules),
+                                          args.tts_workers, args.translate_workers, parse_formats(args.formats),
+                                          parse_tags(args.tag),
+                                          build_hedge_policy(args.hedge, args.hedge_percentile, args.hedge_budget))
+            if not success:
+                sys.exit(1)
+                
+        elif args.command == "plan":
+            success = plan_episode(args.topic, args.message, args.reference, args.outline,
+                                   args.tts_concurrency, args.llm_rpm, args.llm_output_tpm, args.json_path)
+            if not success:
+                sys.exit(1)
+                
+        elif args.command == "serve":
+            success = serve_jobs(args.host, args.port, args.workers, args.db,
+                                 args.tts_backend, args.tts_fallback, args.tts_workers,
+                                 build_hedge_policy(args.hedge, args.hedge_percentile, args.hedge_budget))
+            if not success:
+                sys.exit(1)
+                
+        elif args.command == "worker":
+            kinds = [kind.strip() for kind in (args.kinds or "").split(",") if kind.strip()]
+            success = run_worker(args.queue_db, args.concurrency, args.lease_seconds, kinds or None,
+                                 args.exit_when_idle)
             if not success:
                 sys.exit(1)
                 
         elif args.command == "convert":
-            success = convert_audio_content()
+            success = convert_audio_content(args.tts_backend, args.tts_fallback,
+                                            parse_voices(args.voice), args.turn_gap_ms,
+                                            args.hls, args.segment_seconds,
+                                            build_preprocessor(args.no_preprocess, args.skip_rules),
+                                            args.tts_workers,
+                                            build_hedge_policy(args.hedge, args.hedge_percentile, args.hedge_budget),
+                                            args.queue_db if args.distributed else None)
+            if success and args.qa:
+                success = qa_audio_content(True, args.tts_backend, args.tts_fallback,
+                                           parse_voices(args.voice), args.turn_gap_ms,
+                                           build_preprocessor(args.no_preprocess, args.skip_rules),
+                                           build_hedge_policy(args.hedge, args.hedge_percentile, args.hedge_budget))
+            if not success:
+                sys.exit(1)
+                
+        elif args.command == "qa":
+            success = qa_audio_content(not args.report_only, args.tts_backend, args.tts_fallback,
+                                       parse_voices(args.voice), args.turn_gap_ms,
+                                       build_preprocessor(args.no_preprocess, args.skip_rules),
+                                       build_hedge_policy(args.hedge, args.hedge_percentile, args.hedge_budget))
             if not success:
                 sys.exit(1)
                 
         elif args.command == "combine":
-            success = combine_audio_files()
+            success = combine_audio_files(parse_formats(args.formats), parse_tags(args.tag))
+            if not success:
+                sys.exit(1)
+                
+        elif args.command == "stats":
+            success = show_stats(args.metrics, args.compare_hedged)
+            if not success:
+                sys.exit(1)
+                
+        elif args.command == "info":
+            success = show_audio_info(args.path)
             if not success:
                 sys.exit(1)
                 
@@ -354,7 +1170,10 @@ Examples:
                 sys.exit(1)
                 
         elif args.command == "reconvert":
-            success = reconvert_single_file(args.filename)
+            success = reconvert_single_file(args.filename, args.tts_backend, args.tts_fallback,
+                                            parse_voices(args.voice), args.turn_gap_ms,
+                                            build_preprocessor(args.no_preprocess, args.skip_rules),
+                                            build_hedge_policy(args.hedge, args.hedge_percentile, args.hedge_budget))
             if not success:
                 sys.exit(1)
                 
@@ -0,0 +1,59 @@
+import hashlib
+import os
+import tempfile
+from typing import Optional
+
+
+class AudioCache:
+    """Content-addressed cache of synthesized MP3 audio.
+
+    Entries are keyed by a hash of the backend identity (engine and model), voice
+    and exact text, so identical lines (recurring intros, sign-offs, catchphrases)
+    are synthesized only once across turns, subtopics and episodes.
+    """
+
+    def __init__(self, cache_dir: str = "data/audio_cache"):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(backend_identity: str, voice: Optional[str], text: str) -> str:
+        """Return the cache key for a piece of text rendered by a backend and voice."""
+        payload = "\x1f".join([backend_identity, voice or "", text])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.mp3")
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return cached audio bytes for a key, or None on a miss."""
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+
+    def put(self, key: str, audio: bytes) -> str:
+        """Store audio bytes under a key and return the cached file path."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temporary file first so concurrent readers never see partial audio
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(audio)
+        os.replace(tmp_path, path)
+        return path
+
+    def path(self, key: str) -> Optional[str]:
+        """Return the cached file path for a key, or None on a miss."""
+        path = self._path(key)
+        return path if os.path.exists(path) else None
+
+    def delete(self, key: str) -> bool:
+        """Drop a cached entry so it is synthesized again. Returns True if it existed."""
+        try:
+            os.remove(self._path(key))
+            return True
+        except FileNotFoundError:
+            return False
@@ -0,0 +1,408 @@
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from src.audio_conversion.audio_cache import AudioCache
+from src.audio_conversion.combine_audio import list_audio_files
+from src.audio_conversion.pcm_cache import load_pcm
+from src.audio_conversion.text_preprocessing import DEFAULT_PREPROCESSOR, TextPreprocessor
+from src.audio_conversion.tts_backends import TTSBackend, backend_identity
+from src.pipeline.metrics import stage_timer
+
+
+QA_REPORT_FILE = "qa_report.json"
+
+# Issue kinds that depend on the other segments and are recomputed whenever any segment changes
+EPISODE_ISSUE_KINDS = {"rms_outlier", "duration"}
+
+FULL_SCALE = 32768.0
+
+# Windows analysed per block, so an hour of audio never needs a full float copy in memory
+BLOCK_WINDOWS = 50_000
+
+
+@dataclass
+class QAThresholds:
+    """Limits a synthesized segment must stay within."""
+    window_ms: int = 20
+    silence_dbfs: float = -50.0
+    max_silence_seconds: float = 2.0
+    max_edge_silence_seconds: float = 1.5
+    clip_level: int = 32700
+    min_clip_run: int = 3
+    max_clip_events_per_minute: float = 1.0
+    min_rms_dbfs: float = -35.0
+    max_rms_dbfs: float = -9.0
+    rms_outlier_db: float = 6.0
+    min_chars_per_second: float = 8.0
+    max_chars_per_second: float = 25.0
+    outlier_z: float = 3.5
+
+
+class Issue(NamedTuple):
+    """One problem found in a segment. start/end are seconds, or None for the whole segment."""
+    kind: str
+    detail: str
+    start: Optional[float] = None
+    end: Optional[float] = None
+
+
+@dataclass
+class SegmentReport:
+    """QA measurements and issues for one synthesized segment."""
+    file: str
+    duration_seconds: float
+    characters: int = 0
+    speech_seconds: float = 0.0
+    rms_dbfs: float = 0.0
+    peak_dbfs: float = 0.0
+    clip_events: int = 0
+    longest_silence_seconds: float = 0.0
+    issues: list[Issue] = field(default_factory=list)
+    resynthesized: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return not self.issues
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["issues"] = [issue._asdict() for issue in self.issues]
+        data["ok"] = self.ok
+        return data
+
+
+def decode_mono(path: str) -> tuple[np.ndarray, int]:
+    """Mono 16-bit samples of an MP3, read from the PCM sidecar cache (decoded once)."""
+    pcm = load_pcm(path)
+    return pcm.mono(), pcm.sample_rate
+
+
+def window_dbfs(samples: np.ndarray, window: int) -> np.ndarray:
+    """RMS level in dBFS of consecutive non-overlapping windows."""
+    count = len(samples) // window
+    levels = np.empty(count, dtype=np.float32)
+    for start in range(0, count, BLOCK_WINDOWS):
+        stop = min(count, start + BLOCK_WINDOWS)
+        block = samples[start * window:stop * window].reshape(stop - start, window).astype(np.float32)
+        power = np.einsum("ij,ij->i", block, block) / (window * FULL_SCALE ** 2)
+        levels[start:stop] = 10 * np.log10(power + 1e-12)
+    return levels
+
+
+def _runs(mask: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Start and end (exclusive) indices of consecutive True runs."""
+    edges = np.diff(np.concatenate(([0], mask.view(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def analyze_samples(samples: np.ndarray, sample_rate: int, thresholds: QAThresholds, name: str = "") -> SegmentReport:
+    """Measure silence, clipping and loudness of one decoded segment.
+
+    Args:
+        samples (np.ndarray): Mono int16 samples.
+        sample_rate (int): Sample rate in Hz.
+        thresholds (QAThresholds): Limits to check against.
+        name (str): Segment name used in the report.
+
+    Returns:
+        SegmentReport: Measurements with silence, clipping and loudness issues.
+    """
+    duration = len(samples) / sample_rate
+    report = SegmentReport(file=name, duration_seconds=round(duration, 3))
+    if not len(samples):
+        report.issues.append(Issue("empty", "segment contains no audio"))
+        return report
+
+    # Loudness and silence on short windows
+    window = max(1, sample_rate * thresholds.window_ms // 1000)
+    window_seconds = window / sample_rate
+    levels = window_dbfs(samples, window)
+    silent = levels < thresholds.silence_dbfs
+
+    active = levels[~silent]
+    if len(active):
+        report.rms_dbfs = round(float(10 * np.log10(np.mean(10 ** (active / 10)))), 2)
+    else:
+        report.rms_dbfs = round(float(levels.max()) if len(levels) else -120.0, 2)
+    peak = max(int(samples.max()), -int(samples.min()))
+    report.peak_dbfs = round(float(20 * np.log10(max(peak, 1) / FULL_SCALE)), 2)
+    report.speech_seconds = round(float(np.count_nonzero(~silent)) * window_seconds, 3)
+
+    starts, ends = _runs(silent)
+    if len(starts):
+        lengths = (ends - starts) * window_seconds
+        report.longest_silence_seconds = round(float(lengths.max()), 3)
+        for start, end, length in zip(starts, ends, lengths):
+            at_edge = start == 0 or end == len(silent)
+            limit = thresholds.max_edge_silence_seconds if at_edge else thresholds.max_silence_seconds
+            if length > limit:
+                where = "leading" if start == 0 else "trailing" if end == len(silent) else "internal"
+                report.issues.append(Issue("silence", f"{length:.1f}s {where} silence",
+                                           round(float(start * window_seconds), 2), round(float(end * window_seconds), 2)))
+
+    if not len(active):
+        report.issues.append(Issue("silence", "segment is entirely silent", 0.0, round(duration, 2)))
+        return report
+
+    # Clipping: runs of consecutive samples at full scale
+    clipped = np.flatnonzero((samples >= thresholds.clip_level) | (samples <= -thresholds.clip_level))
+    if len(clipped):
+        breaks = np.flatnonzero(np.diff(clipped) > 1)
+        run_starts = clipped[np.concatenate(([0], breaks + 1))]
+        run_lengths = np.diff(np.concatenate(([0], breaks + 1, [len(clipped)])))
+        event_starts = run_starts[run_lengths >= thresholds.min_clip_run]
+        report.clip_events = int(len(event_starts))
+
+        if report.clip_events > thresholds.max_clip_events_per_minute * max(duration / 60, 1):
+            # Group events less than a second apart into regions worth re-rendering
+            event_seconds = event_starts / sample_rate
+            region_breaks = np.flatnonzero(np.diff(event_seconds) > 1.0)
+            region_starts = event_seconds[np.concatenate(([0], region_breaks + 1))]
+            region_ends = event_seconds[np.concatenate((region_breaks, [len(event_seconds) - 1]))]
+            for start, end in zip(region_starts, region_ends):
+                report.issues.append(Issue("clipping", "clipped samples",
+                                           round(float(start), 2), round(float(end) + 0.1, 2)))
+
+    if report.rms_dbfs < thresholds.min_rms_dbfs:
+        report.issues.append(Issue("rms", f"too quiet ({report.rms_dbfs:.1f} dBFS)"))
+    elif report.rms_dbfs > thresholds.max_rms_dbfs:
+        report.issues.append(Issue("rms", f"too loud ({report.rms_dbfs:.1f} dBFS)"))
+    return report
+
+
+def _robust_z(values: np.ndarray) -> np.ndarray:
+    # Median/MAD z-score: one bad segment cannot drag the baseline towards itself
+    median = np.median(values)
+    mad = np.median(np.abs(values - median))
+    if mad == 0:
+        return np.zeros_like(values)
+    return 0.6745 * (values - median) / mad
+
+
+def flag_outliers(reports: list[SegmentReport], thresholds: QAThresholds) -> None:
+    """Add episode-level issues: loudness and speaking-rate outliers across segments."""
+    measured = [r for r in reports if r.speech_seconds > 0]
+    if not measured:
+        return
+
+    levels = np.array([r.rms_dbfs for r in measured])
+    median_level = float(np.median(levels))
+    for report, level in zip(measured, levels):
+        if abs(level - median_level) > thresholds.rms_outlier_db:
+            report.issues.append(Issue("rms_outlier", f"{level - median_level:+.1f} dB from the episode median"))
+
+    with_text = [r for r in measured if r.characters]
+    if not with_text:
+        return
+    rates = np.array([r.characters / r.speech_seconds for r in with_text])
+    z_scores = _robust_z(rates) if len(rates) >= 4 else np.zeros_like(rates)
+    for report, rate, z in zip(with_text, rates, z_scores):
+        if rate > thresholds.max_chars_per_second or z > thresholds.outlier_z:
+            report.issues.append(Issue("duration", f"{rate:.1f} chars/s: audio too short for its text (truncated?)"))
+        elif rate < thresholds.min_chars_per_second or z < -thresholds.outlier_z:
+            report.issues.append(Issue("duration", f"{rate:.1f} chars/s: audio too long for its text"))
+
+
+def _spoken_characters(text_path: str, dialogue: bool, speakers: Optional[list[str]],
+                       preprocessor: Optional[TextPreprocessor]) -> int:
+    if not os.path.exists(text_path):
+        return 0
+    with open(text_path, 'r', encoding='utf-8') as f:
+        text = f.read().strip()
+    if preprocessor is not None:
+        text = preprocessor.process(text).text
+    if dialogue:
+        from src.audio_conversion.dialogue import parse_turns
+        return sum(len(turn.text) for turn in parse_turns(text, speakers))
+    return len(text)
+
+
+def _load_summary(text_dir: str) -> dict:
+    summary_path = os.path.join(text_dir, "summary.json")
+    if not os.path.exists(summary_path):
+        return {}
+    with open(summary_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def segment_files(audio_dir: str = "data/audio_output") -> list[str]:
+    """Per-subtopic MP3 files in an audio directory (combined renditions excluded)."""
+    return list_audio_files(audio_dir)
+
+
+def run_qa(
+    audio_dir: str = "data/audio_output",
+    text_dir: str = "data/text_output",
+    thresholds: Optional[QAThresholds] = None,
+    preprocessor: Optional[TextPreprocessor] = DEFAULT_PREPROCESSOR,
+    files: Optional[list[str]] = None,
+    outliers: bool = True) -> list[SegmentReport]:
+    """Decode every segment once and check it for silence, clipping, loudness and length problems.
+
+    Args:
+        audio_dir (str): Directory with the segment MP3 files. Defaults to "data/audio_output".
+        text_dir (str): Directory with the matching text files and summary.json.
+        thresholds (QAThresholds, optional): Limits to check against. Defaults to QAThresholds().
+        preprocessor (TextPreprocessor, optional): Text cleanup used for synthesis, so characters match what was spoken.
+        files (List[str], optional): Segment filenames to check. Defaults to all segments.
+        outliers (bool): Also compare segments against each other. Defaults to True.
+
+    Returns:
+        List[SegmentReport]: One report per segment, in file order.
+    """
+    thresholds = thresholds or QAThresholds()
+    summary = _load_summary(text_dir)
+    dialogue = summary.get("format") == "dialogue"
+    speakers = summary.get("speakers")
+
+    reports = []
+    for filename in files or segment_files(audio_dir):
+        with stage_timer("qa", file=filename) as m:
+            samples, sample_rate = decode_mono(os.path.join(audio_dir, filename))
+            report = analyze_samples(samples, sample_rate, thresholds, filename)
+            m["audio_seconds"] = report.duration_seconds
+        text_path = os.path.join(text_dir, filename.replace(".mp3", ".txt"))
+        report.characters = _spoken_characters(text_path, dialogue, speakers, preprocessor)
+        reports.append(report)
+
+    if outliers:
+        flag_outliers(reports, thresholds)
+    return reports
+
+
+def write_report(reports: list[SegmentReport], audio_dir: str = "data/audio_output",
+                 thresholds: Optional[QAThresholds] = None) -> str:
+    """Write qa_report.json into the audio directory and return its path."""
+    report_path = os.path.join(audio_dir, QA_REPORT_FILE)
+    data = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "thresholds": asdict(thresholds or QAThresholds()),
+        "segments": [report.to_dict() for report in reports],
+        "flagged": [report.file for report in reports if not report.ok],
+    }
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    return report_path
+
+
+def print_report(reports: list[SegmentReport]) -> None:
+    """Print a one-line verdict per segment with its issues."""
+    for report in reports:
+        status = "ok" if report.ok else f"{len(report.issues)} issue(s)"
+        print(f"{report.file}: {report.duration_seconds / 60:.1f} min, {report.rms_dbfs:.1f} dBFS, "
+              f"peak {report.peak_dbfs:.1f} dBFS — {status}")
+        for issue in report.issues:
+            where = f" at {issue.start:.1f}–{issue.end:.1f}s" if issue.start is not None else ""
+            print(f"    {issue.kind}: {issue.detail}{where}")
+
+
+def resynthesize_flagged(
+    reports: list[SegmentReport],
+    backend: TTSBackend,
+    audio_dir: str = "data/audio_output",
+    text_dir: str = "data/text_output",
+    voices: Optional[dict[str, str]] = None,
+    turn_gap_ms: int = 350,
+    preprocessor: Optional[TextPreprocessor] = DEFAULT_PREPROCESSOR,
+    cache: Optional[AudioCache] = None) -> list[str]:
+    """Re-render only what QA flagged.
+
+    Monologue segments are one TTS request each and are re-synthesized whole.
+    Dialogue segments are re-assembled from the turn cache after evicting just
+    the turns that overlap a flagged time range (all turns for whole-segment issues).
+
+    Returns:
+        List[str]: Segment filenames that were re-synthesized.
+    """
+    from src.audio_conversion.convert_audio import convert_text
+    from src.audio_conversion.dialogue import convert_dialogue_files, read_scripts, script_voices, turn_spans
+
+    flagged = [r for r in reports if not r.ok]
+    if not flagged:
+        return []
+
+    summary = _load_summary(text_dir)
+    fixed = []
+    if summary.get("format") != "dialogue":
+        for report in flagged:
+            print(f"Re-synthesizing {report.file} ({', '.join(issue.kind for issue in report.issues)})")
+            convert_text(input_file_name=report.file.replace(".mp3", ".txt"), output_file_name=report.file,
+                         backend=backend, preprocessor=preprocessor, text_dir=text_dir, audio_dir=audio_dir)
+            fixed.append(report.file)
+        return fixed
+
+    cache = cache or AudioCache()
+    speakers = summary.get("speakers")
+    text_files = summary.get("subtopic_files_generated") or [r.file.replace(".mp3", ".txt") for r in reports]
+    scripts = read_scripts(text_files, speakers, text_dir, preprocessor, verbose=False)
+    speaker_voices = script_voices(scripts, backend, speakers, voices)
+
+    for report in flagged:
+        text_file = report.file.replace(".mp3", ".txt")
+        spans = turn_spans(scripts.get(text_file, []), backend_identity(backend), speaker_voices, turn_gap_ms, cache)
+        ranges = [(issue.start, issue.end) for issue in report.issues]
+        evicted = {
+            key for _, key, start, end in spans
+            if any(r_start is None or (start < r_end and end > r_start) for r_start, r_end in ranges)
+        }
+        for key in evicted:
+            cache.delete(key)
+        print(f"Re-synthesizing {len(evicted)} of {len(spans)} turns in {report.file}")
+        convert_dialogue_files([text_file], backend, speakers=speakers, voices=voices, turn_gap_ms=turn_gap_ms,
+                               text_dir=text_dir, audio_dir=audio_dir, preprocessor=preprocessor)
+        fixed.append(report.file)
+    return fixed
+
+
+def qa_episode(
+    audio_dir: str = "data/audio_output",
+    text_dir: str = "data/text_output",
+    backend: Optional[TTSBackend] = None,
+    thresholds: Optional[QAThresholds] = None,
+    voices: Optional[dict[str, str]] = None,
+    turn_gap_ms: int = 350,
+    preprocessor: Optional[TextPreprocessor] = DEFAULT_PREPROCESSOR,
+    max_attempts: int = 1) -> list[SegmentReport]:
+    """Check every segment, re-synthesize the flagged ones and write qa_report.json.
+
+    Args:
+        audio_dir (str): Directory with the segment MP3 files.
+        text_dir (str): Directory with the text files and summary.json.
+        backend (TTSBackend, optional): Backend for re-synthesis. None only reports.
+        thresholds (QAThresholds, optional): Limits to check against.
+        voices (Dict[str, str], optional): Speaker → voice overrides for dialogue episodes.
+        turn_gap_ms (int): Silence between dialogue turns. Defaults to 350.
+        preprocessor (TextPreprocessor, optional): Text cleanup used for synthesis.
+        max_attempts (int): Re-synthesis rounds for segments that stay flagged. Defaults to 1.
+
+    Returns:
+        List[SegmentReport]: Final reports, after any re-synthesis.
+    """
+    thresholds = thresholds or QAThresholds()
+    reports = run_qa(audio_dir, text_dir, thresholds, preprocessor)
+    print_report(reports)
+
+    for attempt in range(max_attempts if backend is not None else 0):
+        fixed = resynthesize_flagged(reports, backend, audio_dir, text_dir, voices, turn_gap_ms, preprocessor)
+        if not fixed:
+            break
+        print(f"Re-checking {len(fixed)} re-synthesized segment(s) (attempt {attempt + 1}/{max_attempts})")
+
+        # Only the new audio is decoded again; episode-level outliers are recomputed for all segments
+        rechecked = {r.file: r for r in run_qa(audio_dir, text_dir, thresholds, preprocessor, fixed, outliers=False)}
+        reports = [rechecked.get(r.file, r) for r in reports]
+        for report in reports:
+            report.issues = [issue for issue in report.issues if issue.kind not in EPISODE_ISSUE_KINDS]
+            report.resynthesized = report.resynthesized or report.file in rechecked
+        flag_outliers(reports, thresholds)
+        print_report([r for r in reports if r.file in rechecked])
+
+    report_path = write_report(reports, audio_dir, thresholds)
+    flagged = sum(1 for r in reports if not r.ok)
+    print(f"QA report saved to: {report_path} ({flagged} of {len(reports)} segments flagged)")
+    return reports
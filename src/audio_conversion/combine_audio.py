@@ -1,17 +1,116 @@
 import os
 import glob
-from typing import List
+import json
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import List, Optional
+import numpy as np
 from pydub import AudioSegment
+from pydub.utils import get_encoder_name
+from src.pipeline.metrics import stage_timer
+from src.audio_conversion.id3_chapters import Chapter, write_chapters
+from src.audio_conversion.mp3_info import format_ms, scan_mp3
+from src.audio_conversion.pcm_cache import get_pcm_cache
 
 
-def list_audio_files(audio_dir: str = "data/audio_output") -> list[str]:
-    """List all MP3 files in the specified audio directory.
+@dataclass
+class ExportTarget:
+    """One rendition of the combined episode and its encoder settings."""
+    filename: str
+    format: str = "mp3"
+    codec: str = "libmp3lame"
+    bitrate: Optional[str] = "128k"
+    channels: Optional[int] = None
+    sample_rate: Optional[int] = None
+    parameters: list[str] = field(default_factory=list)
+
+
+COMBINED_BASE_NAME = "combined_episode"
+
+# Filenames combine has written into an audio directory, including custom output names
+COMBINED_OUTPUTS_FILE = ".combined_outputs.json"
+
+EXPORT_PRESETS = {
+    "mp3_128": ExportTarget("combined_episode.mp3", "mp3", "libmp3lame", "128k"),
+    "mp3_64": ExportTarget("combined_episode_64k.mp3", "mp3", "libmp3lame", "64k", channels=1),
+    "opus": ExportTarget("combined_episode.opus", "opus", "libopus", "48k", sample_rate=48000,
+                         parameters=["-application", "voip"]),
+    "aac": ExportTarget("combined_episode.m4a", "ipod", "aac", "96k", parameters=["-movflags", "+faststart"]),
+}
+
+
+def get_export_targets(names: list[str], base_name: str = "combined_episode") -> list[ExportTarget]:
+    """Look up export presets by name, renaming outputs to share a base filename.
+
+    Args:
+        names (List[str]): Preset names from EXPORT_PRESETS (e.g. ["mp3_128", "opus"]).
+        base_name (str): Output filename stem. Defaults to "combined_episode".
+
+    Returns:
+        List[ExportTarget]: Targets in the requested order.
+
+    Raises:
+        ValueError: If a preset name is unknown.
+    """
+    targets = []
+    for name in names:
+        if name not in EXPORT_PRESETS:
+            raise ValueError(f"Unknown export format '{name}'. Available: {', '.join(EXPORT_PRESETS)}")
+        preset = EXPORT_PRESETS[name]
+        targets.append(replace(preset, filename=preset.filename.replace("combined_episode", base_name, 1)))
+    return targets
+
+
+def load_combined_outputs(audio_dir: str) -> set[str]:
+    """Filenames recorded as combine output in an audio directory."""
+    path = os.path.join(audio_dir, COMBINED_OUTPUTS_FILE)
+    if not os.path.exists(path):
+        return set()
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return set(json.load(f))
+    except (json.JSONDecodeError, OSError):
+        return set()
+
+
+def record_combined_outputs(audio_dir: str, filenames: list[str]) -> None:
+    """Remember output filenames so later runs never mistake them for segments."""
+    outputs = load_combined_outputs(audio_dir) | {os.path.basename(filename) for filename in filenames}
+    os.makedirs(audio_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=audio_dir, suffix=".tmp")
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(sorted(outputs), f)
+    os.replace(tmp_path, os.path.join(audio_dir, COMBINED_OUTPUTS_FILE))
+
+
+def is_combined_output(filename: str, audio_dir: Optional[str] = None) -> bool:
+    """True for files written by combine: combined_episode* renditions and any output name it recorded.
+
+    Args:
+        filename (str): File name or path.
+        audio_dir (str, optional): Directory whose record to check. Defaults to the file's own directory.
+    """
+    name = os.path.basename(filename)
+    if name.startswith(COMBINED_BASE_NAME):
+        return True
+    return name in load_combined_outputs(audio_dir if audio_dir is not None else os.path.dirname(filename) or ".")
+
+
+def list_audio_files(audio_dir: str = "data/audio_output", exclude: Optional[list[str]] = None) -> list[str]:
+    """List the segment MP3 files in the specified audio directory.
+    
+    Combined episodes are left out so a re-run never feeds its own output back in:
+    combined_episode* files, every output name combine recorded in the directory,
+    and the names in exclude.
     
     Args:
         audio_dir (str): Path to the audio directory. Defaults to "data/audio_output".
+        exclude (List[str], optional): Further filenames to leave out (e.g. this run's outputs).
         
     Returns:
-        List[str]: List of MP3 filenames found in the directory.
+        List[str]: List of segment MP3 filenames found in the directory.
         
     Raises:
         FileNotFoundError: If the audio directory doesn't exist.
@@ -23,7 +122,10 @@ def list_audio_files(audio_dir: str = "data/audio_output") -> list[str]:
     mp3_files = glob.glob(os.path.join(audio_dir, "*.mp3"))
     
     # Extract just the filenames (without path)
-    filenames = [os.path.basename(file) for file in mp3_files]
+    combined = load_combined_outputs(audio_dir) | {os.path.basename(name) for name in exclude or []}
+    filenames = [os.path.basename(file) for file in mp3_files
+                 if not os.path.basename(file).startswith(COMBINED_BASE_NAME)
+                 and os.path.basename(file) not in combined]
     
     # Sort filenames for consistent ordering
     filenames.sort()
@@ -31,19 +133,136 @@ def list_audio_files(audio_dir: str = "data/audio_output") -> list[str]:
     return filenames
 
 
+def chapter_titles_from_summary(audio_files: list[str], summary_path: str) -> list[str]:
+    """Title each subtopic_NN.mp3 with its subtopic name from summary.json (filename otherwise)."""
+    subtopics = []
+    if os.path.exists(summary_path):
+        with open(summary_path, 'r', encoding='utf-8') as f:
+            subtopics = json.load(f).get("subtopics", [])
+
+    titles = []
+    for filename in audio_files:
+        stem = os.path.splitext(filename)[0]
+        number = stem.rsplit("_", 1)[-1]
+        if number.isdigit() and 0 < int(number) <= len(subtopics):
+            titles.append(subtopics[int(number) - 1])
+        else:
+            titles.append(stem)
+    return titles
+
+
+def build_chapters(durations_ms: list[float], titles: list[str]) -> list[Chapter]:
+    """Lay chapters end to end from per-segment durations, rounding only the boundaries."""
+    chapters = []
+    start = 0.0
+    for duration, title in zip(durations_ms, titles):
+        end = start + duration
+        chapters.append(Chapter(title, int(round(start)), int(round(end))))
+        start = end
+    return chapters
+
+
+def encode_pcm(pcm: bytes, sample_rate: int, channels: int, output_path: str, target: ExportTarget,
+                metadata: Optional[dict[str, str]] = None) -> str:
+    """Encode raw 16-bit PCM into one export target with a single ffmpeg process."""
+    command = [
+        get_encoder_name(), "-y", "-loglevel", "error",
+        "-f", "s16le", "-ar", str(sample_rate), "-ac", str(channels), "-i", "pipe:0",
+        "-c:a", target.codec
+    ]
+    if target.bitrate:
+        command += ["-b:a", target.bitrate]
+    if target.channels:
+        command += ["-ac", str(target.channels)]
+    if target.sample_rate:
+        command += ["-ar", str(target.sample_rate)]
+    command += target.parameters
+    if target.format == "mp3":
+        command += ["-id3v2_version", "3"]
+    for key, value in (metadata or {}).items():
+        command += ["-metadata", f"{key}={value}"]
+    command += ["-f", target.format, output_path]
+
+    result = subprocess.run(command, input=pcm, capture_output=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Encoding {output_path} failed: {result.stderr.decode(errors='replace').strip()}")
+    return output_path
+
+
+def export_targets(
+    audio: AudioSegment,
+    targets: list[ExportTarget],
+    audio_dir: str = "data/audio_output",
+    metadata: Optional[dict[str, str]] = None) -> list[str]:
+    """Encode decoded audio into several renditions in parallel.
+
+    The PCM buffer is produced once and piped into one ffmpeg encoder per target,
+    so the cost is one decode plus N concurrent encodes.
+
+    Args:
+        audio (AudioSegment): Decoded audio to export.
+        targets (List[ExportTarget]): Renditions to produce.
+        audio_dir (str): Output directory. Defaults to "data/audio_output".
+        metadata (Dict[str, str], optional): Tags (title, artist, album, ...) written to every output.
+
+    Returns:
+        List[str]: Output paths in the same order as targets.
+    """
+    audio = audio.set_sample_width(2)
+    return export_pcm(audio.raw_data, audio.frame_rate, audio.channels, targets, audio_dir, metadata)
+
+
+def export_pcm(
+    pcm: bytes,
+    sample_rate: int,
+    channels: int,
+    targets: list[ExportTarget],
+    audio_dir: str = "data/audio_output",
+    metadata: Optional[dict[str, str]] = None) -> list[str]:
+    """Encode raw 16-bit PCM into several renditions in parallel.
+
+    Args:
+        pcm (bytes): Interleaved 16-bit samples.
+        sample_rate (int): Sample rate of the PCM.
+        channels (int): Channel count of the PCM.
+        targets (List[ExportTarget]): Renditions to produce.
+        audio_dir (str): Output directory. Defaults to "data/audio_output".
+        metadata (Dict[str, str], optional): Tags written to every output.
+
+    Returns:
+        List[str]: Output paths in the same order as targets.
+    """
+    os.makedirs(audio_dir, exist_ok=True)
+
+    with ThreadPoolExecutor(max_workers=len(targets)) as executor:
+        futures = [
+            executor.submit(encode_pcm, pcm, sample_rate, channels,
+                            os.path.join(audio_dir, target.filename), target, metadata)
+            for target in targets
+        ]
+        return [future.result() for future in futures]
+
+
 def combine_audio_files(
     input_files: list[str], 
     output_filename: str = "combined_episode.mp3",
-    audio_dir: str = "data/audio_output") -> str:
+    audio_dir: str = "data/audio_output",
+    targets: Optional[list[ExportTarget]] = None,
+    metadata: Optional[dict[str, str]] = None,
+    chapter_titles: Optional[list[str]] = None) -> str:
     """Combine multiple MP3 files into a single MP3 file.
     
     Args:
         input_files (List[str]): List of MP3 filenames to combine.
         output_filename (str): Name of the output combined file. Defaults to "combined_episode.mp3".
         audio_dir (str): Directory containing the input audio files. Defaults to "data/audio_output".
+        targets (List[ExportTarget], optional): Renditions to encode from the single decode.
+            Defaults to one 128k MP3 named output_filename.
+        metadata (Dict[str, str], optional): Tags written to every rendition.
+        chapter_titles (List[str], optional): One chapter title per input file. Defaults to the filenames.
         
     Returns:
-        str: Path to the combined audio file.
+        str: Path to the combined audio file (the first target).
         
     Raises:
         FileNotFoundError: If any of the input files don't exist.
@@ -62,43 +281,78 @@ def combine_audio_files(
     
     print(f"Combining {len(input_files)} audio files...")
     
-    # Load the first audio file
-    combined = AudioSegment.from_mp3(input_paths[0])
-    print(f"Loaded: {input_files[0]}")
+    # Exact segment durations from the frame headers, before anything is decoded
+    durations_ms: list[Optional[float]] = []
+    for file_path in input_paths:
+        try:
+            durations_ms.append(scan_mp3(file_path).duration_ms)
+        except ValueError as e:
+            print(f"Could not scan {file_path} ({e}); using its decoded length")
+            durations_ms.append(None)
+    if None not in durations_ms:
+        print(f"Episode length from frame headers: {format_ms(sum(durations_ms))}")
     
-    # Append each subsequent audio file
-    for i, file_path in enumerate(input_paths[1:], 1):
-        audio = AudioSegment.from_mp3(file_path)
-        combined += audio
-        print(f"Added: {input_files[i]}")
+    # Decoded PCM comes from the sidecar cache; only new or changed segments are decoded
+    cache = get_pcm_cache(audio_dir)
+    with ThreadPoolExecutor(max_workers=min(4, len(input_paths))) as executor:
+        segments = list(executor.map(cache.get, input_paths))
+    for i, segment in enumerate(segments):
+        durations_ms[i] = durations_ms[i] if durations_ms[i] is not None else segment.duration_ms
+        print(f"Loaded: {input_files[i]}")
     
-    # Create output directory if it doesn't exist
-    os.makedirs(audio_dir, exist_ok=True)
+    if not targets:
+        targets = [ExportTarget(output_filename)]
+    # Recorded before encoding, so even an interrupted export is never picked up as a segment
+    record_combined_outputs(audio_dir, [target.filename for target in targets])
     
-    # Save the combined audio
-    output_path = os.path.join(audio_dir, output_filename)
-    combined.export(output_path, format="mp3")
+    total_seconds = sum(segment.duration_ms for segment in segments) / 1000
+    with stage_timer("encode", audio_seconds=total_seconds, targets=len(targets)):
+        layouts = {(segment.sample_rate, segment.channels) for segment in segments}
+        if len(layouts) == 1:
+            # Same layout throughout: join the memmaps directly and encode every rendition in parallel
+            sample_rate, channels = layouts.pop()
+            pcm = np.concatenate([segment.samples for segment in segments]).tobytes()
+            output_paths = export_pcm(pcm, sample_rate, channels, targets, audio_dir, metadata)
+        else:
+            # Mixed sample rates or channels: let pydub convert while joining
+            combined = AudioSegment.empty()
+            for segment in segments:
+                combined += segment.to_segment()
+            output_paths = export_targets(combined, targets, audio_dir, metadata)
     
-    print(f"Combined audio saved to: {output_path}")
-    print(f"Total duration: {len(combined) / 1000:.2f} seconds")
+    # Chapter navigation for the MP3 renditions (they share the same timeline)
+    chapters = build_chapters(durations_ms, chapter_titles or [os.path.splitext(f)[0] for f in input_files])
+    for target, output_path in zip(targets, output_paths):
+        if target.format == "mp3":
+            write_chapters(output_path, chapters, toc_title=(metadata or {}).get("title"))
     
-    return output_path
+    for output_path in output_paths:
+        print(f"Combined audio saved to: {output_path}")
+    print(f"Total duration: {total_seconds:.2f} seconds ({len(chapters)} chapters)")
+    
+    return output_paths[0]
 
 
 def combine_all_audio_in_directory(
     output_filename: str = "combined_episode.mp3",
-    audio_dir: str = "data/audio_output") -> str:
+    audio_dir: str = "data/audio_output",
+    targets: Optional[list[ExportTarget]] = None,
+    metadata: Optional[dict[str, str]] = None,
+    summary_path: Optional[str] = None) -> str:
     """Combine all MP3 files in the audio directory into one file.
     
     Args:
         output_filename (str): Name of the output combined file. Defaults to "combined_episode.mp3".
         audio_dir (str): Directory containing the audio files. Defaults to "data/audio_output".
+        targets (List[ExportTarget], optional): Renditions to encode. Defaults to a single MP3.
+        metadata (Dict[str, str], optional): Tags written to every rendition.
+        summary_path (str, optional): summary.json whose subtopic names title the chapters.
         
     Returns:
         str: Path to the combined audio file.
     """
-    # Get all MP3 files in the directory
-    audio_files = list_audio_files(audio_dir)
+    # Get all MP3 files in the directory, leaving out this run's own outputs
+    audio_files = list_audio_files(audio_dir, exclude=[output_filename, *(target.filename for target in targets or [])])
     
     if not audio_files:
         raise ValueError(f"No MP3 files found in {audio_dir}")
@@ -106,7 +360,8 @@ def combine_all_audio_in_directory(
     print(f"Found {len(audio_files)} MP3 files: {audio_files}")
     
     # Combine all files
-    return combine_audio_files(audio_files, output_filename, audio_dir)
+    chapter_titles = chapter_titles_from_summary(audio_files, summary_path) if summary_path else None
+    return combine_audio_files(audio_files, output_filename, audio_dir, targets, metadata, chapter_titles)
 
 
 if __name__ == "__main__":
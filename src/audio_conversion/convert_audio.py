@@ -1,25 +1,38 @@
 import os
 import json
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Union
 from src.startup.load_config import *
-from elevenlabs.client import ElevenLabs
-
-
-api_key = os.getenv("ELEVENLABS_API_KEY")
-
-if not api_key:
-    raise ValueError("ELEVENLABS_API_KEY environment variable is not set. Please check your .env file or environment variables.")
-
-
-def convert_text(text: str = None, input_file_name: str = None, output_file_name: str = "output.mp3"):
+from src.audio_conversion.tts_backends import TTSBackend, get_backend
+from src.audio_conversion.dialogue import convert_dialogue_files
+from src.audio_conversion.hls import HLSWriter
+from src.audio_conversion.text_preprocessing import DEFAULT_PREPROCESSOR, TextPreprocessor
+from src.pipeline.hedging import HedgePolicy
+from src.pipeline.metrics import stage_timer
+
+
+def convert_text(
+    text: str = None,
+    input_file_name: str = None,
+    output_file_name: str = "output.mp3",
+    backend: Union[str, TTSBackend] = "elevenlabs",
+    preprocessor: Optional[TextPreprocessor] = DEFAULT_PREPROCESSOR,
+    text_dir: str = "data/text_output",
+    audio_dir: str = "data/audio_output"):
     """Convert text to speech and output an MP3 file.
     
     Either provide text directly or specify a text file to read from. The function
-    will convert the text to speech using ElevenLabs API and save the audio as an MP3 file.
+    will convert the text to speech using the selected TTS backend and save the audio as an MP3 file.
 
     Args:
         text (str, optional): Text string to convert to speech. Defaults to None.
         input_file_name (str, optional): Name of text file in data/text_output/ directory to convert. Defaults to None.
         output_file_name (str, optional): Name of the output MP3 file. Defaults to "output.mp3".
+        backend (str | TTSBackend, optional): Registered backend name or backend instance. Defaults to "elevenlabs".
+        preprocessor (TextPreprocessor, optional): Cleanup applied before synthesis. None sends the text as-is.
+        text_dir (str, optional): Directory input_file_name is read from. Defaults to "data/text_output".
+        audio_dir (str, optional): Directory the MP3 is written to. Defaults to "data/audio_output".
 
     Returns:
         None: Saves the audio file to data/audio_output/ directory.
@@ -32,7 +45,7 @@ def convert_text(text: str = None, input_file_name: str = None, output_file_name
     Note:
         - Exactly one of text or input_file_name must be provided
         - Output files are saved to data/audio_output/ directory
-        - Uses ElevenLabs text-to-speech API with voice_id "bIHbv24MWmeRgasZH58o"
+        - The default "elevenlabs" backend uses voice_id "bIHbv24MWmeRgasZH58o"
     """
     # Validate that exactly one input method is provided
     if text is not None and input_file_name is not None:
@@ -43,51 +56,77 @@ def convert_text(text: str = None, input_file_name: str = None, output_file_name
     
     # If input_file_name is provided, read the text from file
     if input_file_name is not None:
-        input_file_path = os.path.join("data", "text_output", input_file_name)
+        input_file_path = os.path.join(text_dir, input_file_name)
         if not os.path.exists(input_file_path):
             raise FileNotFoundError(f"Input file not found: {input_file_path}")
         
         with open(input_file_path, 'r', encoding='utf-8') as f:
             text = f.read().strip()
     
-    elevenlabs = ElevenLabs(api_key=api_key)
+    # Strip formatting and normalize the text for speech before it is billed
+    if preprocessor is not None:
+        result = preprocessor.process(text)
+        text = result.text
+        print(result.report(input_file_name or "text"))
+    
+    if isinstance(backend, str):
+        backend = get_backend(backend)
 
-    audio = elevenlabs.text_to_speech.convert(
-        text=text,
-        voice_id="bIHbv24MWmeRgasZH58o",
-        model_id="eleven_turbo_v2_5", # or for better quality model_id="eleven_multilingual_v2",
-        output_format="mp3_44100_128",
-        seed=42
-    )
+    with stage_timer("tts", backend=backend.name, characters=len(text), hedged=getattr(backend, "hedged", False)):
+        audio = backend.synthesize(text)
 
     # Create data directory if it doesn't exist
-    data_dir = "data/audio_output"
-    os.makedirs(data_dir, exist_ok=True)
+    os.makedirs(audio_dir, exist_ok=True)
 
     # Save audio to file in data directory
-    output_file = os.path.join(data_dir, output_file_name)
-    
-    # Collect all audio chunks first to ensure complete download
-    audio_chunks = []
-    for chunk in audio:
-        audio_chunks.append(chunk)
+    output_file = os.path.join(audio_dir, output_file_name)
     
-    # Write the complete audio data
-    with open(output_file, "wb") as f:
-        for chunk in audio_chunks:
-            f.write(chunk)
+    # Write the complete audio data; the rename keeps readers (and other workers) from seeing a partial file
+    fd, tmp_file = tempfile.mkstemp(dir=audio_dir, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(audio)
+    os.replace(tmp_file, output_file)
     
     print(f"Audio saved to: {output_file}")
 
 
-def convert_all_subtopics(summary_file: str = "summary.json"):
+def convert_all_subtopics(
+    summary_file: str = "summary.json",
+    backend: Union[str, TTSBackend] = "elevenlabs",
+    fallback_backend: Optional[str] = None,
+    voices: Optional[dict[str, str]] = None,
+    turn_gap_ms: int = 350,
+    max_workers: int = 4,
+    hls_dir: Optional[str] = None,
+    segment_seconds: float = 6.0,
+    preprocessor: Optional[TextPreprocessor] = DEFAULT_PREPROCESSOR,
+    text_dir: str = "data/text_output",
+    audio_dir: str = "data/audio_output",
+    hedge: Optional[HedgePolicy] = None,
+    on_file_ready: Optional[Callable[[str], None]] = None):
     """Convert all subtopics from a summary.json file to MP3 files.
     
     Reads the summary.json file and converts each subtopic text file to an MP3 audio file.
-    Output files are named with the subtopic number.
+    Output files are named with the subtopic number. Dialogue episodes (summary format
+    "dialogue") are rendered turn by turn with one voice per speaker.
 
     Args:
         summary_file (str): Path to the summary.json file. Defaults to "summary.json".
+        backend (str | TTSBackend): Name of the TTS backend to use, or a ready backend instance. Defaults to "elevenlabs".
+        fallback_backend (str, optional): Backend to switch to after repeated failures of the primary.
+        voices (Dict[str, str], optional): Speaker → voice overrides for dialogue episodes.
+        turn_gap_ms (int): Silence between dialogue turns in milliseconds. Defaults to 350.
+        max_workers (int): Maximum concurrent TTS requests (subtopics or dialogue turns). Defaults to 4.
+        hls_dir (str, optional): When set, also stream the episode as HLS segments and a playlist
+            into this directory as each subtopic finishes.
+        segment_seconds (float): Length of each HLS segment in seconds. Defaults to 6.0.
+        preprocessor (TextPreprocessor, optional): Cleanup applied before synthesis. None disables it.
+        text_dir (str): Directory with summary.json and the subtopic files. Defaults to "data/text_output".
+        audio_dir (str): Directory the MP3 files are written to. Defaults to "data/audio_output".
+        hedge (HedgePolicy, optional): Opt-in hedging of slow TTS requests (only when backend is a name).
+        on_file_ready (Callable[[str], None], optional): Called with each MP3 path, in subtopic order, once it
+            is written. Raising from it (e.g. a cancelled job) stops the conversion before the remaining
+            subtopics are synthesized.
 
     Returns:
         None: Saves MP3 files to data/audio_output/ directory.
@@ -97,7 +136,7 @@ def convert_all_subtopics(summary_file: str = "summary.json"):
         KeyError: If summary.json is missing required fields.
     """
     # Read the summary file
-    summary_path = os.path.join("data", "text_output", summary_file)
+    summary_path = os.path.join(text_dir, summary_file)
     if not os.path.exists(summary_path):
         raise FileNotFoundError(f"Summary file not found: {summary_path}")
     
@@ -114,21 +153,79 @@ def convert_all_subtopics(summary_file: str = "summary.json"):
     
     print(f"Converting {len(subtopic_files)} subtopics for topic: {topic}")
     
-    # Convert each subtopic file
-    for text_file in subtopic_files:
+    # Build the backend once so clients and fallback state are shared across files
+    if isinstance(backend, str):
+        tts_backend = get_backend(backend, fallback=fallback_backend, hedge=hedge)
+    else:
+        tts_backend = backend
+    
+    # Progressive output: segments are published as soon as each subtopic is ready
+    hls_writer = HLSWriter(hls_dir, segment_seconds) if hls_dir else None
+    if hls_writer:
+        print(f"Streaming HLS playlist to: {hls_writer.playlist_path}")
+    
+    def file_ready(path: str) -> None:
+        if hls_writer:
+            hls_writer.add_audio(path)
+        if on_file_ready is not None:
+            on_file_ready(path)
+
+    if summary.get('format') == 'dialogue':
+        convert_dialogue_files(
+            subtopic_files,
+            tts_backend,
+            speakers=summary.get('speakers'),
+            voices=voices,
+            turn_gap_ms=turn_gap_ms,
+            max_workers=max_workers,
+            on_file_ready=file_ready,
+            preprocessor=preprocessor,
+            text_dir=text_dir,
+            audio_dir=audio_dir
+        )
+    else:
+        _convert_monologue_files(subtopic_files, tts_backend, file_ready, preprocessor, max_workers,
+                                 text_dir, audio_dir)
+    
+    if hls_writer:
+        hls_writer.finalize()
+    
+    print(f"\nBatch conversion complete. Generated {len(subtopic_files)} MP3 files.")
+
+
+def _convert_monologue_files(subtopic_files: list[str], tts_backend: TTSBackend, on_file_ready=None,
+                             preprocessor: Optional[TextPreprocessor] = DEFAULT_PREPROCESSOR,
+                             max_workers: int = 4, text_dir: str = "data/text_output",
+                             audio_dir: str = "data/audio_output"):
+    """Convert single-voice subtopic files concurrently, reporting each finished MP3 in order."""
+    def convert_one(text_file: str) -> str:
         # Generate output filename (replace .txt with .mp3)
         output_filename = text_file.replace('.txt', '.mp3')
-        
         print(f"Converting: {text_file} → {output_filename}")
+        convert_text(input_file_name=text_file, output_file_name=output_filename,
+                     backend=tts_backend, preprocessor=preprocessor, text_dir=text_dir, audio_dir=audio_dir)
+        return output_filename
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(convert_one, text_file) for text_file in subtopic_files]
         
+        # Walk results in subtopic order so progressive consumers see the episode in sequence
         try:
-            # Convert the text file to audio
-            convert_text(input_file_name=text_file, output_file_name=output_filename)
-            print(f"Completed: {output_filename}")
-        except Exception as e:
-            print(f"Failed to convert {text_file}: {e}")
-    
-    print(f"\nBatch conversion complete. Generated {len(subtopic_files)} MP3 files.")
+            for text_file, future in zip(subtopic_files, futures):
+                try:
+                    output_filename = future.result()
+                    print(f"Completed: {output_filename}")
+                except Exception as e:
+                    print(f"Failed to convert {text_file}: {e}")
+                    continue
+
+                if on_file_ready is not None:
+                    on_file_ready(os.path.join(audio_dir, output_filename))
+        except BaseException:
+            # on_file_ready stopped the run (e.g. a cancelled job): skip the subtopics not started yet
+            for future in futures:
+                future.cancel()
+            raise
 
 
 if __name__ == '__main__':
@@ -0,0 +1,360 @@
+import io
+import os
+import re
+import tempfile
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Callable, NamedTuple, Optional
+
+from pydub import AudioSegment
+
+from src.audio_conversion.audio_cache import AudioCache
+from src.audio_conversion.mp3_info import scan_mp3
+from src.audio_conversion.text_preprocessing import DEFAULT_PREPROCESSOR, TextPreprocessor
+from src.audio_conversion.tts_backends import TTSBackend, backend_identity, synthesize_with_source
+from src.pipeline.metrics import stage_timer
+
+
+SPEAKER_LINE_PATTERN = re.compile(r"^\s*([A-Za-z][\w .'-]{0,30}?)\s*:\s*(.*)$")
+
+
+class Turn(NamedTuple):
+    """A single speaker turn in a dialogue script."""
+    speaker: str
+    text: str
+
+
+def parse_turns(text: str, speakers: Optional[list[str]] = None) -> list[Turn]:
+    """Split a speaker-tagged script ("HOST: ...") into ordered turns.
+
+    Untagged lines continue the previous turn, and consecutive turns by the same
+    speaker are merged so that each one becomes a single TTS request.
+
+    Args:
+        text (str): Dialogue script with one "SPEAKER: line" per turn.
+        speakers (List[str], optional): Known speaker tags. When given, only these
+            tags start a new turn, so colons inside sentences are left alone.
+
+    Returns:
+        List[Turn]: Turns in script order.
+    """
+    known = {s.upper() for s in speakers} if speakers else None
+    turns: list[Turn] = []
+
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+
+        match = SPEAKER_LINE_PATTERN.match(line)
+        if match and (known is None or match.group(1).upper() in known):
+            speaker, content = match.group(1).upper(), match.group(2).strip()
+        elif turns:
+            speaker, content = turns[-1].speaker, line
+        else:
+            # Leading untagged text belongs to the first known speaker
+            speaker, content = (speakers[0].upper() if speakers else "HOST"), line
+
+        if not content:
+            continue
+        if turns and turns[-1].speaker == speaker:
+            turns[-1] = Turn(speaker, f"{turns[-1].text} {content}")
+        else:
+            turns.append(Turn(speaker, content))
+
+    return turns
+
+
+def assign_voices(speakers: list[str], backend: TTSBackend, voices: Optional[dict[str, str]] = None) -> dict[str, Optional[str]]:
+    """Map each speaker to a voice, using configured voices first and backend defaults after.
+
+    Args:
+        speakers (List[str]): Speaker tags in order of appearance.
+        backend (TTSBackend): Backend whose default dialogue voices fill the gaps.
+        voices (Dict[str, str], optional): Explicit speaker → voice overrides.
+
+    Returns:
+        Dict[str, Optional[str]]: Voice per upper-cased speaker tag. None means the backend default.
+    """
+    voices = {k.upper(): v for k, v in (voices or {}).items()}
+    defaults = backend.dialogue_voices
+    assigned = {}
+    for i, speaker in enumerate(speakers):
+        speaker = speaker.upper()
+        if speaker in voices:
+            assigned[speaker] = voices[speaker]
+        elif defaults:
+            assigned[speaker] = defaults[i % len(defaults)]
+        else:
+            assigned[speaker] = None
+    return assigned
+
+
+def submit_turns(
+    scripts: dict[str, list[Turn]],
+    backend: TTSBackend,
+    voices: dict[str, Optional[str]],
+    executor: Executor,
+    cache: Optional[AudioCache] = None) -> dict[tuple[Optional[str], str], Future]:
+    """Queue every unique turn of one or more scripts for synthesis, in script order.
+
+    Identical (voice, text) pairs across all scripts are requested once, and lines
+    already in the audio cache are not requested at all. Each clip is cached under
+    the backend that actually produced it, so audio from a fallback engine is
+    never reused as if the primary had rendered it.
+
+    Args:
+        scripts (Dict[str, List[Turn]]): Turns keyed by script name (e.g. subtopic file).
+        backend (TTSBackend): Backend used for synthesis.
+        voices (Dict[str, Optional[str]]): Voice per speaker tag.
+        executor (Executor): Pool the requests run on; earlier scripts are requested first.
+        cache (AudioCache, optional): Cache used to dedupe lines across runs.
+
+    Returns:
+        Dict[Tuple[Optional[str], str], Future]: MP3 bytes per (voice, text).
+    """
+    cache = cache or AudioCache()
+    pending = list(dict.fromkeys((voices.get(turn.speaker), turn.text)
+                                 for turns in scripts.values() for turn in turns))
+
+    def render(line: tuple[Optional[str], str]) -> bytes:
+        voice, text = line
+        # Look up under the backend active right now; a fallback switch changes it
+        audio = cache.get(AudioCache.make_key(backend_identity(backend), voice, text))
+        if audio is None:
+            with stage_timer("tts", backend=backend.name, characters=len(text),
+                             hedged=getattr(backend, "hedged", False)):
+                audio, source = synthesize_with_source(backend, text, voice)
+            cache.put(AudioCache.make_key(source, voice, text), audio)
+        return audio
+
+    total_turns = sum(len(turns) for turns in scripts.values())
+    print(f"Synthesizing {len(pending)} unique turns ({total_turns} total)...")
+    return {line: executor.submit(render, line) for line in pending}
+
+
+def collect_turns(
+    turns: list[Turn],
+    voices: dict[str, Optional[str]],
+    futures: dict[tuple[Optional[str], str], Future],
+    segments: dict[tuple[Optional[str], str], AudioSegment]) -> int:
+    """Wait for one script's turns and decode them into segments (shared across scripts).
+
+    Returns:
+        int: Number of turns whose synthesis failed.
+    """
+    failed = 0
+    for line in dict.fromkeys((voices.get(turn.speaker), turn.text) for turn in turns):
+        if line in segments:
+            continue
+        try:
+            segments[line] = AudioSegment.from_file(io.BytesIO(futures[line].result()), format="mp3")
+        except Exception as e:
+            print(f"Failed to synthesize turn \"{line[1][:40]}\": {e}")
+            failed += 1
+    return failed
+
+
+def synthesize_turns(
+    scripts: dict[str, list[Turn]],
+    backend: TTSBackend,
+    voices: dict[str, Optional[str]],
+    cache: Optional[AudioCache] = None,
+    max_workers: int = 4) -> dict[tuple[Optional[str], str], AudioSegment]:
+    """Synthesize every unique turn of one or more scripts in a single parallel batch.
+
+    Args:
+        scripts (Dict[str, List[Turn]]): Turns keyed by script name (e.g. subtopic file).
+        backend (TTSBackend): Backend used for synthesis.
+        voices (Dict[str, Optional[str]]): Voice per speaker tag.
+        cache (AudioCache, optional): Cache used to dedupe lines across runs.
+        max_workers (int): Maximum concurrent TTS requests. Defaults to 4.
+
+    Returns:
+        Dict[Tuple[Optional[str], str], AudioSegment]: Decoded audio keyed by (voice, text).
+            Lines whose synthesis failed are left out.
+    """
+    segments = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = submit_turns(scripts, backend, voices, executor, cache)
+        for turns in scripts.values():
+            collect_turns(turns, voices, futures, segments)
+    return segments
+
+
+def assemble_dialogue(
+    turns: list[Turn],
+    segments: dict[tuple[Optional[str], str], AudioSegment],
+    voices: dict[str, Optional[str]],
+    turn_gap_ms: int = 350,
+    speaker_change_gap_ms: Optional[int] = None) -> AudioSegment:
+    """Concatenate synthesized turns in script order with configurable gaps.
+
+    Args:
+        turns (List[Turn]): Turns in script order.
+        segments (Dict[Tuple[Optional[str], str], AudioSegment]): Audio keyed by (voice, text), from synthesize_turns.
+        voices (Dict[str, Optional[str]]): Voice per speaker tag.
+        turn_gap_ms (int): Silence inserted between turns. Defaults to 350.
+        speaker_change_gap_ms (int, optional): Silence used when the speaker changes. Defaults to turn_gap_ms.
+
+    Returns:
+        AudioSegment: The assembled dialogue.
+    """
+    if speaker_change_gap_ms is None:
+        speaker_change_gap_ms = turn_gap_ms
+
+    combined = AudioSegment.empty()
+    previous_speaker = None
+    for turn in turns:
+        if previous_speaker is not None:
+            gap = speaker_change_gap_ms if turn.speaker != previous_speaker else turn_gap_ms
+            combined += AudioSegment.silent(duration=gap)
+        combined += segments[(voices.get(turn.speaker), turn.text)]
+        previous_speaker = turn.speaker
+    return combined
+
+
+def read_scripts(
+    text_files: list[str],
+    speakers: Optional[list[str]] = None,
+    text_dir: str = "data/text_output",
+    preprocessor: Optional[TextPreprocessor] = DEFAULT_PREPROCESSOR,
+    verbose: bool = True) -> dict[str, list[Turn]]:
+    """Read subtopic files and split them into turns, exactly as they are synthesized.
+
+    Raises:
+        FileNotFoundError: If a text file does not exist.
+    """
+    scripts = {}
+    for text_file in text_files:
+        input_file_path = os.path.join(text_dir, text_file)
+        if not os.path.exists(input_file_path):
+            raise FileNotFoundError(f"Input file not found: {input_file_path}")
+        with open(input_file_path, 'r', encoding='utf-8') as f:
+            script = f.read()
+        if preprocessor is not None:
+            result = preprocessor.process(script)
+            script = result.text
+            if verbose:
+                print(result.report(text_file))
+        scripts[text_file] = parse_turns(script, speakers)
+    return scripts
+
+
+def script_voices(
+    scripts: dict[str, list[Turn]],
+    backend: TTSBackend,
+    speakers: Optional[list[str]] = None,
+    voices: Optional[dict[str, str]] = None) -> dict[str, Optional[str]]:
+    """Assign voices to every speaker appearing in the scripts."""
+    # Speakers in order of first appearance, so the host keeps the first voice
+    ordered_speakers = list(speakers or [])
+    for turns in scripts.values():
+        for turn in turns:
+            if turn.speaker not in {s.upper() for s in ordered_speakers}:
+                ordered_speakers.append(turn.speaker)
+    return assign_voices(ordered_speakers, backend, voices)
+
+
+def turn_spans(
+    turns: list[Turn],
+    identity: str,
+    voices: dict[str, Optional[str]],
+    turn_gap_ms: int = 350,
+    cache: Optional[AudioCache] = None) -> list[tuple[Turn, str, float, float]]:
+    """Locate each turn inside an assembled dialogue from its cached audio.
+
+    Durations come from the cached MP3 frame headers, so nothing is decoded.
+
+    Args:
+        turns (List[Turn]): Turns in script order.
+        identity (str): backend_identity() of the backend the turns were cached under.
+        voices (Dict[str, Optional[str]]): Voice per speaker tag.
+        turn_gap_ms (int): Silence between turns used when assembling. Defaults to 350.
+        cache (AudioCache, optional): Cache holding the turn audio.
+
+    Returns:
+        List[Tuple[Turn, str, float, float]]: Turn, cache key, start and end in seconds.
+            Turns missing from the cache get zero length.
+    """
+    cache = cache or AudioCache()
+    spans = []
+    position = 0.0
+    for i, turn in enumerate(turns):
+        if i:
+            position += turn_gap_ms / 1000
+        key = AudioCache.make_key(identity, voices.get(turn.speaker), turn.text)
+        path = cache.path(key)
+        duration = scan_mp3(path).duration_ms / 1000 if path else 0.0
+        spans.append((turn, key, position, position + duration))
+        position += duration
+    return spans
+
+
+def convert_dialogue_files(
+    text_files: list[str],
+    backend: TTSBackend,
+    speakers: Optional[list[str]] = None,
+    voices: Optional[dict[str, str]] = None,
+    turn_gap_ms: int = 350,
+    max_workers: int = 4,
+    text_dir: str = "data/text_output",
+    audio_dir: str = "data/audio_output",
+    on_file_ready: Optional[Callable[[str], None]] = None,
+    preprocessor: Optional[TextPreprocessor] = DEFAULT_PREPROCESSOR) -> list[str]:
+    """Render speaker-tagged subtopic files to MP3, writing each file as soon as its turns are ready.
+
+    All turns are queued at once in file order, so the pool stays busy, while each
+    file is assembled, written and passed to on_file_ready as soon as its own
+    turns finish. A progressive consumer (HLS) gets subtopic 1 long before the
+    last subtopic has been synthesized.
+
+    Args:
+        text_files (List[str]): Subtopic text filenames in text_dir.
+        backend (TTSBackend): Backend used for synthesis.
+        speakers (List[str], optional): Speaker tags from summary.json.
+        voices (Dict[str, str], optional): Speaker → voice overrides.
+        turn_gap_ms (int): Silence between turns. Defaults to 350.
+        max_workers (int): Maximum concurrent TTS requests. Defaults to 4.
+        text_dir (str): Directory with the text files. Defaults to "data/text_output".
+        audio_dir (str): Directory for MP3 output. Defaults to "data/audio_output".
+        on_file_ready (Callable[[str], None], optional): Called with each MP3 path, in order, once it is written.
+            If it raises, turns not yet started are cancelled and the exception propagates.
+        preprocessor (TextPreprocessor, optional): Cleanup applied to each script before parsing. None disables it.
+
+    Returns:
+        List[str]: Paths of the MP3 files written.
+
+    Raises:
+        FileNotFoundError: If a text file does not exist.
+    """
+    scripts = read_scripts(text_files, speakers, text_dir, preprocessor)
+    speaker_voices = script_voices(scripts, backend, speakers, voices)
+
+    os.makedirs(audio_dir, exist_ok=True)
+    output_files = []
+    segments = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = submit_turns(scripts, backend, speaker_voices, executor)
+        try:
+            for text_file, turns in scripts.items():
+                missing = collect_turns(turns, speaker_voices, futures, segments)
+                if missing:
+                    # Like monologue conversion: a failed file is skipped, the rest of the episode still renders
+                    print(f"Failed to convert {text_file}: {missing} turn(s) could not be synthesized")
+                    continue
+                output_file = os.path.join(audio_dir, text_file.replace('.txt', '.mp3'))
+                dialogue = assemble_dialogue(turns, segments, speaker_voices, turn_gap_ms)
+                fd, tmp_file = tempfile.mkstemp(dir=audio_dir, suffix=".tmp")
+                os.close(fd)
+                dialogue.export(tmp_file, format="mp3", bitrate="128k")
+                os.replace(tmp_file, output_file)
+                print(f"Audio saved to: {output_file} ({len(turns)} turns)")
+                output_files.append(output_file)
+                if on_file_ready is not None:
+                    on_file_ready(output_file)
+        except BaseException:
+            # e.g. on_file_ready cancelled the job: do not pay for turns nobody will assemble
+            for future in futures.values():
+                future.cancel()
+            raise
+    return output_files
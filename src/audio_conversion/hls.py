@@ -0,0 +1,149 @@
+import glob
+import os
+import subprocess
+import tempfile
+from typing import Optional, Union
+
+from pydub import AudioSegment
+from pydub.utils import get_encoder_name
+
+from src.audio_conversion.combine_audio import ExportTarget
+from src.audio_conversion.pcm_cache import load_pcm
+
+
+HLS_SEGMENT_TARGET = ExportTarget("", "mpegts", "aac", "96k")
+
+
+class HLSWriter:
+    """Write an episode as fixed-length HLS segments while it is still being produced.
+
+    Audio is appended one subtopic at a time and piped as PCM into one ffmpeg
+    process for the whole stream, which cuts segments and rewrites the playlist
+    as soon as each segment is complete. Players can start at subtopic 1 while
+    later subtopics are still being synthesized. A single continuous AAC encoder
+    means encoder priming happens once at the start of the stream, not as a gap
+    at every segment boundary. The playlist is an EVENT playlist until
+    finalize() appends #EXT-X-ENDLIST.
+
+    Serve the output directory with any static file server, for example:
+        python -m http.server 8000 --directory data/audio_output/hls
+    """
+
+    def __init__(
+        self,
+        output_dir: str = "data/audio_output/hls",
+        segment_seconds: float = 6.0,
+        playlist_name: str = "episode.m3u8",
+        target: ExportTarget = HLS_SEGMENT_TARGET):
+        self.output_dir = output_dir
+        self.segment_seconds = segment_seconds
+        self.playlist_path = os.path.join(output_dir, playlist_name)
+        self.segment_pattern = os.path.join(output_dir, "segment_%05d.ts")
+        self.target = target
+        self.finished = False
+        self.frame_rate: Optional[int] = None
+        self.channels: Optional[int] = None
+        self._process: Optional[subprocess.Popen] = None
+        self._stderr = None
+
+        os.makedirs(output_dir, exist_ok=True)
+        # Segments left by an earlier run would otherwise be served next to the new playlist
+        for path in glob.glob(os.path.join(output_dir, "segment_*.ts")):
+            os.remove(path)
+        self._write_empty_playlist()
+
+    def _start(self) -> None:
+        command = [
+            get_encoder_name(), "-y", "-loglevel", "error",
+            # Raw PCM needs no probing; probing would hold back the first seconds of audio
+            "-probesize", "32", "-analyzeduration", "0",
+            "-f", "s16le", "-ar", str(self.frame_rate), "-ac", str(self.channels), "-i", "pipe:0",
+            "-c:a", self.target.codec
+        ]
+        if self.target.bitrate:
+            command += ["-b:a", self.target.bitrate]
+        command += self.target.parameters
+        command += [
+            "-f", "hls",
+            "-hls_time", f"{self.segment_seconds:g}",
+            "-hls_list_size", "0",
+            "-hls_playlist_type", "event",
+            "-hls_segment_type", self.target.format,
+            # Segments appear under their final name only once complete
+            "-hls_flags", "temp_file",
+            "-hls_segment_filename", self.segment_pattern,
+            self.playlist_path
+        ]
+        self._stderr = tempfile.TemporaryFile()
+        self._process = subprocess.Popen(command, stdin=subprocess.PIPE, stderr=self._stderr)
+
+    def _error(self) -> str:
+        self._stderr.seek(0)
+        return self._stderr.read().decode(errors="replace").strip()
+
+    def add_audio(self, audio: Union[str, AudioSegment]) -> None:
+        """Append audio (an MP3 path or decoded segment); full segments are published as they are encoded.
+
+        Args:
+            audio (str | AudioSegment): Next piece of the episode, in playback order.
+
+        Raises:
+            RuntimeError: If the playlist is finalized or the encoder stopped.
+        """
+        if self.finished:
+            raise RuntimeError("Cannot add audio to a finalized HLS playlist.")
+        if isinstance(audio, str):
+            audio = load_pcm(audio).to_segment()
+
+        # Keep one PCM layout for the whole stream so segments join seamlessly
+        if self.frame_rate is None:
+            self.frame_rate, self.channels = audio.frame_rate, audio.channels
+            self._start()
+        audio = audio.set_frame_rate(self.frame_rate).set_channels(self.channels).set_sample_width(2)
+
+        try:
+            self._process.stdin.write(audio.raw_data)
+            self._process.stdin.flush()
+        except BrokenPipeError:
+            self._process.wait()
+            raise RuntimeError(f"HLS encoder stopped: {self._error()}")
+
+    def finalize(self) -> str:
+        """Flush the trailing partial segment and close the playlist.
+
+        Returns:
+            str: Path to the finished playlist.
+
+        Raises:
+            RuntimeError: If the encoder failed.
+        """
+        if not self.finished:
+            self.finished = True
+            if self._process is None:
+                self._write_empty_playlist(ended=True)
+            else:
+                self._process.stdin.close()
+                if self._process.wait() != 0:
+                    raise RuntimeError(f"HLS encoding failed: {self._error()}")
+                self._stderr.close()
+        segments = len(glob.glob(os.path.join(self.output_dir, "segment_*.ts")))
+        print(f"HLS playlist complete: {self.playlist_path} ({segments} segments)")
+        return self.playlist_path
+
+    def _write_empty_playlist(self, ended: bool = False) -> None:
+        # Lets players open the stream before the encoder has written its first segment
+        lines = [
+            "#EXTM3U",
+            "#EXT-X-VERSION:3",
+            f"#EXT-X-TARGETDURATION:{max(1, round(self.segment_seconds))}",
+            "#EXT-X-MEDIA-SEQUENCE:0",
+            "#EXT-X-PLAYLIST-TYPE:EVENT"
+        ]
+        if ended:
+            lines.append("#EXT-X-ENDLIST")
+
+        # Replace atomically so a polling player never reads a half-written playlist
+        tmp_path = f"{self.playlist_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, self.playlist_path)
@@ -0,0 +1,173 @@
+import os
+import shutil
+import tempfile
+from typing import NamedTuple, Optional
+
+
+CHAPTER_FRAME_IDS = {b"CHAP", b"CTOC"}
+NO_BYTE_OFFSET = 0xFFFFFFFF
+TOC_ELEMENT_ID = "toc"
+
+
+class Chapter(NamedTuple):
+    """One chapter of an episode, in milliseconds from the start of the audio."""
+    title: str
+    start_ms: int
+    end_ms: int
+
+
+def _syncsafe(value: int) -> bytes:
+    return bytes([(value >> 21) & 0x7F, (value >> 14) & 0x7F, (value >> 7) & 0x7F, value & 0x7F])
+
+
+def _unsyncsafe(data: bytes) -> int:
+    return (data[0] & 0x7F) << 21 | (data[1] & 0x7F) << 14 | (data[2] & 0x7F) << 7 | (data[3] & 0x7F)
+
+
+def _frame(frame_id: bytes, body: bytes, version: int, flags: bytes = b"\x00\x00") -> bytes:
+    size = _syncsafe(len(body)) if version == 4 else len(body).to_bytes(4, "big")
+    return frame_id + size + flags + body
+
+
+def _text_frame(frame_id: bytes, text: str, version: int) -> bytes:
+    # Latin-1 when possible, otherwise UTF-16 with BOM (valid in both v2.3 and v2.4)
+    try:
+        body = b"\x00" + text.encode("latin-1")
+    except UnicodeEncodeError:
+        body = b"\x01" + text.encode("utf-16")
+    return _frame(frame_id, body, version)
+
+
+def _decode_text(body: bytes) -> str:
+    encoding = {0: "latin-1", 1: "utf-16", 2: "utf-16-be", 3: "utf-8"}.get(body[0], "latin-1")
+    return body[1:].decode(encoding, errors="replace").rstrip("\x00")
+
+
+def _read_tag(f) -> tuple[int, int, list[tuple[bytes, bytes, bytes]]]:
+    """Read a leading ID3v2 tag. Returns (major version, total tag size, [(id, flags, body)])."""
+    header = f.read(10)
+    if len(header) < 10 or header[:3] != b"ID3":
+        return 3, 0, []
+
+    version, flags = header[3], header[5]
+    if version not in (3, 4):
+        raise ValueError(f"Unsupported ID3v2.{version} tag; only v2.3 and v2.4 can hold chapters")
+    if flags & 0x80:
+        raise ValueError("Unsynchronised ID3 tags are not supported")
+
+    size = _unsyncsafe(header[6:10])
+    data = f.read(size)
+    total = 10 + size + (10 if flags & 0x10 else 0)
+
+    pos = 0
+    if flags & 0x40:
+        # Skip the extended header; it is not rewritten
+        ext_size = _unsyncsafe(data[0:4]) if version == 4 else int.from_bytes(data[0:4], "big") + 4
+        pos = ext_size
+
+    frames = []
+    while pos + 10 <= len(data) and data[pos] != 0:
+        frame_id = data[pos:pos + 4]
+        raw_size = data[pos + 4:pos + 8]
+        frame_size = _unsyncsafe(raw_size) if version == 4 else int.from_bytes(raw_size, "big")
+        frames.append((frame_id, data[pos + 8:pos + 10], data[pos + 10:pos + 10 + frame_size]))
+        pos += 10 + frame_size
+    return version, total, frames
+
+
+def _chapter_frames(chapters: list[Chapter], version: int, toc_title: Optional[str]) -> bytes:
+    element_ids = [f"chp{i}" for i in range(len(chapters))]
+
+    # CTOC: top-level, ordered table of contents listing every chapter
+    toc_body = TOC_ELEMENT_ID.encode("latin-1") + b"\x00" + bytes([0x03, len(chapters)])
+    toc_body += b"".join(element_id.encode("latin-1") + b"\x00" for element_id in element_ids)
+    if toc_title:
+        toc_body += _text_frame(b"TIT2", toc_title, version)
+    frames = _frame(b"CTOC", toc_body, version)
+
+    for element_id, chapter in zip(element_ids, chapters):
+        body = element_id.encode("latin-1") + b"\x00"
+        body += int(chapter.start_ms).to_bytes(4, "big") + int(chapter.end_ms).to_bytes(4, "big")
+        body += NO_BYTE_OFFSET.to_bytes(4, "big") * 2
+        body += _text_frame(b"TIT2", chapter.title, version)
+        frames += _frame(b"CHAP", body, version)
+    return frames
+
+
+def write_chapters(path: str, chapters: list[Chapter], toc_title: Optional[str] = None, padding: int = 1024) -> None:
+    """Write ID3v2 CHAP/CTOC chapter frames into an MP3, replacing any existing chapters.
+
+    Other tags (title, artist, ...) are kept. The tag is rewritten in place when the
+    new frames fit into its existing padding; otherwise the file is rewritten once.
+
+    Args:
+        path (str): MP3 file to tag.
+        chapters (List[Chapter]): Chapters in playback order.
+        toc_title (str, optional): Title for the table of contents.
+        padding (int): Free bytes left in a rewritten tag for later edits. Defaults to 1024.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        ValueError: If the existing tag cannot be rewritten or there are more than 255 chapters.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Audio file not found: {path}")
+    if len(chapters) > 255:
+        raise ValueError("ID3 tables of contents hold at most 255 chapters")
+
+    with open(path, "rb") as f:
+        version, old_size, frames = _read_tag(f)
+
+    kept = b"".join(_frame(frame_id, body, version, flags)
+                    for frame_id, flags, body in frames if frame_id not in CHAPTER_FRAME_IDS)
+    frame_bytes = kept + _chapter_frames(chapters, version, toc_title)
+
+    if old_size and len(frame_bytes) <= old_size - 10:
+        # Fits in the current tag: overwrite the tag, keep the audio where it is
+        tag = b"ID3" + bytes([version, 0, 0]) + _syncsafe(old_size - 10)
+        with open(path, "r+b") as f:
+            f.write(tag + frame_bytes + b"\x00" * (old_size - 10 - len(frame_bytes)))
+        return
+
+    tag_size = len(frame_bytes) + padding
+    tag = b"ID3" + bytes([version, 0, 0]) + _syncsafe(tag_size)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as out, open(path, "rb") as src:
+            out.write(tag + frame_bytes + b"\x00" * padding)
+            src.seek(old_size)
+            shutil.copyfileobj(src, out, 1024 * 1024)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def read_chapters(path: str) -> list[Chapter]:
+    """Read the CHAP frames of an MP3 in table-of-contents order (empty if it has none)."""
+    with open(path, "rb") as f:
+        version, _, frames = _read_tag(f)
+
+    chapters: dict[str, Chapter] = {}
+    order: list[str] = []
+    for frame_id, _, body in frames:
+        if frame_id == b"CHAP":
+            element_id, _, rest = body.partition(b"\x00")
+            start_ms = int.from_bytes(rest[0:4], "big")
+            end_ms = int.from_bytes(rest[4:8], "big")
+            title = element_id.decode("latin-1")
+            pos = 16
+            while pos + 10 <= len(rest):
+                sub_size = _unsyncsafe(rest[pos + 4:pos + 8]) if version == 4 else int.from_bytes(rest[pos + 4:pos + 8], "big")
+                if rest[pos:pos + 4] == b"TIT2":
+                    title = _decode_text(rest[pos + 10:pos + 10 + sub_size])
+                pos += 10 + sub_size
+            chapters[element_id.decode("latin-1")] = Chapter(title, start_ms, end_ms)
+        elif frame_id == b"CTOC" and not order:
+            _, _, rest = body.partition(b"\x00")
+            entries = rest[2:].split(b"\x00")[:rest[1]]
+            order = [entry.decode("latin-1") for entry in entries]
+
+    ordered = [chapters[element_id] for element_id in order if element_id in chapters]
+    ordered += sorted((c for element_id, c in chapters.items() if element_id not in order), key=lambda c: c.start_ms)
+    return ordered
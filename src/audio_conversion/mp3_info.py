@@ -0,0 +1,219 @@
+import mmap
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+
+# Layer III bitrates (kbps) by bitrate index, for MPEG1 and for MPEG2/2.5
+MPEG1_BITRATES = [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320]
+MPEG2_BITRATES = [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160]
+
+# Sample rates by version bits (0 = MPEG2.5, 2 = MPEG2, 3 = MPEG1) and sample rate index
+SAMPLE_RATES = {
+    3: [44100, 48000, 32000],
+    2: [22050, 24000, 16000],
+    0: [11025, 12000, 8000],
+}
+VERSION_NAMES = {3: "1", 2: "2", 0: "2.5"}
+
+# Encoders that store delay/padding in the info frame (same list ffmpeg honours)
+ENCODER_TAGS = (b"LAME", b"Lavf", b"Lavc")
+
+
+@dataclass
+class FrameHeader:
+    """Fields of one MPEG audio Layer III frame header."""
+    version: int
+    sample_rate: int
+    bitrate_kbps: int
+    channels: int
+    samples: int
+    length: int
+    crc: bool
+
+
+@dataclass
+class Mp3Info:
+    """Layout of an MP3 file computed from its frame headers."""
+    path: str
+    mpeg_version: str
+    sample_rate: int
+    channels: int
+    frames: int
+    audio_bytes: int
+    id3_size: int
+    encoder_delay: int = 0
+    encoder_padding: int = 0
+    samples_per_frame: int = 1152
+
+    @property
+    def samples(self) -> int:
+        """Decoded samples per channel, with encoder delay and padding removed."""
+        return max(0, self.frames * self.samples_per_frame - self.encoder_delay - self.encoder_padding)
+
+    @property
+    def duration_ms(self) -> float:
+        return self.samples * 1000 / self.sample_rate if self.sample_rate else 0.0
+
+    @property
+    def bitrate_kbps(self) -> float:
+        """Average bitrate of the audio frames."""
+        seconds = self.frames * self.samples_per_frame / self.sample_rate if self.sample_rate else 0
+        return self.audio_bytes * 8 / seconds / 1000 if seconds else 0.0
+
+
+def id3v2_size(data) -> int:
+    """Return the size in bytes of a leading ID3v2 tag (0 if there is none)."""
+    if len(data) < 10 or data[:3] != b"ID3":
+        return 0
+    size = (data[6] & 0x7F) << 21 | (data[7] & 0x7F) << 14 | (data[8] & 0x7F) << 7 | (data[9] & 0x7F)
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def parse_frame_header(data, offset: int) -> Optional[FrameHeader]:
+    """Parse the Layer III frame header at offset, or return None if it is not one."""
+    if offset + 4 > len(data) or data[offset] != 0xFF or data[offset + 1] & 0xE0 != 0xE0:
+        return None
+
+    b1, b2, b3 = data[offset + 1], data[offset + 2], data[offset + 3]
+    version = (b1 >> 3) & 0x03
+    layer = (b1 >> 1) & 0x03
+    bitrate_index = b2 >> 4
+    sample_rate_index = (b2 >> 2) & 0x03
+    if version == 1 or layer != 1 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        # Reserved version, not Layer III, free-format/bad bitrate or reserved sample rate
+        return None
+
+    mpeg1 = version == 3
+    bitrate = (MPEG1_BITRATES if mpeg1 else MPEG2_BITRATES)[bitrate_index]
+    sample_rate = SAMPLE_RATES[version][sample_rate_index]
+    padding = (b2 >> 1) & 0x01
+    samples = 1152 if mpeg1 else 576
+    length = (144 if mpeg1 else 72) * bitrate * 1000 // sample_rate + padding
+
+    return FrameHeader(
+        version=version,
+        sample_rate=sample_rate,
+        bitrate_kbps=bitrate,
+        channels=1 if (b3 >> 6) == 3 else 2,
+        samples=samples,
+        length=length,
+        crc=not (b1 & 0x01)
+    )
+
+
+def _read_info_frame(data, offset: int, header: FrameHeader) -> Optional[tuple[int, int]]:
+    """Return (encoder delay, padding) if the frame at offset is a Xing/Info frame, else None."""
+    side_info = (32 if header.channels == 2 else 17) if header.version == 3 else (17 if header.channels == 2 else 9)
+    start = offset + 4 + side_info
+    tag = bytes(data[start:start + 4])
+    if tag not in (b"Xing", b"Info"):
+        return None
+
+    flags = int.from_bytes(data[start + 4:start + 8], "big")
+    lame = start + 8
+    lame += 4 if flags & 0x1 else 0     # frame count
+    lame += 4 if flags & 0x2 else 0     # byte count
+    lame += 100 if flags & 0x4 else 0   # seek table
+    lame += 4 if flags & 0x8 else 0     # quality
+
+    if bytes(data[lame:lame + 4]) not in ENCODER_TAGS or lame + 24 > offset + header.length:
+        return 0, 0
+    packed = int.from_bytes(data[lame + 21:lame + 24], "big")
+    return packed >> 12, packed & 0xFFF
+
+
+def _scan(data, path: str) -> Mp3Info:
+    id3_size = id3v2_size(data)
+    offset = id3_size
+    end = len(data)
+    if end >= 128 and bytes(data[end - 128:end - 125]) == b"TAG":
+        end -= 128  # ID3v1 tag
+
+    first: Optional[FrameHeader] = None
+    frames = 0
+    audio_bytes = 0
+    delay = padding = 0
+
+    synced = True
+    while offset + 4 <= end:
+        header = parse_frame_header(data, offset)
+        if header is not None and not synced:
+            # After junk, only trust a header that is followed by another frame (or the end)
+            following = offset + header.length
+            if following < end and parse_frame_header(data, following) is None:
+                header = None
+        synced = header is not None
+
+        if header is None or offset + header.length > end:
+            # Lost sync (junk or a truncated frame): resync on the next plausible header
+            next_sync = data.find(b"\xff", offset + 1, end)
+            if next_sync == -1 or header is not None:
+                break
+            offset = next_sync
+            continue
+
+        if first is None:
+            first = header
+            info = _read_info_frame(data, offset, header)
+            if info is not None:
+                # The info frame carries no audio; decoders skip it
+                delay, padding = info
+                offset += header.length
+                continue
+
+        frames += 1
+        audio_bytes += header.length
+        offset += header.length
+
+    if first is None:
+        raise ValueError(f"No MPEG Layer III frames found in {path}")
+
+    return Mp3Info(
+        path=path,
+        mpeg_version=VERSION_NAMES[first.version],
+        sample_rate=first.sample_rate,
+        channels=first.channels,
+        frames=frames,
+        audio_bytes=audio_bytes,
+        id3_size=id3_size,
+        encoder_delay=delay,
+        encoder_padding=padding,
+        samples_per_frame=first.samples
+    )
+
+
+def scan_mp3(path: str) -> Mp3Info:
+    """Compute the exact duration of an MP3 by walking its frame headers.
+
+    No audio is decoded, so this takes milliseconds even for multi-hour files.
+    Encoder delay and padding from a LAME/Info frame are subtracted, which
+    matches the duration ffmpeg (and therefore pydub) decodes.
+
+    Args:
+        path (str): MP3 file to scan.
+
+    Returns:
+        Mp3Info: Frame count, sample rate, channels and duration.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        ValueError: If the file contains no Layer III frames.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Audio file not found: {path}")
+    if os.path.getsize(path) == 0:
+        raise ValueError(f"No MPEG Layer III frames found in {path}")
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        return _scan(data, path)
+
+
+def format_ms(milliseconds: float) -> str:
+    """Format milliseconds as H:MM:SS.mmm."""
+    total = int(round(milliseconds))
+    hours, rest = divmod(total, 3_600_000)
+    minutes, rest = divmod(rest, 60_000)
+    seconds, ms = divmod(rest, 1000)
+    return f"{hours}:{minutes:02d}:{seconds:02d}.{ms:03d}"
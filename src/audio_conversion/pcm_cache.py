@@ -0,0 +1,269 @@
+import glob
+import hashlib
+import json
+import os
+import subprocess
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, NamedTuple, Optional
+
+import numpy as np
+from pydub import AudioSegment
+from pydub.utils import get_encoder_name
+
+from src.audio_conversion.mp3_info import scan_mp3
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+
+PCM_CACHE_DIRNAME = ".pcm_cache"
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+INDEX_FILE = "index.json"
+INDEX_LOCK_FILE = "index.lock"
+
+
+class PCMAudio(NamedTuple):
+    """Decoded 16-bit PCM, usually a read-only memmap of a cache sidecar."""
+    samples: np.ndarray
+    sample_rate: int
+    channels: int
+
+    @property
+    def frames(self) -> int:
+        return self.samples.shape[0]
+
+    @property
+    def duration_ms(self) -> float:
+        return self.frames * 1000 / self.sample_rate
+
+    def mono(self) -> np.ndarray:
+        """Samples downmixed to one channel (the memmap itself when already mono)."""
+        if self.channels == 1:
+            return self.samples[:, 0]
+        return self.samples.mean(axis=1).astype(np.int16)
+
+    def to_segment(self) -> AudioSegment:
+        """Wrap the PCM as a pydub AudioSegment without decoding."""
+        return AudioSegment(data=self.samples.tobytes(), sample_width=2,
+                            frame_rate=self.sample_rate, channels=self.channels)
+
+
+def _lock_file(f) -> None:
+    """Block until this process holds an exclusive lock on an open file."""
+    if os.name == "nt":
+        f.seek(0)
+        while True:
+            try:
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                # LK_LOCK gives up after about 10 seconds; keep waiting like flock does
+                continue
+    fcntl.flock(f, fcntl.LOCK_EX)
+
+
+def _unlock_file(f) -> None:
+    if os.name == "nt":
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def file_sha256(path: str) -> str:
+    """Hash a file's content in 1 MB blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class PCMCache:
+    """Decoded-PCM sidecars for MP3 segments, keyed by the MP3 content hash.
+
+    Each MP3 is decoded once into a raw interleaved int16 file named
+    <sha256>_<sample rate>_<channels>.pcm. Later stages (combine, QA, HLS) open it
+    as a read-only NumPy memmap, so they do no decoding and processes share the
+    same pages through the OS page cache.
+
+    An index remembers the hash for each source path with its size and mtime, so
+    unchanged MP3s are not rehashed and a changed MP3 drops its old sidecar.
+    The least recently used sidecars are evicted once the cache exceeds max_bytes.
+    Index updates hold an exclusive file lock (flock, or msvcrt on Windows), so
+    concurrent processes sharing the cache never lose each other's entries.
+    """
+
+    def __init__(self, cache_dir: str = os.path.join("data", "audio_output", PCM_CACHE_DIRNAME),
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(cache_dir, INDEX_FILE)
+        self.lock_path = os.path.join(cache_dir, INDEX_LOCK_FILE)
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Hold the index for a load-modify-save, against other threads and other processes."""
+        # File locks are per open file, so threads of one process still need the thread lock
+        with self._lock, open(self.lock_path, "a") as lock_file:
+            _lock_file(lock_file)
+            try:
+                yield
+            finally:
+                _unlock_file(lock_file)
+
+    def _load_index(self) -> dict:
+        index = {"sources": {}, "last_used": {}}
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    index.update(json.load(f))
+            except (json.JSONDecodeError, OSError):
+                pass
+        return index
+
+    def _save_index(self, index: dict) -> None:
+        # Atomic replace: other processes only ever see a complete index
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, self.index_path)
+
+    def _sidecar(self, key: str) -> Optional[str]:
+        matches = glob.glob(os.path.join(self.cache_dir, f"{key}_*_*.pcm"))
+        return matches[0] if matches else None
+
+    def _source_key(self, path: str, index: dict) -> str:
+        """Content hash of an MP3, reusing the indexed hash while size and mtime are unchanged."""
+        stat = os.stat(path)
+        source = os.path.abspath(path)
+        entry = index["sources"].get(source)
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return entry["key"]
+
+        key = file_sha256(path)
+        if entry and entry["key"] != key:
+            # The MP3 was re-synthesized: its old PCM is stale unless another file shares it
+            still_used = any(e["key"] == entry["key"] for p, e in index["sources"].items() if p != source)
+            if not still_used:
+                self._remove(entry["key"], index)
+        index["sources"][source] = {"key": key, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        return key
+
+    def _remove(self, key: str, index: dict) -> None:
+        sidecar = self._sidecar(key)
+        if sidecar:
+            try:
+                os.remove(sidecar)
+            except FileNotFoundError:
+                pass
+        index["last_used"].pop(key, None)
+
+    def _decode(self, path: str, key: str) -> str:
+        info = scan_mp3(path)
+        command = [get_encoder_name(), "-v", "error", "-i", path, "-f", "s16le", "-acodec", "pcm_s16le",
+                   "-ac", str(info.channels), "-ar", str(info.sample_rate), "pipe:1"]
+        result = subprocess.run(command, capture_output=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"Decoding {path} failed: {result.stderr.decode(errors='replace').strip()}")
+
+        sidecar = os.path.join(self.cache_dir, f"{key}_{info.sample_rate}_{info.channels}.pcm")
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(result.stdout)
+        os.replace(tmp_path, sidecar)
+        return sidecar
+
+    def get(self, path: str) -> PCMAudio:
+        """Return the decoded PCM of an MP3, decoding it only on a cache miss.
+
+        Args:
+            path (str): MP3 file.
+
+        Returns:
+            PCMAudio: Read-only memmap of shape (frames, channels).
+
+        Raises:
+            FileNotFoundError: If the MP3 does not exist.
+        """
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Audio file not found: {path}")
+
+        with self._locked():
+            index = self._load_index()
+            key = self._source_key(path, index)
+            sidecar = self._sidecar(key)
+            if sidecar is not None:
+                index["last_used"][key] = time.time()
+            self._save_index(index)
+
+        if sidecar is None:
+            # Decode outside the lock so several segments can be decoded in parallel
+            sidecar = self._decode(path, key)
+            with self._locked():
+                index = self._load_index()
+                index["last_used"][key] = time.time()
+                self._evict(index, keep=key)
+                self._save_index(index)
+
+        _, sample_rate, channels = os.path.splitext(os.path.basename(sidecar))[0].rsplit("_", 2)
+        channels = int(channels)
+        if os.path.getsize(sidecar) == 0:
+            return PCMAudio(np.zeros((0, channels), dtype=np.int16), int(sample_rate), channels)
+        samples = np.memmap(sidecar, dtype=np.int16, mode="r").reshape(-1, channels)
+        return PCMAudio(samples, int(sample_rate), channels)
+
+    def size_bytes(self) -> int:
+        return sum(os.path.getsize(p) for p in glob.glob(os.path.join(self.cache_dir, "*.pcm")))
+
+    def _evict(self, index: dict, keep: Optional[str] = None, max_bytes: Optional[int] = None) -> None:
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        sidecars = {os.path.basename(p).split("_", 1)[0]: p for p in glob.glob(os.path.join(self.cache_dir, "*.pcm"))}
+        total = sum(os.path.getsize(p) for p in sidecars.values())
+        if total <= max_bytes:
+            return
+
+        # Least recently used first; sidecars missing from the index fall back to their mtime
+        order = sorted(sidecars, key=lambda k: index["last_used"].get(k, os.path.getmtime(sidecars[k])))
+        removed = set()
+        for key in order:
+            if total <= max_bytes:
+                break
+            if key == keep:
+                continue
+            total -= os.path.getsize(sidecars[key])
+            self._remove(key, index)
+            removed.add(key)
+        index["sources"] = {p: e for p, e in index["sources"].items() if e["key"] not in removed}
+
+    def evict(self, max_bytes: Optional[int] = None) -> None:
+        """Shrink the cache to max_bytes (defaults to the configured limit, which is left unchanged)."""
+        with self._locked():
+            index = self._load_index()
+            self._evict(index, max_bytes=max_bytes)
+            self._save_index(index)
+
+
+_CACHES: dict[str, PCMCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def get_pcm_cache(audio_dir: str = "data/audio_output") -> PCMCache:
+    """Return the shared PCM cache stored next to an audio output directory."""
+    cache_dir = os.path.join(audio_dir, PCM_CACHE_DIRNAME)
+    with _CACHES_LOCK:
+        if cache_dir not in _CACHES:
+            _CACHES[cache_dir] = PCMCache(cache_dir)
+        return _CACHES[cache_dir]
+
+
+def load_pcm(path: str) -> PCMAudio:
+    """Decoded PCM for an MP3, cached next to the file it came from."""
+    return get_pcm_cache(os.path.dirname(path) or ".").get(path)
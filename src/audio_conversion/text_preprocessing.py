@@ -0,0 +1,169 @@
+import re
+from dataclasses import dataclass, field
+from typing import Callable, NamedTuple, Optional, Union
+
+
+class PreprocessRule(NamedTuple):
+    """A named, precompiled rewrite applied to text before synthesis."""
+    name: str
+    pattern: re.Pattern
+    replacement: Union[str, Callable[[re.Match], str]]
+
+
+@dataclass
+class PreprocessResult:
+    """Spoken text plus the character accounting for one input."""
+    text: str
+    original_chars: int
+    processed_chars: int
+    rule_hits: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def chars_saved(self) -> int:
+        return self.original_chars - self.processed_chars
+
+    def report(self, label: str) -> str:
+        percent = (self.chars_saved / self.original_chars * 100) if self.original_chars else 0.0
+        hits = ", ".join(f"{name}={count}" for name, count in self.rule_hits.items()
+                         if count and name not in WHITESPACE_RULES)
+        return f"Preprocessed {label}: {self.original_chars} → {self.processed_chars} chars " \
+               f"(saved {self.chars_saved}, {percent:.1f}%){f' [{hits}]' if hits else ''}"
+
+
+ABBREVIATIONS = {
+    "e.g.": "for example",
+    "i.e.": "that is",
+    "etc.": "et cetera",
+    "vs.": "versus",
+    "approx.": "approximately",
+    "w/o": "without",
+    "w/": "with",
+}
+
+STAGE_CUES = r"laughs?|laughter|chuckles?|sighs?|pause|beat|music|sound effect|sfx|intro music|outro music|applause"
+
+
+def _speak_url(match: re.Match) -> str:
+    # Keep the domain, which is what a host would actually say
+    domain = match.group("domain")
+    return domain[4:] if domain.lower().startswith("www.") else domain
+
+
+def _speak_code(match: re.Match) -> str:
+    token = match.group(1).strip()
+    token = re.sub(r"\(\s*\)$", "", token)
+    # __init__ is said "dunder init" rather than losing its underscores silently
+    token = re.sub(r"\b__(\w+?)__\b", r"dunder \1", token)
+    token = token.replace("_", " ").replace(".", " dot ")
+    return re.sub(r"\s+", " ", token).strip()
+
+
+def _speak_currency(match: re.Match) -> str:
+    amount, scale = match.group(1).replace(",", ""), match.group(2)
+    return f"{amount} {scale} dollars" if scale else f"{amount} dollars"
+
+
+def _outside_code(pattern: str, replacement: Callable[[re.Match], str],
+                  flags: int = 0) -> tuple[re.Pattern, Callable[[re.Match], str]]:
+    """Compile a rule that leaves inline code spans exactly as written.
+
+    Code spans are matched first and returned unchanged, so the rule only ever
+    rewrites prose (e.g. nums[i] or __init__ inside backticks stay intact).
+    """
+    compiled = re.compile(rf"(?P<code>`[^`\n]+`)|{pattern}", flags)
+
+    def replace(match: re.Match) -> str:
+        return match.group("code") if match.group("code") is not None else replacement(match)
+
+    return compiled, replace
+
+
+def _abbreviation_pattern() -> re.Pattern:
+    alternatives = "|".join(re.escape(abbreviation) for abbreviation in sorted(ABBREVIATIONS, key=len, reverse=True))
+    return re.compile(rf"(?<!\w)(?:{alternatives})(?!\w)", re.IGNORECASE)
+
+
+DEFAULT_RULES = [
+    PreprocessRule("code_fences", re.compile(r"^\s*```[\w+-]*\s*$", re.MULTILINE), ""),
+    PreprocessRule("markdown_links", re.compile(r"\[([^\]\n]+)\]\((?:[^)\s]+)\)"), r"\1"),
+    PreprocessRule("urls", re.compile(r"\bhttps?://(?P<domain>[^/\s]+)[^\s)]*"), _speak_url),
+    PreprocessRule("headers", re.compile(r"^[ \t]{0,3}#{1,6}[ \t]*", re.MULTILINE), ""),
+    PreprocessRule("bullets", re.compile(r"^[ \t]*(?:[-*+•]|\d{1,2}[.)])[ \t]+", re.MULTILINE), ""),
+    PreprocessRule("horizontal_rules", re.compile(r"^[ \t]*(?:[-*_][ \t]*){3,}$", re.MULTILINE), ""),
+    # Delimiters must sit outside words (2*3*4 is arithmetic), and __name__ on its own is an identifier
+    PreprocessRule("emphasis", *_outside_code(
+        r"(?<![\w*])(?P<delim>\*{1,3}|_{2,3})(?=\S)(?!(?<=_)\w+(?P=delim)(?!\w))(?P<body>.+?)(?<=\S)(?P=delim)(?![\w*])",
+        lambda m: m.group("body"))),
+    # Only known cues: other brackets are content (nums[i], dp[i-1], [citation])
+    PreprocessRule("stage_directions", *_outside_code(
+        rf"\[\s*(?:{STAGE_CUES})\b[^\]\n]{{0,40}}\]|\(\s*(?:{STAGE_CUES})\b[^)\n]{{0,40}}\)",
+        lambda m: "", re.IGNORECASE)),
+    PreprocessRule("big_o", re.compile(r"\bO\(([^()\n]{1,20})\)"), r"O of \1"),
+    PreprocessRule("inline_code", re.compile(r"`([^`\n]+)`"), _speak_code),
+    PreprocessRule("abbreviations", _abbreviation_pattern(), lambda m: ABBREVIATIONS[m.group(0).lower()]),
+    PreprocessRule("currency", re.compile(r"\$(\d[\d,]*(?:\.\d+)?)(?:\s*(million|billion|trillion|thousand)\b)?", re.IGNORECASE), _speak_currency),
+    PreprocessRule("percent", re.compile(r"(\d)\s*%"), r"\1 percent"),
+    PreprocessRule("thousands", re.compile(r"(?<=\d),(?=\d{3}\b)"), ""),
+    # Unspaced number ranges only: spaced "10 - 3 = 7", dates, decimals and phone numbers (555-1234) stay as written
+    PreprocessRule("ranges", re.compile(
+        r"(?<![\w.\-–/])(?!\d{3}-\d{4}\b)(\d+)[-–](\d+)(?![\w\-–/]|\.\d|\s*[=+*/×<>])"), r"\1 to \2"),
+    # Only between two operands, and not when the arrow itself is named ("the -> operator")
+    PreprocessRule("arrows", re.compile(
+        r"(?<=\w)(?<!\bthe)(?<!\ban)(?<!\ba)\s*(?:->|→|=>)\s*(?=\w)(?!(?:operator|arrow|symbol|sign|token)s?\b)",
+        re.IGNORECASE), " to "),
+    PreprocessRule("ampersands", re.compile(r"\s+&\s+"), " and "),
+    PreprocessRule("spaces", re.compile(r"[ \t\u00a0]{2,}|[\t\u00a0]"), " "),
+    PreprocessRule("line_edges", re.compile(r"^ | $", re.MULTILINE), ""),
+    PreprocessRule("blank_lines", re.compile(r"\n{3,}"), "\n\n"),
+]
+
+RULE_NAMES = [rule.name for rule in DEFAULT_RULES]
+WHITESPACE_RULES = {"spaces", "line_edges", "blank_lines"}
+
+# Rules that spell things out in English; translated text is spelled out by the translation instead
+ENGLISH_RULES = {"big_o", "inline_code", "abbreviations", "currency", "percent", "ranges", "arrows", "ampersands"}
+
+
+class TextPreprocessor:
+    """Rule-based cleanup that turns LLM output into text meant to be spoken.
+
+    Strips markdown, URLs and stage directions, writes currency, percentages,
+    ranges, symbols, abbreviations and code tokens as spoken words, and collapses
+    whitespace. Every character removed here is a character that is neither
+    billed nor synthesized.
+    """
+
+    def __init__(self, rules: Optional[list[PreprocessRule]] = None, disabled_rules: Optional[list[str]] = None):
+        disabled = set(disabled_rules or [])
+        unknown = disabled - {rule.name for rule in (rules or DEFAULT_RULES)}
+        if unknown:
+            raise ValueError(f"Unknown preprocessing rules: {', '.join(sorted(unknown))}. Available: {', '.join(RULE_NAMES)}")
+        self.rules = [rule for rule in (rules or DEFAULT_RULES) if rule.name not in disabled]
+
+    def process(self, text: str) -> PreprocessResult:
+        """Apply every enabled rule in order.
+
+        Args:
+            text (str): Raw text as written by the generator.
+
+        Returns:
+            PreprocessResult: Cleaned text and per-rule hit counts.
+        """
+        original_chars = len(text)
+        rule_hits = {}
+        for rule in self.rules:
+            # Code spans protected by _outside_code are matched but left unchanged, so they are not hits
+            protected = 0
+            if "code" in rule.pattern.groupindex:
+                protected = sum(1 for match in rule.pattern.finditer(text) if match.group("code") is not None)
+            text, count = rule.pattern.subn(rule.replacement, text)
+            rule_hits[rule.name] = count - protected
+        text = text.strip()
+        return PreprocessResult(text, original_chars, len(text), rule_hits)
+
+    def without(self, rule_names: set[str]) -> "TextPreprocessor":
+        """A copy of this preprocessor with some rules left out."""
+        return TextPreprocessor(rules=[rule for rule in self.rules if rule.name not in rule_names])
+
+
+DEFAULT_PREPROCESSOR = TextPreprocessor()
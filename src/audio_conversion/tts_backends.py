@@ -0,0 +1,361 @@
+import io
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Optional, Protocol, Union, runtime_checkable
+
+from src.startup.load_config import *
+from src.pipeline.hedging import HedgePolicy, get_hedger
+
+
+DEFAULT_ELEVENLABS_VOICE_ID = "bIHbv24MWmeRgasZH58o"
+DEFAULT_ELEVENLABS_MODEL_ID = "eleven_turbo_v2_5"  # or for better quality model_id="eleven_multilingual_v2"
+MULTILINGUAL_ELEVENLABS_MODEL_ID = "eleven_multilingual_v2"
+DEFAULT_ESPEAK_VOICE = "en-us"
+
+# Voices handed out in speaker order for dialogue episodes when none are configured
+ELEVENLABS_DIALOGUE_VOICES = [DEFAULT_ELEVENLABS_VOICE_ID, "pNInz6obpgDQGcFmaJgB", "21m00Tcm4TlvDq8ikWAM"]
+ESPEAK_DIALOGUE_VOICES = [DEFAULT_ESPEAK_VOICE, "en-gb", "en-us+f3"]
+
+
+@runtime_checkable
+class TTSBackend(Protocol):
+    """Interface every text-to-speech engine implements.
+
+    A backend turns one piece of text into complete MP3 bytes. Writing the bytes to
+    disk, batching and retries are handled by the callers in convert_audio.
+    """
+
+    name: str
+    dialogue_voices: list[str]
+
+    def synthesize(self, text: str, voice: Optional[str] = None) -> bytes:
+        """Synthesize text and return the encoded MP3 audio."""
+        ...
+
+
+class ElevenLabsBackend:
+    """Hosted ElevenLabs text-to-speech (the original engine)."""
+
+    name = "elevenlabs"
+    dialogue_voices = ELEVENLABS_DIALOGUE_VOICES
+    supports_cancel = True
+
+    def __init__(self, voice_id: str = DEFAULT_ELEVENLABS_VOICE_ID, model_id: str = DEFAULT_ELEVENLABS_MODEL_ID):
+        api_key = os.getenv("ELEVENLABS_API_KEY")
+        if not api_key:
+            raise ValueError("ELEVENLABS_API_KEY environment variable is not set. Please check your .env file or environment variables.")
+
+        from elevenlabs.client import ElevenLabs
+
+        self.voice_id = voice_id
+        self.model_id = model_id
+        self.client = ElevenLabs(api_key=api_key)
+
+    def synthesize(self, text: str, voice: Optional[str] = None,
+                   cancel_event: Optional[threading.Event] = None) -> bytes:
+        audio = self.client.text_to_speech.convert(
+            text=text,
+            voice_id=voice or self.voice_id,
+            model_id=self.model_id,
+            output_format="mp3_44100_128",
+            seed=42
+        )
+
+        # Collect all audio chunks first to ensure complete download
+        chunks = []
+        for chunk in audio:
+            if cancel_event is not None and cancel_event.is_set():
+                # Closing the generator drops the HTTP response of a losing hedge
+                if hasattr(audio, "close"):
+                    audio.close()
+                raise RuntimeError("TTS request cancelled")
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+
+class _LocalCommandBackend(ABC):
+    """Shared plumbing for offline engines that render a WAV file on the CPU."""
+
+    name = "local"
+    executable = ""
+    dialogue_voices: list[str] = []
+
+    def __init__(self, bitrate: str = "128k"):
+        if shutil.which(self.executable) is None:
+            raise RuntimeError(f"'{self.executable}' was not found on PATH; install it to use the '{self.name}' TTS backend.")
+        self.bitrate = bitrate
+
+    @abstractmethod
+    def _command(self, text_path: str, wav_path: str, voice: Optional[str]) -> list[str]:
+        """Command line that renders text_path into wav_path."""
+
+    def synthesize(self, text: str, voice: Optional[str] = None) -> bytes:
+        from pydub import AudioSegment
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            text_path = os.path.join(tmp_dir, "input.txt")
+            wav_path = os.path.join(tmp_dir, "output.wav")
+            with open(text_path, "w", encoding="utf-8") as f:
+                f.write(text)
+
+            subprocess.run(self._command(text_path, wav_path, voice), check=True, capture_output=True)
+
+            buffer = io.BytesIO()
+            AudioSegment.from_wav(wav_path).export(buffer, format="mp3", bitrate=self.bitrate)
+            return buffer.getvalue()
+
+
+class EspeakBackend(_LocalCommandBackend):
+    """Offline espeak-ng engine. Robotic, but fast and always available for drafts."""
+
+    name = "espeak"
+    executable = "espeak-ng"
+    dialogue_voices = ESPEAK_DIALOGUE_VOICES
+
+    def __init__(self, voice: str = DEFAULT_ESPEAK_VOICE, words_per_minute: int = 170, bitrate: str = "128k"):
+        super().__init__(bitrate=bitrate)
+        self.voice = voice
+        self.words_per_minute = words_per_minute
+
+    def _command(self, text_path: str, wav_path: str, voice: Optional[str]) -> list[str]:
+        return [
+            self.executable,
+            "-v", voice or self.voice,
+            "-s", str(self.words_per_minute),
+            "-f", text_path,
+            "-w", wav_path
+        ]
+
+
+class PiperBackend(_LocalCommandBackend):
+    """Offline Piper neural engine. Needs a voice model, set via PIPER_MODEL or the voice argument."""
+
+    name = "piper"
+    executable = "piper"
+
+    def __init__(self, model_path: Optional[str] = None, bitrate: str = "128k"):
+        super().__init__(bitrate=bitrate)
+        self.model_path = model_path or os.getenv("PIPER_MODEL")
+        if not self.model_path:
+            raise ValueError("PIPER_MODEL environment variable is not set. Point it at a Piper .onnx voice model.")
+
+    def _command(self, text_path: str, wav_path: str, voice: Optional[str]) -> list[str]:
+        return [
+            self.executable,
+            "--model", voice or self.model_path,
+            "--input_file", text_path,
+            "--output_file", wav_path
+        ]
+
+
+class FallbackBackend:
+    """Wrap a primary backend and switch to a fallback after repeated failures.
+
+    Each text is retried on the primary, with exponential backoff, until it has
+    failed `max_failures` times in a row, after which the fallback takes over for
+    the rest of the run. A success on the primary resets the failure count. The
+    fallback is only created when the switch happens, so a fallback that cannot
+    start (e.g. espeak-ng is not installed) never affects a healthy primary. Safe
+    to share between synthesis threads.
+    """
+
+    def __init__(self, primary: TTSBackend, fallback: Union[TTSBackend, Callable[[], TTSBackend]],
+                 max_failures: int = 3, retry_delay: float = 1.0):
+        self.primary = primary
+        self._fallback_factory = fallback if callable(fallback) else None
+        self._fallback = None if self._fallback_factory else fallback
+        self.max_failures = max_failures
+        self.retry_delay = retry_delay
+        self.consecutive_failures = 0
+        self.active = primary
+        self._lock = threading.Lock()
+
+    @property
+    def fallback(self) -> TTSBackend:
+        with self._lock:
+            if self._fallback is None:
+                self._fallback = self._fallback_factory()
+            return self._fallback
+
+    @property
+    def name(self) -> str:
+        return self.active.name
+
+    @property
+    def dialogue_voices(self) -> list[str]:
+        return self.active.dialogue_voices
+
+    @property
+    def hedged(self) -> bool:
+        return getattr(self.active, "hedged", False)
+
+    @property
+    def identity(self) -> str:
+        return backend_identity(self.active)
+
+    def synthesize(self, text: str, voice: Optional[str] = None) -> bytes:
+        return self.synthesize_with_source(text, voice)[0]
+
+    def synthesize_with_source(self, text: str, voice: Optional[str] = None) -> tuple[bytes, str]:
+        """Synthesize text and also return the identity of the backend that actually produced it."""
+        while self.active is self.primary:
+            try:
+                audio = self.primary.synthesize(text, voice=voice)
+                with self._lock:
+                    self.consecutive_failures = 0
+                return audio, backend_identity(self.primary)
+            except Exception as e:
+                with self._lock:
+                    self.consecutive_failures += 1
+                    failures = self.consecutive_failures
+                    print(f"TTS backend '{self.primary.name}' failed ({failures}/{self.max_failures}): {e}")
+                    switch = failures >= self.max_failures and self.active is self.primary
+                if switch:
+                    fallback = self.fallback
+                    with self._lock:
+                        if self.active is self.primary:
+                            print(f"Switching TTS backend: {self.primary.name} → {fallback.name}")
+                            self.active = fallback
+                elif self.active is self.primary:
+                    time.sleep(self.retry_delay * 2 ** (failures - 1))
+
+        fallback = self.fallback
+        return fallback.synthesize(text, voice=self._fallback_voice(voice)), backend_identity(fallback)
+
+    def _fallback_voice(self, voice: Optional[str]) -> Optional[str]:
+        # Voices are engine specific; keep dialogue speakers distinct by mapping positions
+        primary_voices = self.primary.dialogue_voices
+        fallback_voices = self.fallback.dialogue_voices
+        if voice in primary_voices and fallback_voices:
+            return fallback_voices[primary_voices.index(voice) % len(fallback_voices)]
+        return None
+
+
+class HedgedBackend:
+    """Send a backup TTS request when one runs slower than recent per-character latency."""
+
+    hedged = True
+
+    def __init__(self, backend: TTSBackend, policy: HedgePolicy):
+        self.backend = backend
+        self.hedger = get_hedger(f"tts:{backend.name}", policy, seed_stage="tts",
+                                 seed_size_field="characters", seed_match={"backend": backend.name})
+
+    @property
+    def name(self) -> str:
+        return self.backend.name
+
+    @property
+    def dialogue_voices(self) -> list[str]:
+        return self.backend.dialogue_voices
+
+    @property
+    def identity(self) -> str:
+        return backend_identity(self.backend)
+
+    def synthesize(self, text: str, voice: Optional[str] = None) -> bytes:
+        def attempt(cancel_event: threading.Event) -> bytes:
+            if getattr(self.backend, "supports_cancel", False):
+                return self.backend.synthesize(text, voice=voice, cancel_event=cancel_event)
+            return self.backend.synthesize(text, voice=voice)
+
+        return self.hedger.call(attempt, size=len(text))
+
+
+def backend_identity(backend: TTSBackend) -> str:
+    """Engine and model that render a backend's audio (e.g. "elevenlabs/eleven_multilingual_v2").
+
+    Audio cached under one identity is only ever reused for the same engine and model.
+    """
+    identity = getattr(backend, "identity", None)
+    if identity is not None:
+        return identity
+    model = getattr(backend, "model_id", None) or getattr(backend, "model_path", None)
+    return f"{backend.name}/{model}" if model else backend.name
+
+
+def synthesize_with_source(backend: TTSBackend, text: str, voice: Optional[str] = None) -> tuple[bytes, str]:
+    """Synthesize text and return the audio with the identity of the backend that produced it.
+
+    Differs from backend_identity(backend) taken beforehand when a fallback switches engines mid-run.
+    """
+    if hasattr(backend, "synthesize_with_source"):
+        return backend.synthesize_with_source(text, voice)
+    return backend.synthesize(text, voice=voice), backend_identity(backend)
+
+
+TTS_BACKENDS: dict[str, Callable[[], TTSBackend]] = {}
+
+# Factories for speech in a given language; backends without one are used as they are
+LANGUAGE_BACKENDS: dict[str, Callable[[str], TTSBackend]] = {}
+
+
+def register_backend(name: str, factory: Callable[[], TTSBackend]) -> None:
+    """Register a TTS backend factory under a name usable with --tts-backend."""
+    TTS_BACKENDS[name] = factory
+
+
+def register_language_backend(name: str, factory: Callable[[str], TTSBackend]) -> None:
+    """Register how a backend speaks another language. The factory gets the language code (e.g. "de")."""
+    LANGUAGE_BACKENDS[name] = factory
+
+
+def _espeak_for_language(language: str) -> EspeakBackend:
+    backend = EspeakBackend(voice=language)
+    # espeak-ng voice variants of the same language tell dialogue speakers apart
+    backend.dialogue_voices = [language, f"{language}+m3", f"{language}+f3"]
+    return backend
+
+
+def available_backends() -> list[str]:
+    """Return the names of all registered TTS backends."""
+    return sorted(TTS_BACKENDS)
+
+
+def get_backend(name: str = "elevenlabs", fallback: Optional[str] = None, max_failures: int = 3,
+                hedge: Optional[HedgePolicy] = None, language: Optional[str] = None) -> TTSBackend:
+    """Instantiate a registered TTS backend, optionally wrapped with an automatic fallback.
+
+    Args:
+        name (str): Name of the primary backend. Defaults to "elevenlabs".
+        fallback (str, optional): Name of the backend to switch to after repeated failures.
+        max_failures (int): Consecutive primary failures before switching. Defaults to 3.
+        hedge (HedgePolicy, optional): Opt-in hedging of slow primary requests.
+        language (str, optional): Language code of the text when it is not English.
+
+    Returns:
+        TTSBackend: Ready to use backend instance.
+
+    Raises:
+        ValueError: If a backend name is not registered.
+    """
+    for backend_name in (name, fallback):
+        if backend_name is not None and backend_name not in TTS_BACKENDS:
+            raise ValueError(f"Unknown TTS backend '{backend_name}'. Available: {', '.join(available_backends())}")
+
+    def create(backend_name: str) -> TTSBackend:
+        if language is not None and backend_name in LANGUAGE_BACKENDS:
+            return LANGUAGE_BACKENDS[backend_name](language)
+        return TTS_BACKENDS[backend_name]()
+
+    backend = create(name)
+    if hedge is not None:
+        backend = HedgedBackend(backend, hedge)
+    if fallback is None or fallback == name:
+        return backend
+
+    return FallbackBackend(backend, lambda: create(fallback), max_failures=max_failures)
+
+
+register_backend("elevenlabs", ElevenLabsBackend)
+register_backend("espeak", EspeakBackend)
+register_backend("piper", PiperBackend)
+
+# The multilingual model reads any supported language with the same voices
+register_language_backend("elevenlabs", lambda language: ElevenLabsBackend(model_id=MULTILINGUAL_ELEVENLABS_MODEL_ID))
+register_language_backend("espeak", _espeak_for_language)
@@ -1,50 +1,74 @@
 from langgraph.types import Command
-from typing import Literal
+from typing import Literal, Optional
 import json
 import os
+from src.llm.blob_store import get_blob_store
+
+
+def outline_path(output_dir: str, topic: str) -> str:
+    return os.path.join(output_dir, f"{topic.lower().replace(' ', '_')}_subtopics.txt")
+
+
+def write_outline(output_dir: str, topic: str, subtopics: list[str]) -> str:
+    """Write the numbered subtopic list. Returns its path."""
+    subtopics_file = outline_path(output_dir, topic)
+    with open(subtopics_file, 'w', encoding='utf-8') as f:
+        for i, subtopic in enumerate(subtopics, 1):
+            f.write(f"{i}. {subtopic}\n")
+    return subtopics_file
+
+
+def write_summary(output_dir: str, topic: str, subtopics: list[str], subtopic_files: list[str],
+                  speakers: list[str], word_counts: dict[str, int], language: Optional[str] = None) -> str:
+    """Write summary.json, the episode metadata read by convert and combine. Returns its path."""
+    summary_file = os.path.join(output_dir, "summary.json")
+    summary_data = {
+        "topic": topic,
+        "total_subtopics": len(subtopics),
+        "subtopics": subtopics,
+        "subtopic_files_generated": subtopic_files,
+        "format": "dialogue" if speakers else "monologue",
+        "speakers": speakers,
+        "subtopic_word_counts": {subtopic: word_counts[subtopic] for subtopic in subtopics if subtopic in word_counts},
+        "total_words": sum(word_counts.get(subtopic, 0) for subtopic in subtopics)
+    }
+    if language:
+        summary_data["language"] = language
+    
+    with open(summary_file, 'w', encoding='utf-8') as f:
+        json.dump(summary_data, f, indent=2, ensure_ascii=False)
+    return summary_file
 
 
 def filewriter_agent(state) -> Command[Literal['__end__']]:
     # Get the data from state
     topic = state.get('topic', 'Unknown Topic')
     subtopics = state.get('subtopics', [])
-    subtopic_contents = state.get('subtopic_contents', {})
+    content_refs = state.get('subtopic_content_refs', {})
+    speakers = state.get('speakers', [])
+    word_counts = state.get('subtopic_word_counts', {})
     
     # Create output directory if it doesn't exist
-    output_dir = "data/text_output"
+    output_dir = state.get('text_output_dir') or "data/text_output"
     os.makedirs(output_dir, exist_ok=True)
     
     # Write the list of subtopics in order
-    subtopics_file = os.path.join(output_dir, f"{topic.lower().replace(' ', '_')}_subtopics.txt")
-    with open(subtopics_file, 'w', encoding='utf-8') as f:
-        for i, subtopic in enumerate(subtopics, 1):
-            f.write(f"{i}. {subtopic}\n")
+    write_outline(output_dir, topic, subtopics)
     
     # Write each subtopic content to individual files
     subtopic_files = []
     for i, subtopic in enumerate(subtopics, 1):
-        if subtopic in subtopic_contents:
-            content = subtopic_contents[subtopic]
+        if subtopic in content_refs:
             filename = f"subtopic_{i:02d}.txt"
             filepath = os.path.join(output_dir, filename)
             
-            # Write only the raw content, no headers or formatting
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(content)
+            # Stream the raw content from the blob store, no headers or formatting
+            get_blob_store().copy_to(content_refs[subtopic], filepath)
             
             subtopic_files.append(filename)
     
     # Write a summary JSON file with metadata
-    summary_file = os.path.join(output_dir, "summary.json")
-    summary_data = {
-        "topic": topic,
-        "total_subtopics": len(subtopics),
-        "subtopics": subtopics,
-        "subtopic_files_generated": subtopic_files
-    }
-    
-    with open(summary_file, 'w', encoding='utf-8') as f:
-        json.dump(summary_data, f, indent=2, ensure_ascii=False)
+    write_summary(output_dir, topic, subtopics, subtopic_files, speakers, word_counts)
     
     print(f"Generated {len(subtopics)} subtopic files in {output_dir}")
     
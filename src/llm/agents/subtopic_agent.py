@@ -1,8 +1,10 @@
 from langchain_core.messages import SystemMessage
 from langgraph.types import Command
 from typing import Literal
+from src.llm.blob_store import get_blob_store
 from src.llm.model import get_model, SubtopicOutput
 from src.llm.prompts import TOPIC_GENERATING_SYSTEM_PROMPT
+from src.pipeline.metrics import stage_timer
 
 
 def subtopic_agent(state) -> Command[Literal['subtopic_router_agent']]:
@@ -10,7 +12,8 @@ def subtopic_agent(state) -> Command[Literal['subtopic_router_agent']]:
     model = get_model()
 
     # Format the reference document section
-    reference_doc = state.get('reference_document', '')
+    reference_ref = state.get('reference_document_ref', '')
+    reference_doc = get_blob_store().get(reference_ref) if reference_ref else ''
     if reference_doc:
         reference_section = f"Use the following reference document as a guide for content style, examples, and factual information:\n\n{reference_doc}"
     else:
@@ -28,7 +31,9 @@ def subtopic_agent(state) -> Command[Literal['subtopic_router_agent']]:
         agent_system_prompt,
         *state['messages']
     ]
-    output = model.invoke(messages)
+    with stage_timer('outline') as m:
+        output = model.invoke(messages)
+        m['subtopics'] = len(output.subtopic_list)
 
     # Update state with the structured output and end
     return Command(
@@ -1,8 +1,12 @@
 from langchain_core.messages import SystemMessage, HumanMessage
 from langgraph.types import Command
-from typing import Literal
-from src.llm.model import get_model
-from src.llm.prompts import SUBTOPIC_GENERATOR_SYSTEM_PROMPT, SUBTOPIC_SUMMARY_SYSTEM_PROMPT
+from typing import Literal, Optional
+from src.llm.blob_store import get_blob_store
+from src.llm.model import get_model, invoke_model
+from src.pipeline.hedging import HedgePolicy
+from src.pipeline.metrics import stage_timer
+from src.llm.word_budget import WordBudget, generate_with_word_budget
+from src.llm.prompts import SUBTOPIC_GENERATOR_SYSTEM_PROMPT, SUBTOPIC_SUMMARY_SYSTEM_PROMPT, DIALOGUE_FORMAT_INSTRUCTIONS
 
 
 def subtopic_generator_agent(state) -> Command[Literal['subtopic_router_agent']]:
@@ -10,9 +14,11 @@ def subtopic_generator_agent(state) -> Command[Literal['subtopic_router_agent']]
     # Extract subtopic info from state
     subtopic_input = state.get('current_subtopic')
     all_subtopics = state.get('subtopics', [])
-    previous_summaries = state.get('subtopic_summaries', '')
+    store = get_blob_store()
+    previous_summaries = "".join(store.get(ref) for ref in state.get('subtopic_summary_refs', []))
     
     model = get_model()
+    hedge = HedgePolicy(**state['hedge_policy']) if state.get('hedge_policy') else None
 
     # Get list of all topics and previous summaries
     subtopics_context = "\n".join([f"- {subtopic}" for subtopic in all_subtopics])
@@ -22,51 +28,85 @@ def subtopic_generator_agent(state) -> Command[Literal['subtopic_router_agent']]
         previous_context = "This is the first subtopic of the episode."
 
     # Format the reference document section
-    reference_doc = state.get('reference_document', '')
+    reference_ref = state.get('reference_document_ref', '')
+    reference_doc = store.get(reference_ref) if reference_ref else ''
     if reference_doc:
         reference_section = f"Use the following reference document as a guide for content style, examples, and factual information:\n\n{reference_doc}"
     else:
         reference_section = "No reference document provided."
 
     # Build system prompt for generation with defined contexts
-    agent_system_prompt = SystemMessage(SUBTOPIC_GENERATOR_SYSTEM_PROMPT.format(
+    system_prompt = SUBTOPIC_GENERATOR_SYSTEM_PROMPT.format(
         podcast_subtopic=subtopic_input,
         podcast_subtopics=subtopics_context,
         previous_subtopics_context=previous_context,
         reference_document_section=reference_section
-    ))
+    )
+
+    # Dialogue episodes get speaker-tagged turns instead of a monologue
+    speakers = state.get('speakers', [])
+    if speakers:
+        system_prompt += DIALOGUE_FORMAT_INSTRUCTIONS.format(
+            speakers=", ".join(speakers),
+            first_speaker=speakers[0]
+        )
+    agent_system_prompt = SystemMessage(system_prompt)
 
     # Invoke with custom system prompt
     messages = [
         agent_system_prompt,
         *state['messages']
     ]
-    output = model.invoke(messages)
+    # Stream with a word budget: stop long output at a sentence end, extend short output
+    budget = WordBudget(**state['word_budget']) if state.get('word_budget') else WordBudget()
+    with stage_timer('subtopic_generation', subtopic=subtopic_input, hedged=hedge is not None) as m:
+        output = generate_with_word_budget(model, messages, budget, subtopic_input, hedge)
+        m['input_tokens'] = output.input_tokens
+        if output.usage_complete:
+            # Streams stopped early do not report their final output token count
+            m['output_tokens'] = output.output_tokens
+        m['words'] = output.words
+        m['stopped_early'] = output.stopped_early
+        m['continuations'] = output.continuations
 
     # Generate summary of the recently generated content content
-    summary_system_prompt = SystemMessage(SUBTOPIC_SUMMARY_SYSTEM_PROMPT.format(
-        podcast_subtopic=subtopic_input
-    ))
-    summary_messages = [
-        summary_system_prompt,
-        HumanMessage(content=f"Content to summarize:\n\n{output.content}")
-    ]
-    summary_output = model.invoke(summary_messages)
+    summary_output = summarize_subtopic(model, subtopic_input, output.content, hedge)
 
-    # Update state with the new content
-    current_subtopic_contents = state.get('subtopic_contents', {})
-    current_subtopic_contents[subtopic_input] = output.content
-    
-    # Append the summary to the subtopic_summaries string
-    existing_summaries = state.get('subtopic_summaries', '')
-    new_summary = f"\n\n## {subtopic_input}\n{summary_output.content}"
-    updated_summaries = existing_summaries + new_summary
+    # Store the text in the blob store; the state only gets the keys (merged by the state reducers)
+    word_counts = {**state.get('subtopic_word_counts', {}), subtopic_input: output.words}
+    content_ref = store.put(output.content)
+    summary_ref = store.put(f"\n\n## {subtopic_input}\n{summary_output.content}")
     
     return Command(
         goto='subtopic_router_agent',
         update={
-            'subtopic_contents': current_subtopic_contents,
-            'subtopic_summaries': updated_summaries,
+            'subtopic_content_refs': {subtopic_input: content_ref},
+            'subtopic_summary_refs': [summary_ref],
+            'subtopic_word_counts': word_counts,
             'completed_subtopics': state.get('completed_subtopics', []) + [subtopic_input]
         }
-    )
\ No newline at end of file
+    )
+
+
+def summarize_subtopic(model, subtopic: str, content: str, hedge: Optional[HedgePolicy] = None):
+    """Summarize one subtopic's content as context for the subtopics after it."""
+    summary_system_prompt = SystemMessage(SUBTOPIC_SUMMARY_SYSTEM_PROMPT.format(
+        podcast_subtopic=subtopic
+    ))
+    summary_messages = [
+        summary_system_prompt,
+        HumanMessage(content=f"Content to summarize:\n\n{content}")
+    ]
+    with stage_timer('subtopic_summary', subtopic=subtopic, hedged=hedge is not None) as m:
+        summary_output = invoke_model(model, summary_messages, 'subtopic_summary', hedge)
+        m.update(_usage_fields(summary_output))
+    return summary_output
+
+
+def _usage_fields(message) -> dict:
+    # Token counts reported by the provider, when available
+    usage = getattr(message, 'usage_metadata', None) or {}
+    return {
+        'input_tokens': usage.get('input_tokens', 0),
+        'output_tokens': usage.get('output_tokens', 0)
+    }
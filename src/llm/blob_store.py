@@ -0,0 +1,83 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from typing import IO
+
+
+BLOB_DIR = os.path.join("data", "blobs")
+
+
+class BlobStore:
+    """Content-addressed store for large text payloads of the generation graph.
+
+    Subtopic bodies, summaries and the reference document are written here once
+    and the graph state only carries their SHA-256 keys, so state copies between
+    nodes (and any future checkpoint) stay a few hundred bytes per subtopic.
+    Identical text is stored once.
+    """
+
+    def __init__(self, blob_dir: str = BLOB_DIR):
+        self.blob_dir = blob_dir
+        os.makedirs(blob_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(text: str) -> str:
+        """Return the key a piece of text is stored under."""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.blob_dir, key[:2], f"{key}.txt")
+
+    def put(self, text: str) -> str:
+        """Store text and return its key. Text that is already stored is not rewritten."""
+        key = self.make_key(text)
+        path = self._path(key)
+        if os.path.exists(path):
+            return key
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temporary file first so concurrent readers never see a partial blob
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+        return key
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def open(self, key: str) -> IO[str]:
+        """Open a blob for reading.
+
+        Raises:
+            FileNotFoundError: If no blob is stored under the key.
+        """
+        path = self._path(key)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Blob not found: {key}")
+        return open(path, "r", encoding="utf-8", newline="")
+
+    def get(self, key: str) -> str:
+        """Return the text stored under a key."""
+        with self.open(key) as f:
+            return f.read()
+
+    def copy_to(self, key: str, output_path: str) -> str:
+        """Stream a blob into a file without loading it into memory. Returns output_path."""
+        with self.open(key) as src, open(output_path, "w", encoding="utf-8", newline="") as out:
+            shutil.copyfileobj(src, out, 1024 * 1024)
+        return output_path
+
+
+_STORES: dict[str, BlobStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_blob_store(blob_dir: str = BLOB_DIR) -> BlobStore:
+    """Return the shared blob store for a directory."""
+    with _STORES_LOCK:
+        if blob_dir not in _STORES:
+            _STORES[blob_dir] = BlobStore(blob_dir)
+        return _STORES[blob_dir]
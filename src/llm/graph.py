@@ -1,27 +1,72 @@
+import functools
+import json
+import operator
+import time
+from typing import Annotated
 from langgraph.graph import StateGraph, MessagesState, START, END
 from src.llm.agents.subtopic_agent import subtopic_agent
 from src.llm.agents.subtopic_router import subtopic_router_agent
 from src.llm.agents.subtopic_generator import subtopic_generator_agent
 from src.llm.agents.file_writer import filewriter_agent
+from src.pipeline.metrics import record_stage
+
+
+def merge_refs(current: dict[str, str], update: dict[str, str]) -> dict[str, str]:
+    # Nodes return only their new entries; merge instead of replacing the whole dict
+    return {**current, **update}
 
 
 class CustomState(MessagesState):
     topic: str = 'Unknown'
     subtopics: list[str] = []
-    subtopic_contents: dict[str, str] = {}
+    # Blob store keys (see src/llm/blob_store.py); the text itself never enters the state
+    subtopic_content_refs: Annotated[dict[str, str], merge_refs] = {}
     completed_subtopics: list[str] = []
     current_subtopic: str
-    subtopic_summaries: str
-    reference_document: str = ''
+    subtopic_summary_refs: Annotated[list[str], operator.add] = []
+    reference_document_ref: str = ''
+    speakers: list[str] = []
+    text_output_dir: str = 'data/text_output'
+    hedge_policy: dict = {}
+    word_budget: dict = {}
+    subtopic_word_counts: dict[str, int] = {}
+
+
+def _serialize(value):
+    # Messages and other models serialize the way a checkpointer would store them
+    return value.model_dump() if hasattr(value, 'model_dump') else str(value)
+
+
+def measure_state(state) -> dict:
+    """Serialize a state to JSON and report its size per field and the time it took."""
+    start = time.perf_counter()
+    field_bytes = {key: len(json.dumps(value, default=_serialize, ensure_ascii=False).encode('utf-8'))
+                   for key, value in state.items()}
+    return {
+        'state_bytes': sum(field_bytes.values()),
+        'serialize_seconds': time.perf_counter() - start,
+        'field_bytes': field_bytes
+    }
+
+
+def with_state_metrics(name: str, node):
+    """Wrap a node so the size of the state it receives is recorded at every step."""
+    @functools.wraps(node)
+    def measured(state):
+        footprint = measure_state(state)
+        record_stage('graph_state', footprint.pop('serialize_seconds'), node=name,
+                     subtopic=state.get('current_subtopic'), **footprint)
+        return node(state)
+    return measured
 
 
 def build_graph():
     # Nodes
     builder = StateGraph(state_schema=CustomState)
-    builder.add_node('subtopic_agent', subtopic_agent)
-    builder.add_node('subtopic_router_agent', subtopic_router_agent)
-    builder.add_node('subtopic_generator_agent', subtopic_generator_agent)
-    builder.add_node('filewriter_agent', filewriter_agent)
+    builder.add_node('subtopic_agent', with_state_metrics('subtopic_agent', subtopic_agent))
+    builder.add_node('subtopic_router_agent', with_state_metrics('subtopic_router_agent', subtopic_router_agent))
+    builder.add_node('subtopic_generator_agent', with_state_metrics('subtopic_generator_agent', subtopic_generator_agent))
+    builder.add_node('filewriter_agent', with_state_metrics('filewriter_agent', filewriter_agent))
 
     # Edges
     builder.add_edge(START, 'subtopic_agent')
@@ -1,7 +1,10 @@
 from langchain_anthropic import ChatAnthropic
 from src.startup.load_config import *
 import os
+from functools import lru_cache
 from pydantic import BaseModel, Field
+from typing import Optional
+from src.pipeline.hedging import HedgePolicy, get_hedger
 
 api_key = os.getenv("ANTHROPIC_API_KEY")
 
@@ -9,18 +12,57 @@ if not api_key:
     raise ValueError("ANTHROPIC_API_KEY environment variable is not set. Please check your .env file or environment variables.")
 
 
-def get_model():
+MODEL_NAME = "claude-3-7-sonnet-latest"
+
+# Cheaper model for translation, which needs no research or planning
+TRANSLATION_MODEL_NAME = "claude-3-5-haiku-latest"
+TRANSLATION_MAX_TOKENS = 8192
+
+
+# One client per model and process so HTTP connections are pooled across agents and runs
+@lru_cache(maxsize=None)
+def get_model(model_name: str = MODEL_NAME, max_tokens: int = 20000):
     llm = ChatAnthropic(
-        model="claude-3-7-sonnet-latest",
+        model=model_name,
         temperature=0.05,
         timeout=None,
         max_retries=2,
-        max_tokens=20000,
+        max_tokens=max_tokens,
         anthropic_api_key=api_key
     )
     return llm
 
 
+def invoke_model(model, messages, stage: str, hedge: Optional[HedgePolicy] = None):
+    """Invoke the model, sending a duplicate request if the call is slower than usual.
+
+    Without a hedge policy this is a plain model.invoke. With one, the response is
+    streamed so the losing request can be dropped as soon as the other one wins.
+
+    Args:
+        model: Chat model to call.
+        messages (list): Messages for the call.
+        stage (str): Metrics stage the call is recorded under; latencies are seeded from it.
+        hedge (HedgePolicy, optional): Opt-in hedging policy.
+
+    Returns:
+        AIMessage: The model response.
+    """
+    if hedge is None:
+        return model.invoke(messages)
+
+    def attempt(cancel_event):
+        output = None
+        for chunk in model.stream(messages):
+            if cancel_event.is_set():
+                raise RuntimeError("LLM request cancelled")
+            output = chunk if output is None else output + chunk
+        return output
+
+    hedger = get_hedger(f"llm:{stage}", hedge, seed_stage=stage)
+    return hedger.call(attempt)
+
+
 class SubtopicOutput(BaseModel):
     "Subtopic output"
     subtopic_list: list[str] = Field(description='A list of subtopics')
\ No newline at end of file
@@ -136,4 +136,47 @@ This summary will be provided as context to the LLM generating the next subtopic
 - Ensure the overall episode flows cohesively
 
 ## Remember
-You are creating a reference document, not a transcript. Focus on the essence and impact of the content, not every detail."""
\ No newline at end of file
+You are creating a reference document, not a transcript. Focus on the essence and impact of the content, not every detail."""
+
+DIALOGUE_FORMAT_INSTRUCTIONS = """
+
+## Dialogue Format
+This episode is a conversation between the following speakers: {speakers}
+- Write the content as a natural back-and-forth between these speakers, not as a monologue
+- Start every turn on a new line with the speaker tag in capitals followed by a colon, for example "{first_speaker}: ..."
+- Use only these exact speaker tags, and never put a speaker tag anywhere except at the start of a line
+- Keep most turns to a few sentences so the conversation feels lively; let one speaker explain while the other asks questions, pushes back, and reacts
+- Do not include stage directions, sound cues, or descriptions of tone; every line is spoken aloud"""
+
+SUBTOPIC_CONTINUATION_PROMPT = """The content for "{podcast_subtopic}" is only {words_so_far:,} words so far, which is short of the {min_words:,} word minimum.
+
+Continue the content from exactly where it stops, as the next part of the same spoken segment:
+- Write roughly {words_needed:,} more words
+- Do not repeat, summarize, or restart anything already covered; deepen it with new stories, examples, and applications
+- Keep the same voice, tone, and formatting rules, with no headers, markdown, or introductions
+- Output only the continuation itself"""
+
+TRANSLATION_SYSTEM_PROMPT = """You are an expert podcast translator. Translate the following part of a podcast script about "{podcast_subtopic}" from English into {language}.
+
+## Guidelines
+- Translate for the ear: the result is read aloud by a text-to-speech voice, so use natural, conversational {language} rather than a word-for-word rendering
+- Keep the meaning, tone, examples, and structure of the original; do not add, drop, or summarize content
+- Keep the same line breaks and paragraphs as the original
+- Write numbers, symbols, units, and abbreviations the way a native speaker would say them aloud
+- Keep names, product names, and technical terms that are normally left in English in {language} as they are
+- Do not add headers, markdown, notes, or explanations
+
+Output only the translated text."""
+
+DIALOGUE_TRANSLATION_INSTRUCTIONS = """
+
+## Dialogue Format
+The script is a conversation between these speakers: {speakers}
+- Keep every speaker tag at the start of its line exactly as it is, untranslated, followed by a colon
+- Translate only the spoken words after each tag"""
+
+OUTLINE_TRANSLATION_SYSTEM_PROMPT = """You are an expert podcast translator. Translate the podcast episode title and chapter titles below from English into {language}.
+
+- Each line is one title; output exactly one translated title per line, in the same order and with the same number of lines
+- Keep the titles short and natural for a {language} speaking listener
+- Output only the translated titles, with no numbering, quotes, or notes"""
@@ -0,0 +1,216 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+from concurrent.futures import Executor
+from typing import Optional
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from src.llm.prompts import DIALOGUE_TRANSLATION_INSTRUCTIONS, OUTLINE_TRANSLATION_SYSTEM_PROMPT, TRANSLATION_SYSTEM_PROMPT
+from src.pipeline.hedging import HedgePolicy
+from src.pipeline.metrics import stage_timer
+
+
+TRANSLATION_CACHE_DIR = os.path.join("data", "translations")
+
+SOURCE_LANGUAGE = "en"
+
+# Languages the multilingual TTS model speaks
+LANGUAGE_NAMES = {
+    "ar": "Arabic", "bg": "Bulgarian", "cs": "Czech", "da": "Danish", "de": "German", "el": "Greek",
+    "en": "English", "es": "Spanish", "fi": "Finnish", "fil": "Filipino", "fr": "French", "hi": "Hindi",
+    "hr": "Croatian", "id": "Indonesian", "it": "Italian", "ja": "Japanese", "ko": "Korean", "ms": "Malay",
+    "nl": "Dutch", "pl": "Polish", "pt": "Portuguese", "ro": "Romanian", "ru": "Russian", "sk": "Slovak",
+    "sv": "Swedish", "ta": "Tamil", "tr": "Turkish", "uk": "Ukrainian", "zh": "Chinese",
+}
+
+# Chunks stay well inside the translation model's output limit and translate in parallel
+TRANSLATION_CHUNK_WORDS = 1200
+
+# A dialogue chunk whose speaker tags came back changed is requested again this many times in total
+TRANSLATION_ATTEMPTS = 2
+
+
+def language_name(language: str) -> str:
+    """English name of a language code.
+
+    Raises:
+        ValueError: If the language is not supported.
+    """
+    if language not in LANGUAGE_NAMES:
+        raise ValueError(f"Unsupported language '{language}'. Available: {', '.join(sorted(LANGUAGE_NAMES))}")
+    return LANGUAGE_NAMES[language]
+
+
+class TranslationCache:
+    """Translations stored under a hash of everything that determines them.
+
+    The key covers the source text, language, subtopic, speakers, prompts and
+    model, so a rerun, a second episode sharing a chunk, or another host on the
+    same data/ directory never pays for the same translation twice, and changing
+    any of them simply misses the cache.
+    """
+
+    def __init__(self, cache_dir: str = TRANSLATION_CACHE_DIR):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(*parts) -> str:
+        payload = json.dumps(parts, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.txt")
+
+    def get(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            return f.read()
+
+    def put(self, key: str, text: str) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+
+def split_for_translation(text: str, max_words: int = TRANSLATION_CHUNK_WORDS) -> list[str]:
+    """Split text at line ends into chunks of about max_words. Joining them with newlines gives the text back."""
+    chunks, lines, words = [], [], 0
+    for line in text.split("\n"):
+        lines.append(line)
+        words += len(line.split())
+        if words >= max_words:
+            chunks.append("\n".join(lines))
+            lines, words = [], 0
+    if lines or not chunks:
+        chunks.append("\n".join(lines))
+    return chunks
+
+
+def speaker_tags(text: str, speakers: Optional[list[str]]) -> list[str]:
+    """Order of the speaker tags at line starts, with a speaker's consecutive lines counted once."""
+    if not speakers:
+        return []
+    alternatives = "|".join(re.escape(speaker) for speaker in speakers)
+    tags = [tag.upper() for tag in re.findall(rf"^\s*({alternatives})\s*:", text, re.IGNORECASE | re.MULTILINE)]
+    return [tag for i, tag in enumerate(tags) if i == 0 or tag != tags[i - 1]]
+
+
+def _invoke_translation(system_prompt: str, text: str, language: str, subtopic: str,
+                        hedge: Optional[HedgePolicy]) -> str:
+    from src.llm.model import TRANSLATION_MAX_TOKENS, TRANSLATION_MODEL_NAME, get_model, invoke_model
+
+    model = get_model(TRANSLATION_MODEL_NAME, TRANSLATION_MAX_TOKENS)
+    messages = [SystemMessage(system_prompt), HumanMessage(content=text)]
+    with stage_timer('translation', language=language, subtopic=subtopic, hedged=hedge is not None) as m:
+        output = invoke_model(model, messages, 'translation', hedge)
+        usage = getattr(output, 'usage_metadata', None) or {}
+        m['input_tokens'] = usage.get('input_tokens', 0)
+        m['output_tokens'] = usage.get('output_tokens', 0)
+        m['words'] = len(text.split())
+    return output.content.strip()
+
+
+def translate_chunk(text: str, language: str, subtopic: str, speakers: Optional[list[str]] = None,
+                    hedge: Optional[HedgePolicy] = None,
+                    cache: Optional[TranslationCache] = None) -> tuple[str, bool]:
+    """Translate one chunk of a subtopic, from the cache when possible.
+
+    In dialogue episodes the translation must keep the chunk's speaker tags in
+    order, or the turns would go to the wrong voices; it is requested again
+    otherwise.
+
+    Returns:
+        Tuple[str, bool]: The translation, and whether it came from the cache.
+
+    Raises:
+        ValueError: If the speaker tags still differ after TRANSLATION_ATTEMPTS requests.
+    """
+    from src.llm.model import TRANSLATION_MODEL_NAME
+
+    body = text.strip()
+    if not body:
+        return text, True
+    # Keep the surrounding blank lines so the chunks join back into the original layout
+    leading = text[:len(text) - len(text.lstrip())]
+    trailing = text[len(text.rstrip()):]
+
+    system_prompt = TRANSLATION_SYSTEM_PROMPT.format(podcast_subtopic=subtopic, language=language_name(language))
+    if speakers:
+        system_prompt += DIALOGUE_TRANSLATION_INSTRUCTIONS.format(speakers=", ".join(speakers))
+
+    expected_tags = speaker_tags(body, speakers)
+    cache = cache or TranslationCache()
+    key = cache.make_key(body, language, system_prompt, TRANSLATION_MODEL_NAME)
+    translation = cache.get(key)
+    cached = translation is not None and speaker_tags(translation, speakers) == expected_tags
+    if not cached:
+        for attempt in range(1, TRANSLATION_ATTEMPTS + 1):
+            translation = _invoke_translation(system_prompt, body, language, subtopic, hedge)
+            if speaker_tags(translation, speakers) == expected_tags:
+                break
+            print(f"[{language}] Speaker tags changed in a chunk of '{subtopic}' "
+                  f"(attempt {attempt}/{TRANSLATION_ATTEMPTS})")
+        else:
+            raise ValueError(f"Translation of '{subtopic}' into '{language}' kept changing the speaker tags")
+        cache.put(key, translation)
+    return f"{leading}{translation}{trailing}", cached
+
+
+def translate_text(text: str, language: str, subtopic: str, executor: Executor,
+                   speakers: Optional[list[str]] = None, hedge: Optional[HedgePolicy] = None,
+                   cache: Optional[TranslationCache] = None) -> tuple[str, int, int]:
+    """Translate a subtopic, running its chunks on a shared executor.
+
+    Args:
+        text (str): Subtopic text in the source language.
+        language (str): Target language code (e.g. "de").
+        subtopic (str): Subtopic title, given to the model as context.
+        executor (Executor): Pool the chunk translations run on, usually shared by every language.
+        speakers (List[str], optional): Speaker tags to keep untouched in dialogue episodes.
+        hedge (HedgePolicy, optional): Opt-in hedging of slow requests.
+        cache (TranslationCache, optional): Cache to read and fill. Defaults to data/translations.
+
+    Returns:
+        Tuple[str, int, int]: The translation, its number of chunks and how many came from the cache.
+    """
+    cache = cache or TranslationCache()
+    chunks = split_for_translation(text)
+    futures = [executor.submit(translate_chunk, chunk, language, subtopic, speakers, hedge, cache)
+               for chunk in chunks]
+    results = [future.result() for future in futures]
+    return "\n".join(translation for translation, _ in results), len(chunks), sum(cached for _, cached in results)
+
+
+def translate_titles(topic: str, subtopics: list[str], language: str, hedge: Optional[HedgePolicy] = None,
+                     cache: Optional[TranslationCache] = None) -> tuple[str, list[str]]:
+    """Translate the episode title and subtopic (chapter) titles in one request.
+
+    Raises:
+        ValueError: If the model does not return one title per line.
+    """
+    from src.llm.model import TRANSLATION_MODEL_NAME
+
+    titles = [topic, *subtopics]
+    system_prompt = OUTLINE_TRANSLATION_SYSTEM_PROMPT.format(language=language_name(language))
+    cache = cache or TranslationCache()
+    key = cache.make_key(titles, language, system_prompt, TRANSLATION_MODEL_NAME)
+    translation = cache.get(key)
+    if translation is None:
+        translation = _invoke_translation(system_prompt, "\n".join(titles), language, "titles", hedge)
+        lines = [line.strip() for line in translation.splitlines() if line.strip()]
+        if len(lines) != len(titles):
+            raise ValueError(f"Expected {len(titles)} translated titles for '{language}', got {len(lines)}")
+        translation = "\n".join(lines)
+        cache.put(key, translation)
+
+    translated = translation.split("\n")
+    return translated[0], translated[1:]
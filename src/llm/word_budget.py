@@ -0,0 +1,200 @@
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Optional
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.llm.prompts import SUBTOPIC_CONTINUATION_PROMPT
+from src.pipeline.hedging import HedgePolicy, get_hedger
+
+
+# Targets from the generation prompts (words per subtopic)
+SUBTOPIC_MIN_WORDS = 2500
+SUBTOPIC_MAX_WORDS = 4000
+
+# A sentence ends at . ! or ? (optionally followed by closing quotes/brackets) and then whitespace
+SENTENCE_END_PATTERN = re.compile(r"[.!?][\"'”’)\]]*(?=\s)")
+
+
+@dataclass
+class WordBudget:
+    """Length limits for one generated subtopic.
+
+    Generation stops at the first sentence boundary after `max_words`. If no
+    boundary appears within `overrun_words` more words, the text is cut at the
+    last boundary before the limit. Output under `min_words` gets up to
+    `max_continuations` follow-up requests.
+    """
+    min_words: int = SUBTOPIC_MIN_WORDS
+    max_words: int = SUBTOPIC_MAX_WORDS
+    max_continuations: int = 2
+    overrun_words: int = 150
+
+    def __post_init__(self):
+        if self.min_words <= 0 or self.max_words <= 0:
+            raise ValueError("Word budget limits must be positive")
+        if self.min_words > self.max_words:
+            raise ValueError(f"min_words ({self.min_words}) cannot be larger than max_words ({self.max_words})")
+
+
+@dataclass
+class BudgetedOutput:
+    """Generated text plus what the length controller did to it."""
+    content: str
+    words: int
+    stopped_early: bool = False
+    continuations: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    usage_complete: bool = True
+    word_counts: list[int] = field(default_factory=list)
+
+
+def count_words(text: str) -> int:
+    """Count whitespace separated words, the same way the prompts and metrics do."""
+    return len(text.split())
+
+
+def _chunk_text(chunk) -> str:
+    # Providers stream either plain strings or lists of content blocks
+    content = chunk.content
+    if isinstance(content, str):
+        return content
+    return "".join(block.get("text", "") for block in content if isinstance(block, dict))
+
+
+def _cut_at_sentence(text: str, max_words: int) -> str:
+    """Trim text to the first sentence end after max_words, else the last one before it."""
+    words = list(re.finditer(r"\S+", text))
+    if len(words) <= max_words:
+        return text
+    limit = words[max_words - 1].start()
+
+    after = SENTENCE_END_PATTERN.search(text, limit)
+    if after:
+        return text[:after.end()]
+
+    before = [m.end() for m in SENTENCE_END_PATTERN.finditer(text, 0, limit)]
+    return text[:before[-1] if before else words[max_words - 1].end()]
+
+
+def stream_within_budget(model, messages: list, max_words: int, overrun_words: int = 150,
+                         cancel_event: Optional[threading.Event] = None) -> tuple[str, bool, dict]:
+    """Stream a response and stop at a sentence boundary once it passes max_words.
+
+    Args:
+        model: Chat model to stream from.
+        messages (list): Messages for the call.
+        max_words (int): Word count after which generation stops at the next sentence end.
+        overrun_words (int): Extra words to wait for a sentence end before cutting. Defaults to 150.
+        cancel_event (threading.Event, optional): Stop streaming once set (used by hedging).
+
+    Returns:
+        Tuple[str, bool, dict]: Text, whether the stream was stopped early, and the usage
+            metadata reported by the provider (incomplete when stopped early).
+    """
+    parts = []
+    usage = {}
+    words = 0
+    in_word = False
+    tail = ""
+    stopped_early = False
+
+    stream = model.stream(messages)
+    try:
+        for chunk in stream:
+            if cancel_event is not None and cancel_event.is_set():
+                raise RuntimeError("LLM request cancelled")
+            if getattr(chunk, "usage_metadata", None):
+                usage = {k: usage.get(k, 0) + chunk.usage_metadata.get(k, 0)
+                         for k in ("input_tokens", "output_tokens")}
+
+            text = _chunk_text(chunk)
+            parts.append(text)
+
+            # Count words incrementally instead of re-splitting the whole response per chunk
+            for char in text:
+                if char.isspace():
+                    in_word = False
+                elif not in_word:
+                    in_word = True
+                    words += 1
+
+            # Keep a few characters so a sentence end split across chunks is still seen
+            recent, tail = tail + text, (tail + text)[-4:]
+            if (words >= max_words and SENTENCE_END_PATTERN.search(recent)) or words >= max_words + overrun_words:
+                stopped_early = True
+                break
+    finally:
+        if hasattr(stream, "close"):
+            # Closing the generator drops the HTTP stream so no more tokens are billed
+            stream.close()
+
+    content = "".join(parts)
+    if stopped_early:
+        content = _cut_at_sentence(content, max_words)
+    return content, stopped_early, usage
+
+
+def generate_with_word_budget(model, messages: list, budget: WordBudget, subtopic: str,
+                              hedge: Optional[HedgePolicy] = None,
+                              stage: str = "subtopic_generation") -> BudgetedOutput:
+    """Generate a subtopic and keep its length inside the word budget.
+
+    Over-long output is stopped while streaming; short output is extended with a
+    targeted continuation request that sees the text generated so far.
+
+    Args:
+        model: Chat model to stream from.
+        messages (list): System prompt plus conversation for the subtopic.
+        budget (WordBudget): Minimum and maximum words.
+        subtopic (str): Subtopic title, used in the continuation prompt.
+        hedge (HedgePolicy, optional): Opt-in hedging of slow requests.
+        stage (str): Metrics stage used to seed hedging latencies.
+
+    Returns:
+        BudgetedOutput: The final text and per-request details.
+    """
+    hedger = get_hedger(f"llm:{stage}", hedge, seed_stage=stage) if hedge else None
+
+    def run(request_messages: list, max_words: int):
+        def attempt(cancel_event: threading.Event):
+            return stream_within_budget(model, request_messages, max_words, budget.overrun_words, cancel_event)
+        return hedger.call(attempt) if hedger else attempt(threading.Event())
+
+    content, stopped_early, usage = run(messages, budget.max_words)
+    result = BudgetedOutput(content=content, words=count_words(content), stopped_early=stopped_early,
+                            input_tokens=usage.get("input_tokens", 0), output_tokens=usage.get("output_tokens", 0),
+                            usage_complete=not stopped_early, word_counts=[count_words(content)])
+
+    while result.words < budget.min_words and result.continuations < budget.max_continuations:
+        words_needed = min(budget.min_words, budget.max_words) - result.words
+        print(f"Subtopic '{subtopic}' is {result.words} words; requesting ~{words_needed} more")
+        continuation_messages = [
+            *messages,
+            AIMessage(content=result.content),
+            HumanMessage(content=SUBTOPIC_CONTINUATION_PROMPT.format(
+                podcast_subtopic=subtopic,
+                words_so_far=result.words,
+                min_words=budget.min_words,
+                words_needed=words_needed
+            ))
+        ]
+        extra, extra_stopped, extra_usage = run(continuation_messages, budget.max_words - result.words)
+        extra_words = count_words(extra)
+        if not extra_words:
+            break
+
+        result.content = f"{result.content.rstrip()}\n\n{extra.strip()}"
+        result.words = count_words(result.content)
+        result.continuations += 1
+        result.stopped_early = result.stopped_early or extra_stopped
+        result.usage_complete = result.usage_complete and not extra_stopped
+        result.input_tokens += extra_usage.get("input_tokens", 0)
+        result.output_tokens += extra_usage.get("output_tokens", 0)
+        result.word_counts.append(extra_words)
+
+    if result.stopped_early:
+        print(f"Subtopic '{subtopic}' reached the {budget.max_words} word budget; stopped at a sentence boundary")
+    return result
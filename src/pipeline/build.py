@@ -0,0 +1,414 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+from src.audio_conversion.combine_audio import combine_audio_files, get_export_targets
+from src.audio_conversion.pcm_cache import file_sha256
+from src.llm import prompts
+from src.llm.agents.file_writer import outline_path, write_outline, write_summary
+from src.llm.blob_store import BlobStore, get_blob_store
+from src.llm.word_budget import SUBTOPIC_MAX_WORDS, SUBTOPIC_MIN_WORDS, count_words
+from src.pipeline.hedging import HedgePolicy
+from src.pipeline.planner import load_outline
+
+
+MANIFEST_PATH = os.path.join("data", "build_manifest.json")
+
+# Stands in for the hash of an output a dry run would rebuild, so everything downstream shows as stale
+PENDING = "pending"
+
+SEGMENT_PATTERN = re.compile(r"^(?:text|summary|audio):subtopic_(\d+)\.(?:txt|mp3)$")
+
+
+@dataclass
+class BuildSpec:
+    """Everything an episode depends on besides its own artifacts."""
+    topic: str
+    message: str
+    reference_path: Optional[str] = None
+    speakers: list[str] = field(default_factory=list)
+    min_words: int = SUBTOPIC_MIN_WORDS
+    max_words: int = SUBTOPIC_MAX_WORDS
+    tts_backend: str = "elevenlabs"
+    tts_fallback: Optional[str] = None
+    voices: dict[str, str] = field(default_factory=dict)
+    turn_gap_ms: int = 350
+    preprocess: Optional[dict] = field(default_factory=dict)
+    export_formats: list[str] = field(default_factory=lambda: ["mp3_128"])
+    tags: dict[str, str] = field(default_factory=dict)
+
+
+def hash_inputs(*parts) -> str:
+    """Hash JSON-serializable inputs into one key."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class BuildManifest:
+    """Input and output content hashes of every artifact from the last build.
+
+    An artifact is fresh when its inputs hash the same as when it was built and
+    its output files still hash to what was written. Output that changed on disk
+    while its inputs did not was edited by hand (or repaired by QA) and is kept.
+    """
+
+    def __init__(self, path: str = MANIFEST_PATH):
+        self.path = path
+        self.artifacts: dict[str, dict] = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.artifacts = json.load(f).get("artifacts", {})
+
+    def check(self, name: str, inputs: str, outputs: list[str]) -> str:
+        """Return "fresh", "edited", "new", "missing" (an output is gone) or "changed" (inputs differ)."""
+        entry = self.artifacts.get(name)
+        if entry is None:
+            return "new"
+        if any(not os.path.exists(path) for path in outputs):
+            return "missing"
+        if entry["inputs"] != inputs:
+            return "changed"
+        if [file_sha256(path) for path in outputs] != entry["outputs"]:
+            return "edited"
+        return "fresh"
+
+    def record(self, name: str, inputs: str, outputs: list[str], **extra) -> None:
+        """Store an artifact's hashes and save the manifest, so an interrupted build keeps its progress."""
+        self.artifacts[name] = {"inputs": inputs, "outputs": [file_sha256(path) for path in outputs], **extra}
+        self.save()
+
+    def forget(self, name: str) -> None:
+        self.artifacts.pop(name, None)
+        self.save()
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path) or ".", suffix=".tmp")
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({"artifacts": self.artifacts}, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+
+class EpisodeBuilder:
+    """Rebuild only the stale artifacts of an episode.
+
+    The dependency chain is outline → subtopic text → subtopic summary → MP3 →
+    combined episode, plus summary.json for the episode metadata. Summaries of
+    earlier subtopics are passed as context whenever a subtopic is generated, but
+    they are not a dependency: editing one subtopic does not regenerate the ones
+    after it.
+    """
+
+    def __init__(self, spec: BuildSpec, text_dir: str = "data/text_output", audio_dir: str = "data/audio_output",
+                 manifest: Optional[BuildManifest] = None, hedge: Optional[HedgePolicy] = None,
+                 tts_workers: int = 4, dry_run: bool = False, store: Optional[BlobStore] = None):
+        self.spec = spec
+        self.text_dir = text_dir
+        self.audio_dir = audio_dir
+        self.manifest = manifest or BuildManifest()
+        self.hedge = hedge
+        self.tts_workers = tts_workers
+        self.dry_run = dry_run
+        self.store = store or get_blob_store()
+        self.actions: dict[str, str] = {}
+        self.pending: set[str] = set()
+        self._backend = None
+
+        self.reference = ""
+        if spec.reference_path:
+            with open(spec.reference_path, 'r', encoding='utf-8') as f:
+                self.reference = f.read()
+
+    def _note(self, name: str, action: str) -> None:
+        self.actions[name] = action
+        print(f"  {name:<28} {action}")
+
+    def _rebuild_label(self, status: str) -> str:
+        reason = {"new": "not built yet", "missing": "output missing", "changed": "inputs changed"}[status]
+        return f"{'would rebuild' if self.dry_run else 'rebuilt'} ({reason})"
+
+    def _output_hash(self, name: str, path: str) -> str:
+        return PENDING if name in self.pending else file_sha256(path)
+
+    def _model_name(self) -> str:
+        from src.llm.model import MODEL_NAME
+        return MODEL_NAME
+
+    def _backend_instance(self):
+        if self._backend is None:
+            from src.audio_conversion.tts_backends import get_backend
+            self._backend = get_backend(self.spec.tts_backend, fallback=self.spec.tts_fallback, hedge=self.hedge)
+        return self._backend
+
+    def build_outline(self) -> Optional[list[str]]:
+        """Return the subtopic titles, regenerating the outline when stale (None if a dry run cannot know them)."""
+        name = "outline"
+        path = outline_path(self.text_dir, self.spec.topic)
+        inputs = hash_inputs(self.spec.topic, self.spec.message, BlobStore.make_key(self.reference),
+                             prompts.TOPIC_GENERATING_SYSTEM_PROMPT, self._model_name())
+        status = self.manifest.check(name, inputs, [path])
+
+        if status == "fresh":
+            self._note(name, "fresh")
+            return self.manifest.artifacts[name]["subtopics"]
+        if status == "edited":
+            _, subtopics = load_outline(path)
+            if not self.dry_run:
+                self.manifest.record(name, inputs, [path], subtopics=subtopics)
+            self._note(name, "kept hand edit")
+            return subtopics
+
+        self._note(name, self._rebuild_label(status))
+        if self.dry_run:
+            return None
+
+        from langchain_core.messages import HumanMessage
+        from src.llm.agents.subtopic_agent import subtopic_agent
+
+        command = subtopic_agent({
+            'messages': [HumanMessage(content=self.spec.message)],
+            'topic': self.spec.topic,
+            'reference_document_ref': self.store.put(self.reference) if self.reference else ''
+        })
+        subtopics = command.update['subtopics']
+        os.makedirs(self.text_dir, exist_ok=True)
+        write_outline(self.text_dir, self.spec.topic, subtopics)
+        self.manifest.record(name, inputs, [path], subtopics=subtopics)
+        return subtopics
+
+    def _summary_ref(self, subtopic: str, filename: str) -> str:
+        """Blob key of a subtopic's summary, summarizing again if its text changed."""
+        name = f"summary:{filename}"
+        path = os.path.join(self.text_dir, filename)
+        inputs = hash_inputs(file_sha256(path), prompts.SUBTOPIC_SUMMARY_SYSTEM_PROMPT, self._model_name())
+        entry = self.manifest.artifacts.get(name)
+        if entry and entry["inputs"] == inputs and self.store.exists(entry["ref"]):
+            return entry["ref"]
+
+        from src.llm.agents.subtopic_generator import summarize_subtopic
+        from src.llm.model import get_model
+
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        summary = summarize_subtopic(get_model(), subtopic, content, self.hedge)
+        ref = self.store.put(f"\n\n## {subtopic}\n{summary.content}")
+        self.manifest.record(name, inputs, [], ref=ref)
+        self._note(name, "rebuilt (text changed)")
+        return ref
+
+    def _generate_text(self, index: int, subtopics: list[str], filename: str, inputs: str) -> None:
+        from langchain_core.messages import HumanMessage
+        from src.llm.agents.subtopic_generator import subtopic_generator_agent
+
+        summary_refs = [self._summary_ref(subtopic, f"subtopic_{i:02d}.txt")
+                        for i, subtopic in enumerate(subtopics[:index - 1], 1)]
+        command = subtopic_generator_agent({
+            'messages': [HumanMessage(content=self.spec.message)],
+            'current_subtopic': subtopics[index - 1],
+            'subtopics': subtopics,
+            'subtopic_summary_refs': summary_refs,
+            'reference_document_ref': self.store.put(self.reference) if self.reference else '',
+            'speakers': self.spec.speakers,
+            'hedge_policy': asdict(self.hedge) if self.hedge else {},
+            'word_budget': {'min_words': self.spec.min_words, 'max_words': self.spec.max_words}
+        })
+        update = command.update
+
+        path = os.path.join(self.text_dir, filename)
+        self.store.copy_to(update['subtopic_content_refs'][subtopics[index - 1]], path)
+        self.manifest.record(f"text:{filename}", inputs, [path])
+
+        # The summary came with the generation; record it so later subtopics reuse it
+        summary_inputs = hash_inputs(file_sha256(path), prompts.SUBTOPIC_SUMMARY_SYSTEM_PROMPT, self._model_name())
+        self.manifest.record(f"summary:{filename}", summary_inputs, [], ref=update['subtopic_summary_refs'][0])
+
+    def build_texts(self, subtopics: list[str]) -> list[str]:
+        """Generate stale subtopic texts in order. Returns their filenames."""
+        os.makedirs(self.text_dir, exist_ok=True)
+        generation_prompts = (prompts.SUBTOPIC_GENERATOR_SYSTEM_PROMPT, prompts.DIALOGUE_FORMAT_INSTRUCTIONS,
+                              prompts.SUBTOPIC_CONTINUATION_PROMPT)
+        filenames = []
+        for index, subtopic in enumerate(subtopics, 1):
+            filename = f"subtopic_{index:02d}.txt"
+            name = f"text:{filename}"
+            path = os.path.join(self.text_dir, filename)
+            inputs = hash_inputs(subtopics, subtopic, BlobStore.make_key(self.reference), self.spec.speakers,
+                                 self.spec.min_words, self.spec.max_words, generation_prompts, self._model_name())
+            status = self.manifest.check(name, inputs, [path])
+            filenames.append(filename)
+
+            if status == "fresh":
+                self._note(name, "fresh")
+            elif status == "edited":
+                if not self.dry_run:
+                    self.manifest.record(name, inputs, [path])
+                self._note(name, "kept hand edit")
+            else:
+                self._note(name, self._rebuild_label(status))
+                if self.dry_run:
+                    self.pending.add(name)
+                else:
+                    self._generate_text(index, subtopics, filename, inputs)
+        return filenames
+
+    def remove_orphans(self, count: int) -> None:
+        """Delete texts and MP3s this build made for subtopics that are no longer in the outline."""
+        for name in list(self.manifest.artifacts):
+            match = SEGMENT_PATTERN.match(name)
+            if not match or int(match.group(1)) <= count:
+                continue
+            kind, filename = name.split(":", 1)
+            directory = self.audio_dir if kind == "audio" else self.text_dir
+            self._note(name, "would remove" if self.dry_run else "removed (no longer in the outline)")
+            if not self.dry_run:
+                if kind != "summary" and os.path.exists(os.path.join(directory, filename)):
+                    os.remove(os.path.join(directory, filename))
+                self.manifest.forget(name)
+
+    def build_summary(self, subtopics: list[str], text_files: list[str]) -> None:
+        """Rewrite summary.json when the outline, speakers or any text changed."""
+        name = "summary.json"
+        path = os.path.join(self.text_dir, name)
+        text_hashes = [self._output_hash(f"text:{filename}", os.path.join(self.text_dir, filename))
+                       for filename in text_files]
+        inputs = hash_inputs(self.spec.topic, subtopics, text_files, self.spec.speakers, text_hashes)
+        status = self.manifest.check(name, inputs, [path])
+        if status == "fresh":
+            self._note(name, "fresh")
+            return
+
+        # summary.json is derived metadata, so an edit is overwritten rather than kept
+        self._note(name, self._rebuild_label(status if status != "edited" else "changed"))
+        if self.dry_run:
+            return
+        word_counts = {}
+        for subtopic, filename in zip(subtopics, text_files):
+            with open(os.path.join(self.text_dir, filename), 'r', encoding='utf-8') as f:
+                word_counts[subtopic] = count_words(f.read())
+        write_summary(self.text_dir, self.spec.topic, subtopics, text_files, self.spec.speakers, word_counts)
+        self.manifest.record(name, inputs, [path])
+
+    def build_audio(self, text_files: list[str]) -> list[str]:
+        """Synthesize stale MP3s in parallel. Returns the segment filenames in order."""
+        voice_inputs = (self.spec.tts_backend, self.spec.tts_fallback, self.spec.speakers, self.spec.voices,
+                        self.spec.turn_gap_ms, self.spec.preprocess)
+        audio_files, stale = [], []
+        inputs_by_file = {}
+        for text_file in text_files:
+            audio_file = text_file.replace('.txt', '.mp3')
+            name = f"audio:{audio_file}"
+            path = os.path.join(self.audio_dir, audio_file)
+            inputs = hash_inputs(self._output_hash(f"text:{text_file}", os.path.join(self.text_dir, text_file)),
+                                 voice_inputs)
+            status = self.manifest.check(name, inputs, [path])
+            audio_files.append(audio_file)
+            inputs_by_file[text_file] = inputs
+
+            if status == "fresh":
+                self._note(name, "fresh")
+            elif status == "edited":
+                if not self.dry_run:
+                    self.manifest.record(name, inputs, [path])
+                self._note(name, "kept edited audio")
+            else:
+                self._note(name, self._rebuild_label(status))
+                self.pending.add(name)
+                stale.append(text_file)
+
+        if stale and not self.dry_run:
+            self._synthesize(stale)
+            for text_file in stale:
+                audio_file = text_file.replace('.txt', '.mp3')
+                self.manifest.record(f"audio:{audio_file}", inputs_by_file[text_file],
+                                     [os.path.join(self.audio_dir, audio_file)])
+                self.pending.discard(f"audio:{audio_file}")
+        return audio_files
+
+    def _synthesize(self, text_files: list[str]) -> None:
+        from src.audio_conversion.convert_audio import convert_text
+        from src.audio_conversion.dialogue import convert_dialogue_files
+        from src.audio_conversion.text_preprocessing import TextPreprocessor
+
+        preprocessor = TextPreprocessor(**self.spec.preprocess) if self.spec.preprocess is not None else None
+        backend = self._backend_instance()
+        if self.spec.speakers:
+            written = convert_dialogue_files(text_files, backend, speakers=self.spec.speakers,
+                                             voices=self.spec.voices, turn_gap_ms=self.spec.turn_gap_ms,
+                                             max_workers=self.tts_workers, text_dir=self.text_dir,
+                                             audio_dir=self.audio_dir, preprocessor=preprocessor)
+            # Failed files are skipped, not raised, and may still have an older MP3 on disk: never record those
+            failed = [text_file for text_file in text_files
+                      if os.path.join(self.audio_dir, text_file.replace('.txt', '.mp3')) not in written]
+            if failed:
+                raise RuntimeError(f"Dialogue synthesis failed for {', '.join(failed)}")
+            return
+
+        def convert_one(text_file: str) -> None:
+            convert_text(input_file_name=text_file, output_file_name=text_file.replace('.txt', '.mp3'),
+                         backend=backend, preprocessor=preprocessor, text_dir=self.text_dir, audio_dir=self.audio_dir)
+
+        with ThreadPoolExecutor(max_workers=self.tts_workers) as executor:
+            # list() re-raises the first failure; the MP3s that did finish are still on disk
+            list(executor.map(convert_one, text_files))
+
+    def build_combined(self, subtopics: list[str], audio_files: list[str]) -> Optional[str]:
+        """Combine the segment MP3s (never earlier combined output) when any segment or export setting changed."""
+        name = "combined"
+        targets = get_export_targets(self.spec.export_formats)
+        outputs = [os.path.join(self.audio_dir, target.filename) for target in targets]
+        metadata = {"title": self.spec.topic, **self.spec.tags}
+        segment_hashes = [self._output_hash(f"audio:{audio_file}", os.path.join(self.audio_dir, audio_file))
+                          for audio_file in audio_files]
+        inputs = hash_inputs(segment_hashes, subtopics, [asdict(target) for target in targets], metadata)
+        status = self.manifest.check(name, inputs, outputs)
+        if status == "fresh":
+            self._note(name, "fresh")
+            return outputs[0]
+
+        self._note(name, self._rebuild_label(status if status != "edited" else "changed"))
+        if self.dry_run:
+            return None
+        output_path = combine_audio_files(audio_files, targets[0].filename, self.audio_dir, targets, metadata,
+                                          chapter_titles=subtopics)
+        self.manifest.record(name, inputs, outputs)
+        return output_path
+
+    def build(self) -> dict[str, str]:
+        """Bring every artifact up to date. Returns the action taken per artifact."""
+        subtopics = self.build_outline()
+        if subtopics is None:
+            print("  (the outline would change, so every later artifact would be rebuilt)")
+            return self.actions
+
+        text_files = self.build_texts(subtopics)
+        self.remove_orphans(len(subtopics))
+        self.build_summary(subtopics, text_files)
+        audio_files = self.build_audio(text_files)
+        self.build_combined(subtopics, audio_files)
+        return self.actions
+
+
+def build_episode(spec: BuildSpec, text_dir: str = "data/text_output", audio_dir: str = "data/audio_output",
+                  manifest_path: str = MANIFEST_PATH, hedge: Optional[HedgePolicy] = None,
+                  tts_workers: int = 4, dry_run: bool = False) -> dict[str, str]:
+    """Incrementally build an episode, redoing only what its changed inputs affect.
+
+    Args:
+        spec (BuildSpec): Topic, prompt, reference, voices and export settings.
+        text_dir (str): Directory for the outline, subtopic texts and summary.json.
+        audio_dir (str): Directory for the segment MP3s and the combined episode.
+        manifest_path (str): Where input/output hashes are kept. Defaults to data/build_manifest.json.
+        hedge (HedgePolicy, optional): Opt-in hedging of slow LLM and TTS requests.
+        tts_workers (int): Concurrent TTS requests. Defaults to 4.
+        dry_run (bool): Only report what is stale.
+
+    Returns:
+        Dict[str, str]: Action per artifact ("fresh", "rebuilt (...)", "kept hand edit", ...).
+    """
+    builder = EpisodeBuilder(spec, text_dir, audio_dir, BuildManifest(manifest_path), hedge, tts_workers, dry_run)
+    return builder.build()
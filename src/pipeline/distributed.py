@@ -0,0 +1,290 @@
+import json
+import os
+import socket
+import threading
+import time
+import traceback
+from dataclasses import asdict
+from typing import Callable, Optional
+
+from src.audio_conversion.text_preprocessing import RULE_NAMES, TextPreprocessor
+from src.audio_conversion.tts_backends import TTSBackend, get_backend
+from src.pipeline.hedging import HedgePolicy
+from src.pipeline.task_queue import TERMINAL_TASK_STATUSES, TaskQueue
+
+
+def preprocessor_params(preprocessor: Optional[TextPreprocessor]) -> Optional[dict]:
+    """Describe a preprocessor as task parameters (None when preprocessing is off)."""
+    if preprocessor is None:
+        return None
+    enabled = {rule.name for rule in preprocessor.rules}
+    return {"disabled_rules": [name for name in RULE_NAMES if name not in enabled]}
+
+
+class TaskContext:
+    """What a handler gets besides its parameters: the leased task and the worker's shared backends."""
+
+    def __init__(self, worker: "TaskWorker", task: dict):
+        self.worker = worker
+        self.task = task
+
+    def backend(self, params: dict) -> TTSBackend:
+        return self.worker.backend(params.get("tts_backend", "elevenlabs"), params.get("tts_fallback"),
+                                   params.get("hedge"))
+
+
+def run_tts_segment(params: dict, context: TaskContext) -> dict:
+    """Synthesize one subtopic file into the episode's audio directory."""
+    from src.audio_conversion.convert_audio import convert_text
+    from src.audio_conversion.dialogue import convert_dialogue_files
+
+    preprocess = params.get("preprocess")
+    preprocessor = TextPreprocessor(**preprocess) if preprocess is not None else None
+    backend = context.backend(params)
+    text_file = params["text_file"]
+    output_file = text_file.replace('.txt', '.mp3')
+    output_path = os.path.join(params["audio_dir"], output_file)
+
+    if params.get("dialogue"):
+        written = convert_dialogue_files([text_file], backend, speakers=params.get("speakers"),
+                                         voices=params.get("voices"), turn_gap_ms=params.get("turn_gap_ms", 350),
+                                         max_workers=params.get("turn_workers", 4), text_dir=params["text_dir"],
+                                         audio_dir=params["audio_dir"], preprocessor=preprocessor)
+        # A file with failed turns is skipped rather than raised; fail the task so the queue retries it
+        if output_path not in written:
+            raise RuntimeError(f"Dialogue synthesis failed for {text_file}")
+    else:
+        convert_text(input_file_name=text_file, output_file_name=output_file, backend=backend,
+                     preprocessor=preprocessor, text_dir=params["text_dir"], audio_dir=params["audio_dir"])
+    return {"output": output_path}
+
+
+def run_generate_episode(params: dict, context: TaskContext) -> dict:
+    """Run the generation graph for one episode, writing its text into params["text_dir"]."""
+    from langchain_core.messages import HumanMessage
+    from src.llm.blob_store import get_blob_store
+    from src.llm.graph import graph
+
+    reference = params.get("reference", "")
+    result = graph.invoke({
+        'messages': [HumanMessage(content=params["message"])],
+        'topic': params["topic"],
+        'reference_document_ref': get_blob_store().put(reference) if reference else '',
+        'speakers': params.get("speakers", []),
+        'text_output_dir': params["text_dir"],
+        'hedge_policy': params.get("hedge") or {},
+        'word_budget': params.get("word_budget", {})
+    })
+    return {"text_dir": params["text_dir"], "subtopics": len(result.get('subtopics', []))}
+
+
+TASK_HANDLERS: dict[str, Callable[[dict, TaskContext], dict]] = {
+    "tts_segment": run_tts_segment,
+    "generate_episode": run_generate_episode,
+}
+
+
+def register_task_handler(kind: str, handler: Callable[[dict, TaskContext], dict]) -> None:
+    """Make a task kind runnable by workers."""
+    TASK_HANDLERS[kind] = handler
+
+
+class TaskWorker:
+    """Threads that lease tasks from a shared queue, heartbeat while running them and report results.
+
+    Run any number of these processes, on one host or many, against the same
+    queue file; each lease is held by exactly one worker thread at a time.
+    """
+
+    def __init__(self, queue: TaskQueue, concurrency: int = 1, lease_seconds: float = 60,
+                 kinds: Optional[list[str]] = None, poll_seconds: float = 1.0, worker_id: Optional[str] = None):
+        self.queue = queue
+        self.lease_seconds = lease_seconds
+        self.kinds = kinds
+        self.poll_seconds = poll_seconds
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.exit_when_idle = False
+        self.stop_event = threading.Event()
+        self.completed = 0
+        self._backends: dict[tuple, TTSBackend] = {}
+        self._lock = threading.Lock()
+        self.threads = [threading.Thread(target=self._loop, name=f"{self.worker_id}-{i}", daemon=True)
+                        for i in range(concurrency)]
+
+    def backend(self, name: str, fallback: Optional[str], hedge: Optional[dict]) -> TTSBackend:
+        # One backend per configuration, shared by all tasks this process runs
+        key = (name, fallback, json.dumps(hedge, sort_keys=True))
+        with self._lock:
+            if key not in self._backends:
+                self._backends[key] = get_backend(name, fallback=fallback,
+                                                  hedge=HedgePolicy(**hedge) if hedge else None)
+            return self._backends[key]
+
+    def run(self, exit_when_idle: bool = False) -> None:
+        """Work until stopped (or, with exit_when_idle, until the queue has nothing left to lease)."""
+        self.exit_when_idle = exit_when_idle
+        for thread in self.threads:
+            thread.start()
+        try:
+            for thread in self.threads:
+                while thread.is_alive():
+                    thread.join(0.5)
+        except KeyboardInterrupt:
+            self.stop_event.set()
+            raise
+
+    def _heartbeat(self, task_id: str, worker: str, done: threading.Event) -> None:
+        # Renew at a third of the lease so one missed beat does not lose the task
+        while not done.wait(self.lease_seconds / 3):
+            try:
+                renewed = self.queue.heartbeat(task_id, worker, self.lease_seconds)
+            except Exception as e:
+                # A busy or briefly unreachable database must not end the heartbeats; try again next beat
+                print(f"[{worker}] heartbeat for {task_id} failed, retrying: {type(e).__name__}: {e}")
+                continue
+            if not renewed:
+                print(f"[{worker}] lost the lease on {task_id}")
+                return
+
+    def _loop(self) -> None:
+        worker = threading.current_thread().name
+        while not self.stop_event.is_set():
+            task = self.queue.lease(worker, self.lease_seconds, self.kinds)
+            if task is None:
+                if self.exit_when_idle:
+                    return
+                self.stop_event.wait(self.poll_seconds)
+                continue
+            self._run_task(task, worker)
+
+    def _run_task(self, task: dict, worker: str) -> None:
+        task_id = task["id"]
+        handler = TASK_HANDLERS.get(task["kind"])
+        print(f"[{worker}] {task['kind']} {task_id} (attempt {task['attempts']}/{task['max_attempts']})")
+        if handler is None:
+            self.queue.fail(task_id, worker, f"No handler for task kind '{task['kind']}'")
+            return
+
+        done = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(task_id, worker, done), daemon=True)
+        heartbeat.start()
+        try:
+            result = handler(task["params"], TaskContext(self, task))
+        except Exception as e:
+            traceback.print_exc()
+            status = self.queue.fail(task_id, worker, f"{type(e).__name__}: {e}")
+            print(f"[{worker}] {task_id} failed ({status or 'lease lost'}): {e}")
+            return
+        finally:
+            done.set()
+            heartbeat.join()
+
+        if self.queue.complete(task_id, worker, result):
+            with self._lock:
+                self.completed += 1
+            print(f"[{worker}] {task_id} done")
+        else:
+            # Another worker took the task over after our lease expired; its result wins
+            print(f"[{worker}] {task_id} finished after its lease was lost; result discarded")
+
+
+def wait_for_batch(queue: TaskQueue, batch: str, poll_seconds: float = 2.0,
+                   timeout: Optional[float] = None) -> list[dict]:
+    """Block until every task in a batch has succeeded or failed, printing progress.
+
+    Returns:
+        List[dict]: The batch's tasks in submission order.
+
+    Raises:
+        TimeoutError: If timeout seconds pass first.
+    """
+    start = time.monotonic()
+    reported = -1
+    while True:
+        tasks = queue.batch_tasks(batch)
+        finished = sum(1 for task in tasks if task["status"] in TERMINAL_TASK_STATUSES)
+        if finished != reported:
+            running = sum(1 for task in tasks if task["status"] == "leased")
+            print(f"Batch {batch}: {finished}/{len(tasks)} finished, {running} running")
+            reported = finished
+        if finished == len(tasks):
+            return tasks
+        if timeout is not None and time.monotonic() - start > timeout:
+            raise TimeoutError(f"Batch {batch} not finished after {timeout} seconds")
+        time.sleep(poll_seconds)
+
+
+def distribute_convert(
+    queue: TaskQueue,
+    tts_backend: str = "elevenlabs",
+    tts_fallback: Optional[str] = None,
+    voices: Optional[dict[str, str]] = None,
+    turn_gap_ms: int = 350,
+    turn_workers: int = 4,
+    preprocessor: Optional[TextPreprocessor] = None,
+    text_dir: str = "data/text_output",
+    audio_dir: str = "data/audio_output",
+    hedge: Optional[HedgePolicy] = None,
+    timeout: Optional[float] = None) -> list[dict]:
+    """Queue one tts_segment task per subtopic file and wait for the workers to finish them.
+
+    Workers write the MP3s straight into audio_dir, so text_dir and audio_dir must
+    be on storage every worker can reach (relative paths resolve from each
+    worker's working directory).
+
+    Returns:
+        List[dict]: Finished tasks in subtopic order.
+
+    Raises:
+        FileNotFoundError: If summary.json is missing.
+        RuntimeError: If any segment failed on every attempt.
+    """
+    summary_path = os.path.join(text_dir, "summary.json")
+    if not os.path.exists(summary_path):
+        raise FileNotFoundError(f"Summary file not found: {summary_path}")
+    with open(summary_path, 'r', encoding='utf-8') as f:
+        summary = json.load(f)
+
+    subtopic_files = summary.get('subtopic_files_generated', [])
+    params_list = [{
+        "text_file": text_file,
+        "text_dir": text_dir,
+        "audio_dir": audio_dir,
+        "tts_backend": tts_backend,
+        "tts_fallback": tts_fallback,
+        "dialogue": summary.get('format') == 'dialogue',
+        "speakers": summary.get('speakers'),
+        "voices": voices,
+        "turn_gap_ms": turn_gap_ms,
+        "turn_workers": turn_workers,
+        "preprocess": preprocessor_params(preprocessor),
+        "hedge": asdict(hedge) if hedge else None
+    } for text_file in subtopic_files]
+    if not params_list:
+        print("No subtopic files found in summary file.")
+        return []
+
+    tasks = queue.submit_many("tts_segment", params_list)
+    batch = tasks[0]["batch"]
+    print(f"Queued {len(tasks)} segment task(s) as batch {batch} in {queue.db_path}")
+    tasks = wait_for_batch(queue, batch, timeout=timeout)
+
+    failed = [task for task in tasks if task["status"] == "failed"]
+    if failed:
+        details = "; ".join(f"{task['params']['text_file']}: {task['error']}" for task in failed)
+        raise RuntimeError(f"{len(failed)} segment(s) failed: {details}")
+    return tasks
+
+
+def distribute_generate(queue: TaskQueue, params: dict, timeout: Optional[float] = None) -> dict:
+    """Queue one generate_episode task and wait for a worker to finish it.
+
+    Raises:
+        RuntimeError: If generation failed on every attempt.
+    """
+    task = queue.submit("generate_episode", params, max_attempts=2)
+    print(f"Queued generation task {task['id']} in {queue.db_path}")
+    task = wait_for_batch(queue, task["batch"], timeout=timeout)[0]
+    if task["status"] == "failed":
+        raise RuntimeError(f"Generation failed: {task['error']}")
+    return task["result"]
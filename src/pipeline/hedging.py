@@ -0,0 +1,160 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Optional, TypeVar
+
+from src.pipeline.metrics import METRICS_FILE, load_stage_metrics, percentile, record_stage
+
+
+T = TypeVar("T")
+
+
+@dataclass
+class HedgePolicy:
+    """When to send a duplicate request, and how many duplicates are affordable.
+
+    A request that has not finished after the `percentile` latency of recent calls
+    (scaled by request size, e.g. characters for TTS) gets a duplicate. Duplicates
+    across all hedged stages are capped at `budget_fraction` of all requests.
+    """
+    percentile: float = 0.95
+    min_samples: int = 10
+    window: int = 200
+    budget_fraction: float = 0.10
+    min_delay_seconds: float = 1.0
+
+
+class HedgeBudget:
+    """Process-wide cap on duplicate requests, shared by every hedger."""
+
+    def __init__(self):
+        self.requests = 0
+        self.hedges = 0
+        self._lock = threading.Lock()
+
+    def count_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def try_spend(self, fraction: float) -> bool:
+        # The duplicate itself must fit the budget, so the first request never hedges
+        with self._lock:
+            if self.hedges + 1 <= fraction * self.requests:
+                self.hedges += 1
+                return True
+            return False
+
+
+GLOBAL_BUDGET = HedgeBudget()
+
+# Duplicates run here; a cancelled loser may finish its current chunk before exiting
+_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="hedge")
+
+
+class Hedger:
+    """Issue a backup request when the primary is slower than recent history.
+
+    The wrapped function receives a threading.Event and should stop early once it
+    is set (for example by closing a streaming response). The first successful
+    response wins and the other attempt is cancelled. Every hedge is recorded as a
+    "hedge" stage in the metrics log.
+    """
+
+    def __init__(self, name: str, policy: HedgePolicy, budget: HedgeBudget = GLOBAL_BUDGET,
+                 seed_stage: Optional[str] = None, seed_size_field: Optional[str] = None,
+                 seed_match: Optional[dict] = None, metrics_file: str = METRICS_FILE):
+        self.name = name
+        self.policy = policy
+        self.budget = budget
+        self.metrics_file = metrics_file
+        self.latencies = deque(maxlen=policy.window)
+        self._lock = threading.Lock()
+
+        # Start from previous runs so hedging works from the first request
+        if seed_stage:
+            records = [r for r in load_stage_metrics(metrics_file, seed_stage)
+                       if r.get("ok", True) and all(r.get(k) == v for k, v in (seed_match or {}).items())]
+            for record in records[-policy.window:]:
+                size = record.get(seed_size_field, 1) if seed_size_field else 1
+                if size:
+                    self.latencies.append(record["duration_seconds"] / size)
+
+    def threshold(self, size: float = 1.0) -> Optional[float]:
+        """Seconds to wait before hedging a request of this size, or None without enough history."""
+        with self._lock:
+            if len(self.latencies) < self.policy.min_samples:
+                return None
+            per_unit = percentile(list(self.latencies), self.policy.percentile)
+        return max(self.policy.min_delay_seconds, per_unit * size)
+
+    def _attempt(self, fn: Callable[[threading.Event], T], cancel: threading.Event, size: float,
+                 started: Optional[threading.Event] = None) -> T:
+        if started is not None:
+            started.set()
+        start = time.perf_counter()
+        result = fn(cancel)
+        if not cancel.is_set():
+            with self._lock:
+                self.latencies.append((time.perf_counter() - start) / max(size, 1e-9))
+        return result
+
+    def call(self, fn: Callable[[threading.Event], T], size: float = 1.0) -> T:
+        """Run fn, hedging it with a duplicate if it exceeds the latency threshold.
+
+        Args:
+            fn (Callable[[Event], T]): The request. Receives a cancel event.
+            size (float): Request size the threshold scales with (1 for per-call). Defaults to 1.0.
+
+        Returns:
+            T: The first successful result.
+        """
+        self.budget.count_request()
+        start = time.perf_counter()
+        delay = self.threshold(size)
+        events = [threading.Event()]
+        started = threading.Event()
+        futures: list[Future] = [_executor.submit(self._attempt, fn, events[0], size, started)]
+
+        if delay is not None:
+            # Time spent waiting for a free thread is not the request being slow: the delay starts with the attempt
+            started.wait()
+            done, _ = wait(futures, timeout=delay)
+            if not done and self.budget.try_spend(self.policy.budget_fraction):
+                print(f"Hedging slow {self.name} request after {delay:.1f}s")
+                events.append(threading.Event())
+                futures.append(_executor.submit(self._attempt, fn, events[1], size))
+
+        pending = set(futures)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+                # Winner found: cancel the other attempt
+                for other, event in zip(futures, events):
+                    if other is not future:
+                        event.set()
+                        other.cancel()
+                if len(futures) > 1:
+                    record_stage("hedge", time.perf_counter() - start, self.metrics_file, hedger=self.name,
+                                 threshold_seconds=round(delay, 3), backup_won=future is futures[1])
+                return future.result()
+        raise error
+
+
+_HEDGERS: dict[str, Hedger] = {}
+_HEDGERS_LOCK = threading.Lock()
+
+
+def get_hedger(name: str, policy: HedgePolicy, seed_stage: Optional[str] = None,
+               seed_size_field: Optional[str] = None, seed_match: Optional[dict] = None) -> Hedger:
+    """Return the process-wide hedger for a stage, creating it on first use."""
+    with _HEDGERS_LOCK:
+        if name not in _HEDGERS:
+            _HEDGERS[name] = Hedger(name, policy, seed_stage=seed_stage, seed_size_field=seed_size_field,
+                                    seed_match=seed_match)
+        return _HEDGERS[name]
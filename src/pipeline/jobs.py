@@ -0,0 +1,157 @@
+import json
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+
+JOBS_DB = os.path.join("data", "jobs.db")
+
+TERMINAL_STATUSES = {"succeeded", "failed", "cancelled"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    params TEXT NOT NULL,
+    workspace TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    result TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at);
+CREATE TABLE IF NOT EXISTS job_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    stage TEXT NOT NULL,
+    message TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS job_events_job ON job_events (job_id, id);
+"""
+
+
+class JobQueue:
+    """SQLite-backed queue of episode jobs with progress events.
+
+    Each call opens its own short-lived connection, so the queue can be shared
+    by the HTTP handler threads and the worker threads of one process.
+    """
+
+    def __init__(self, db_path: str = JOBS_DB, workspace_root: str = os.path.join("data", "jobs")):
+        self.db_path = db_path
+        self.workspace_root = workspace_root
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _row_to_job(row: sqlite3.Row) -> dict:
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        return job
+
+    def submit(self, params: dict) -> dict:
+        """Queue a new episode job and return it."""
+        job_id = uuid.uuid4().hex[:12]
+        workspace = os.path.join(self.workspace_root, job_id)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, params, workspace, created_at) VALUES (?, 'queued', ?, ?, ?)",
+                (job_id, json.dumps(params), workspace, time.time())
+            )
+        self.add_event(job_id, "queued", "Job queued")
+        return self.get(job_id)
+
+    def claim(self) -> Optional[dict]:
+        """Atomically take the oldest queued job and mark it running."""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute("UPDATE jobs SET status = 'running', started_at = ? WHERE id = ?", (time.time(), row["id"]))
+            conn.execute("COMMIT")
+        return self.get(row["id"])
+
+    def finish(self, job_id: str, status: str, error: Optional[str] = None, result: Optional[dict] = None) -> None:
+        """Move a job into a terminal status."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, error = ?, result = ? WHERE id = ?",
+                (status, time.time(), error, json.dumps(result) if result is not None else None, job_id)
+            )
+        self.add_event(job_id, status, error or f"Job {status}")
+
+    def cancel(self, job_id: str) -> Optional[dict]:
+        """Cancel a queued job immediately, or ask a running job to stop at its next checkpoint."""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            if row["status"] == "queued":
+                conn.execute("UPDATE jobs SET status = 'cancelled', finished_at = ?, cancel_requested = 1 WHERE id = ?",
+                             (time.time(), job_id))
+            elif row["status"] == "running":
+                conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ?", (job_id,))
+            conn.execute("COMMIT")
+        if row["status"] not in TERMINAL_STATUSES:
+            self.add_event(job_id, "cancel", "Cancellation requested")
+        return self.get(job_id)
+
+    def is_cancel_requested(self, job_id: str) -> bool:
+        with self._connect() as conn:
+            row = conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row["cancel_requested"])
+
+    def requeue_running(self) -> int:
+        """Return jobs left running by a previous process to the queue. Returns the count."""
+        with self._connect() as conn:
+            cursor = conn.execute("UPDATE jobs SET status = 'queued', started_at = NULL WHERE status = 'running'")
+            return cursor.rowcount
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def list_jobs(self, limit: int = 100) -> list[dict]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    def add_event(self, job_id: str, stage: str, message: str) -> None:
+        with self._connect() as conn:
+            conn.execute("INSERT INTO job_events (job_id, created_at, stage, message) VALUES (?, ?, ?, ?)",
+                         (job_id, time.time(), stage, message))
+
+    def events(self, job_id: str, after_id: int = 0) -> list[dict]:
+        """Return progress events for a job newer than after_id."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, created_at, stage, message FROM job_events WHERE job_id = ? AND id > ? ORDER BY id",
+                (job_id, after_id)
+            ).fetchall()
+        return [dict(row) for row in rows]
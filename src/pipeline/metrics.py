@@ -0,0 +1,148 @@
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Iterator, Optional
+
+
+METRICS_FILE = os.path.join("data", "metrics", "stage_metrics.jsonl")
+
+_write_lock = threading.Lock()
+
+
+def record_stage(stage: str, duration_seconds: float, metrics_file: str = METRICS_FILE, **fields) -> dict:
+    """Append one stage measurement to the metrics log.
+
+    Args:
+        stage (str): Stage name, e.g. "subtopic_generation", "tts" or "combine".
+        duration_seconds (float): Wall time of the stage call.
+        metrics_file (str): JSONL file to append to. Defaults to data/metrics/stage_metrics.jsonl.
+        **fields: Extra measurements (tokens, characters, backend, ...).
+
+    Returns:
+        dict: The record that was written.
+    """
+    record = {
+        "stage": stage,
+        "duration_seconds": round(duration_seconds, 4),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        **fields
+    }
+    with _write_lock:
+        os.makedirs(os.path.dirname(metrics_file), exist_ok=True)
+        with open(metrics_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return record
+
+
+@contextmanager
+def stage_timer(stage: str, metrics_file: str = METRICS_FILE, **fields) -> Iterator[dict]:
+    """Time a block and record it as a stage measurement.
+
+    The yielded dict can be filled with measurements that are only known once the
+    work is done (e.g. output tokens). Failed calls are recorded with ok=False.
+
+    Example:
+        with stage_timer("tts", backend="elevenlabs") as m:
+            audio = backend.synthesize(text)
+            m["characters"] = len(text)
+    """
+    measurements = dict(fields)
+    start = time.perf_counter()
+    ok = False
+    try:
+        yield measurements
+        ok = True
+    finally:
+        record_stage(stage, time.perf_counter() - start, metrics_file, ok=ok, **measurements)
+
+
+def load_stage_metrics(metrics_file: str = METRICS_FILE, stage: Optional[str] = None) -> list[dict]:
+    """Load recorded stage measurements, optionally filtered to one stage.
+
+    Args:
+        metrics_file (str): JSONL metrics log. Defaults to data/metrics/stage_metrics.jsonl.
+        stage (str, optional): Only return records for this stage.
+
+    Returns:
+        List[dict]: Records in the order they were written. Empty if no log exists.
+    """
+    if not os.path.exists(metrics_file):
+        return []
+
+    records = []
+    with open(metrics_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if stage is None or record.get("stage") == stage:
+                records.append(record)
+    return records
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """Return the nearest-rank percentile of values (fraction in 0..1)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize_stage_metrics(records: list[dict]) -> dict[str, dict]:
+    """Aggregate successful stage records into latency percentiles and throughput rates.
+
+    Args:
+        records (List[dict]): Records from load_stage_metrics.
+
+    Returns:
+        Dict[str, dict]: Per stage: count, mean/p50/p95/p99 seconds, and where the
+            fields were recorded, output_tokens_per_second, characters_per_second,
+            output_tokens_per_word and mean/max_state_bytes.
+    """
+    by_stage: dict[str, list[dict]] = {}
+    for record in records:
+        if record.get("ok", True):
+            by_stage.setdefault(record["stage"], []).append(record)
+
+    summary = {}
+    for stage, stage_records in by_stage.items():
+        durations = [r["duration_seconds"] for r in stage_records]
+        total_duration = sum(durations)
+        stats = {
+            "count": len(stage_records),
+            "mean_seconds": total_duration / len(durations),
+            "p50_seconds": percentile(durations, 0.50),
+            "p95_seconds": percentile(durations, 0.95),
+            "p99_seconds": percentile(durations, 0.99),
+        }
+
+        # Token rates only use calls that reported a complete output token count
+        token_records = [r for r in stage_records if r.get("output_tokens")]
+        output_tokens = sum(r["output_tokens"] for r in token_records)
+        token_duration = sum(r["duration_seconds"] for r in token_records)
+        token_words = sum(r.get("words", 0) for r in token_records)
+        characters = sum(r.get("characters", 0) for r in stage_records)
+        words = sum(r.get("words", 0) for r in stage_records)
+        if output_tokens and token_duration:
+            stats["output_tokens_per_second"] = output_tokens / token_duration
+        if characters and total_duration:
+            stats["characters_per_second"] = characters / total_duration
+        if output_tokens and token_words:
+            stats["output_tokens_per_word"] = output_tokens / token_words
+        if words:
+            stats["mean_words"] = words / len(stage_records)
+        state_sizes = [r["state_bytes"] for r in stage_records if "state_bytes" in r]
+        if state_sizes:
+            stats["mean_state_bytes"] = sum(state_sizes) / len(state_sizes)
+            stats["max_state_bytes"] = max(state_sizes)
+        summary[stage] = stats
+    return summary
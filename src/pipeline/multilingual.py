@@ -0,0 +1,194 @@
+import json
+import os
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Optional
+
+from src.audio_conversion.combine_audio import combine_all_audio_in_directory, get_export_targets
+from src.audio_conversion.convert_audio import convert_all_subtopics
+from src.audio_conversion.text_preprocessing import DEFAULT_PREPROCESSOR, ENGLISH_RULES, TextPreprocessor
+from src.audio_conversion.tts_backends import get_backend
+from src.llm.agents.file_writer import write_summary
+from src.llm.translation import SOURCE_LANGUAGE, TranslationCache, language_name, translate_text, translate_titles
+from src.llm.word_budget import count_words
+from src.pipeline.hedging import HedgePolicy
+
+
+def language_dirs(language: str, text_dir: str = "data/text_output",
+                  audio_dir: str = "data/audio_output") -> tuple[str, str]:
+    """Text and audio directories of one language's rendition, nested in the source episode's directories."""
+    return os.path.join(text_dir, language), os.path.join(audio_dir, language)
+
+
+def translate_episode(language: str, executor: Executor, source_text_dir: str = "data/text_output",
+                      text_dir: Optional[str] = None, hedge: Optional[HedgePolicy] = None,
+                      cache: Optional[TranslationCache] = None) -> dict:
+    """Translate a generated episode's subtopic files and titles, writing a summary.json for the language.
+
+    Args:
+        language (str): Target language code (e.g. "de").
+        executor (Executor): Pool shared by every language for the chunk translations.
+        source_text_dir (str): Directory of the generated episode. Defaults to "data/text_output".
+        text_dir (str, optional): Where the translation goes. Defaults to <source_text_dir>/<language>.
+        hedge (HedgePolicy, optional): Opt-in hedging of slow requests.
+        cache (TranslationCache, optional): Translation cache. Defaults to data/translations.
+
+    Returns:
+        dict: The language's summary.json contents.
+
+    Raises:
+        FileNotFoundError: If the source summary.json is missing.
+    """
+    summary_path = os.path.join(source_text_dir, "summary.json")
+    if not os.path.exists(summary_path):
+        raise FileNotFoundError(f"Summary file not found: {summary_path}")
+    with open(summary_path, 'r', encoding='utf-8') as f:
+        summary = json.load(f)
+
+    text_dir = text_dir or language_dirs(language, source_text_dir)[0]
+    os.makedirs(text_dir, exist_ok=True)
+    subtopics = summary.get('subtopics', [])
+    subtopic_files = summary.get('subtopic_files_generated', [])
+    speakers = summary.get('speakers') or []
+
+    # Titles go in one small request alongside the subtopic chunks
+    titles = executor.submit(translate_titles, summary.get('topic', ''), subtopics, language, hedge, cache)
+
+    chunks = cached = 0
+    word_counts = {}
+    for subtopic, filename in zip(subtopics, subtopic_files):
+        with open(os.path.join(source_text_dir, filename), 'r', encoding='utf-8') as f:
+            source = f.read()
+        translation, file_chunks, file_cached = translate_text(source, language, subtopic, executor, speakers,
+                                                               hedge, cache)
+        with open(os.path.join(text_dir, filename), 'w', encoding='utf-8') as f:
+            f.write(translation)
+        word_counts[subtopic] = count_words(translation)
+        chunks += file_chunks
+        cached += file_cached
+
+    topic, translated_subtopics = titles.result()
+    translated_counts = {translated: word_counts[subtopic]
+                         for subtopic, translated in zip(subtopics, translated_subtopics) if subtopic in word_counts}
+    write_summary(text_dir, topic, translated_subtopics, subtopic_files, speakers, translated_counts, language)
+    print(f"[{language}] Translated {len(subtopic_files)} subtopics ({cached}/{chunks} chunks from cache)")
+
+    with open(os.path.join(text_dir, "summary.json"), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def render_language(
+    language: str,
+    executor: Executor,
+    source_text_dir: str = "data/text_output",
+    source_audio_dir: str = "data/audio_output",
+    tts_backend: str = "elevenlabs",
+    tts_fallback: Optional[str] = None,
+    voices: Optional[dict[str, str]] = None,
+    turn_gap_ms: int = 350,
+    preprocessor: Optional[TextPreprocessor] = DEFAULT_PREPROCESSOR,
+    tts_workers: int = 4,
+    export_formats: Optional[list[str]] = None,
+    tags: Optional[dict[str, str]] = None,
+    hedge: Optional[HedgePolicy] = None,
+    cache: Optional[TranslationCache] = None) -> str:
+    """Translate, synthesize and combine one language's rendition of a generated episode.
+
+    Returns:
+        str: Path to the language's combined episode.
+    """
+    text_dir, audio_dir = language_dirs(language, source_text_dir, source_audio_dir)
+    summary = translate_episode(language, executor, source_text_dir, text_dir, hedge, cache)
+
+    os.makedirs(audio_dir, exist_ok=True)
+    convert_all_subtopics(
+        backend=get_backend(tts_backend, fallback=tts_fallback, hedge=hedge, language=language),
+        voices=voices,
+        turn_gap_ms=turn_gap_ms,
+        max_workers=tts_workers,
+        preprocessor=preprocessor.without(ENGLISH_RULES) if preprocessor is not None else None,
+        text_dir=text_dir,
+        audio_dir=audio_dir
+    )
+    return combine_all_audio_in_directory(
+        audio_dir=audio_dir,
+        targets=get_export_targets(export_formats or ["mp3_128"]),
+        metadata={"title": summary["topic"], "language": language, **(tags or {})},
+        summary_path=os.path.join(text_dir, "summary.json")
+    )
+
+
+def render_languages(
+    languages: list[str],
+    source_text_dir: str = "data/text_output",
+    source_audio_dir: str = "data/audio_output",
+    tts_backend: str = "elevenlabs",
+    tts_fallback: Optional[str] = None,
+    voices: Optional[dict[str, str]] = None,
+    turn_gap_ms: int = 350,
+    preprocessor: Optional[TextPreprocessor] = DEFAULT_PREPROCESSOR,
+    tts_workers: int = 4,
+    translate_workers: int = 8,
+    export_formats: Optional[list[str]] = None,
+    tags: Optional[dict[str, str]] = None,
+    hedge: Optional[HedgePolicy] = None) -> dict[str, str]:
+    """Render a generated episode into several languages at once.
+
+    The outline and source script are generated once; here every language
+    translates them on one shared pool of translate_workers requests and starts
+    synthesizing as soon as its own translation is done. The TTS concurrency is
+    split across the languages, so tts_workers stays the total; when there are
+    more languages than workers, at most tts_workers languages render at once.
+    Each language gets its own text and audio directory (e.g.
+    data/audio_output/de/) and combined episode.
+
+    Args:
+        languages (List[str]): Target language codes. The source language itself is skipped.
+        source_text_dir (str): Directory of the generated episode. Defaults to "data/text_output".
+        source_audio_dir (str): Parent of the per-language audio directories. Defaults to "data/audio_output".
+        tts_backend (str): TTS backend name; ElevenLabs switches to its multilingual model. Defaults to "elevenlabs".
+        tts_fallback (str, optional): Backend to switch to after repeated failures.
+        voices (Dict[str, str], optional): Speaker → voice overrides for dialogue episodes.
+        turn_gap_ms (int): Silence between dialogue turns in milliseconds. Defaults to 350.
+        preprocessor (TextPreprocessor, optional): Cleanup before synthesis; its English-only rules are skipped.
+        tts_workers (int): Total concurrent TTS requests. Defaults to 4.
+        translate_workers (int): Concurrent translation requests. Defaults to 8.
+        export_formats (List[str], optional): Export presets for every combined episode. Defaults to mp3_128.
+        tags (Dict[str, str], optional): Extra tags for every combined episode.
+        hedge (HedgePolicy, optional): Opt-in hedging of slow LLM and TTS requests.
+
+    Returns:
+        Dict[str, str]: Combined episode path per language.
+
+    Raises:
+        ValueError: If a language is not supported.
+        RuntimeError: If any language failed; the others are still finished first.
+    """
+    languages = [language for language in dict.fromkeys(languages) if language != SOURCE_LANGUAGE]
+    for language in languages:
+        language_name(language)
+    if not languages:
+        return {}
+
+    cache = TranslationCache()
+    # With more languages than TTS workers, the extra languages wait for a slot instead of overrunning the total
+    concurrent_languages = max(1, min(len(languages), tts_workers))
+    per_language_workers = max(1, tts_workers // concurrent_languages)
+    outputs, errors = {}, {}
+    with ThreadPoolExecutor(max_workers=translate_workers) as translate_pool, \
+            ThreadPoolExecutor(max_workers=concurrent_languages) as language_pool:
+        futures = {language: language_pool.submit(render_language, language, translate_pool, source_text_dir,
+                                                  source_audio_dir, tts_backend, tts_fallback, voices, turn_gap_ms,
+                                                  preprocessor, per_language_workers, export_formats, tags, hedge,
+                                                  cache)
+                   for language in languages}
+        for language, future in futures.items():
+            try:
+                outputs[language] = future.result()
+            except Exception as e:
+                print(f"[{language}] Failed: {e}")
+                errors[language] = str(e)
+
+    if errors:
+        details = "; ".join(f"{language}: {error}" for language, error in errors.items())
+        raise RuntimeError(f"{len(errors)} language(s) failed: {details}")
+    return outputs
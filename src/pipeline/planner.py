@@ -0,0 +1,270 @@
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+from src.llm.prompts import SUBTOPIC_GENERATOR_SYSTEM_PROMPT, SUBTOPIC_SUMMARY_SYSTEM_PROMPT
+from src.llm.word_budget import SUBTOPIC_MAX_WORDS, SUBTOPIC_MIN_WORDS
+from src.pipeline.metrics import METRICS_FILE, load_stage_metrics, summarize_stage_metrics
+
+
+SUMMARY_WORDS = 200
+
+# Fallback rates used until enough runs have been recorded in the metrics log
+DEFAULT_RATES = {
+    "output_tokens_per_word": 1.35,
+    "input_tokens_per_char": 0.25,
+    "characters_per_word": 6.0,
+    "llm_output_tokens_per_second": 60.0,
+    "llm_request_overhead_seconds": 3.0,
+    "outline_seconds": 15.0,
+    "tts_characters_per_second": 400.0,
+    "spoken_words_per_minute": 150.0,
+    "encode_seconds_per_audio_second": 0.02,
+}
+
+# List prices in USD. Update these when plans or models change.
+PRICES = {
+    "llm_input_per_million_tokens": 3.00,
+    "llm_output_per_million_tokens": 15.00,
+    "tts_per_thousand_characters": 0.30,
+}
+
+MIN_HISTORY_SAMPLES = 3
+
+
+@dataclass
+class RateLimits:
+    """Provider limits the concurrency recommendation must fit inside."""
+    llm_requests_per_minute: int = 50
+    llm_output_tokens_per_minute: int = 8000
+    tts_concurrent_requests: int = 5
+
+
+@dataclass
+class SubtopicEstimate:
+    """Predicted cost of one subtopic through every stage."""
+    title: str
+    words: int
+    input_tokens: int
+    output_tokens: int
+    tts_characters: int
+    generation_seconds: float
+    tts_seconds: float
+    audio_seconds: float
+
+
+@dataclass
+class EpisodePlan:
+    """Dry-run estimate for a whole episode."""
+    topic: str
+    subtopics: list[SubtopicEstimate]
+    totals: dict = field(default_factory=dict)
+    stage_seconds: dict = field(default_factory=dict)
+    cost_usd: dict = field(default_factory=dict)
+    recommendations: dict = field(default_factory=dict)
+    rates: dict = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def load_outline(outline_path: str) -> tuple[str, list[str]]:
+    """Load a cached outline from a summary.json or a numbered *_subtopics.txt file.
+
+    Args:
+        outline_path (str): Path to the cached outline.
+
+    Returns:
+        Tuple[str, List[str]]: Topic (empty if unknown) and subtopic titles.
+
+    Raises:
+        FileNotFoundError: If the outline file does not exist.
+    """
+    if not os.path.exists(outline_path):
+        raise FileNotFoundError(f"Outline file not found: {outline_path}")
+
+    with open(outline_path, 'r', encoding='utf-8') as f:
+        if outline_path.endswith(".json"):
+            summary = json.load(f)
+            return summary.get("topic", ""), summary.get("subtopics", [])
+
+        subtopics = []
+        for line in f:
+            line = line.strip()
+            if line:
+                # Lines are written as "1. Title" by the file writer
+                number, _, title = line.partition(". ")
+                subtopics.append(title if number.isdigit() and title else line)
+        return "", subtopics
+
+
+def historical_rates(metrics_file: str = METRICS_FILE) -> tuple[dict, dict]:
+    """Derive per-stage rates from previous runs, falling back to defaults.
+
+    Returns:
+        Tuple[dict, dict]: The rates to plan with, and the per-stage summary they came from.
+    """
+    summary = summarize_stage_metrics(load_stage_metrics(metrics_file))
+    rates = dict(DEFAULT_RATES)
+    rates["sources"] = {name: "default" for name in DEFAULT_RATES}
+
+    def use(rate_name: str, stage: str, stat: str):
+        stats = summary.get(stage, {})
+        if stats.get("count", 0) >= MIN_HISTORY_SAMPLES and stats.get(stat):
+            rates[rate_name] = stats[stat]
+            rates["sources"][rate_name] = f"history:{stage}"
+
+    use("llm_output_tokens_per_second", "subtopic_generation", "output_tokens_per_second")
+    use("output_tokens_per_word", "subtopic_generation", "output_tokens_per_word")
+    use("tts_characters_per_second", "tts", "characters_per_second")
+    use("outline_seconds", "outline", "mean_seconds")
+    return rates, summary
+
+
+def estimate_episode(
+    topic: str,
+    subtopics: list[str],
+    reference_chars: int = 0,
+    prompt_chars: int = len(SUBTOPIC_GENERATOR_SYSTEM_PROMPT),
+    rate_limits: Optional[RateLimits] = None,
+    metrics_file: str = METRICS_FILE) -> EpisodePlan:
+    """Estimate tokens, TTS characters, wall time and cost for an outline.
+
+    Generation is sequential (each subtopic sees the summaries of the previous ones),
+    so its wall time is the sum over subtopics. TTS runs with the recommended
+    concurrency, so its wall time is bounded by the longest subtopic.
+
+    Args:
+        topic (str): Episode topic.
+        subtopics (List[str]): Outline subtopic titles.
+        reference_chars (int): Size of the reference document sent with every prompt.
+        prompt_chars (int): Approximate size of the generation system prompt.
+        rate_limits (RateLimits, optional): Provider limits. Defaults to RateLimits().
+        metrics_file (str): Metrics log with previous runs.
+
+    Returns:
+        EpisodePlan: Per-subtopic and total estimates with recommendations.
+    """
+    rate_limits = rate_limits or RateLimits()
+    rates, history = historical_rates(metrics_file)
+
+    history_words = history.get("subtopic_generation", {}).get("mean_words")
+    if history_words and history["subtopic_generation"]["count"] >= MIN_HISTORY_SAMPLES:
+        words_per_subtopic = int(min(max(history_words, SUBTOPIC_MIN_WORDS), SUBTOPIC_MAX_WORDS))
+    else:
+        words_per_subtopic = (SUBTOPIC_MIN_WORDS + SUBTOPIC_MAX_WORDS) // 2
+
+    estimates = []
+    for i, title in enumerate(subtopics):
+        # Context grows by one summary per completed subtopic
+        context_chars = prompt_chars + reference_chars + i * SUMMARY_WORDS * rates["characters_per_word"]
+        output_tokens = int(words_per_subtopic * rates["output_tokens_per_word"])
+        summary_tokens = int(SUMMARY_WORDS * rates["output_tokens_per_word"])
+        summary_prompt_tokens = int(len(SUBTOPIC_SUMMARY_SYSTEM_PROMPT) * rates["input_tokens_per_char"])
+        input_tokens = int(context_chars * rates["input_tokens_per_char"]) + output_tokens + summary_prompt_tokens
+
+        generation_seconds = (output_tokens + summary_tokens) / rates["llm_output_tokens_per_second"] \
+            + 2 * rates["llm_request_overhead_seconds"]
+        tts_characters = int(words_per_subtopic * rates["characters_per_word"])
+
+        estimates.append(SubtopicEstimate(
+            title=title,
+            words=words_per_subtopic,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens + summary_tokens,
+            tts_characters=tts_characters,
+            generation_seconds=generation_seconds,
+            tts_seconds=tts_characters / rates["tts_characters_per_second"],
+            audio_seconds=words_per_subtopic / rates["spoken_words_per_minute"] * 60
+        ))
+
+    total_output_tokens = sum(e.output_tokens for e in estimates)
+    total_input_tokens = sum(e.input_tokens for e in estimates)
+    total_characters = sum(e.tts_characters for e in estimates)
+    total_audio_seconds = sum(e.audio_seconds for e in estimates)
+
+    # Concurrency: TTS fans out per subtopic up to the provider's concurrent limit.
+    # Generation is a dependency chain; the output-token rate limit sets its floor.
+    tts_workers = max(1, min(len(estimates), rate_limits.tts_concurrent_requests))
+    generation_seconds = sum(e.generation_seconds for e in estimates)
+    token_limited_seconds = total_output_tokens / rate_limits.llm_output_tokens_per_minute * 60
+    generation_wall = max(generation_seconds, token_limited_seconds)
+
+    tts_batches = [estimates[i:i + tts_workers] for i in range(0, len(estimates), tts_workers)]
+    tts_wall = sum(max(e.tts_seconds for e in batch) for batch in tts_batches)
+    encode_wall = total_audio_seconds * rates["encode_seconds_per_audio_second"]
+
+    llm_cost = total_input_tokens / 1e6 * PRICES["llm_input_per_million_tokens"] \
+        + total_output_tokens / 1e6 * PRICES["llm_output_per_million_tokens"]
+    tts_cost = total_characters / 1000 * PRICES["tts_per_thousand_characters"]
+
+    notes = []
+    if token_limited_seconds > generation_seconds:
+        notes.append("Generation is bound by the output-token rate limit, not model speed.")
+    if generation_wall and 2 * len(estimates) / (generation_wall / 60) > rate_limits.llm_requests_per_minute:
+        notes.append("Generation would exceed the LLM requests-per-minute limit; expect throttling.")
+    if len(estimates) > rate_limits.tts_concurrent_requests:
+        notes.append(f"TTS will run in {len(tts_batches)} waves; a higher plan concurrency would shorten it.")
+
+    return EpisodePlan(
+        topic=topic,
+        subtopics=estimates,
+        totals={
+            "subtopics": len(estimates),
+            "words": sum(e.words for e in estimates),
+            "input_tokens": total_input_tokens,
+            "output_tokens": total_output_tokens,
+            "tts_characters": total_characters,
+            "audio_minutes": round(total_audio_seconds / 60, 1),
+        },
+        stage_seconds={
+            "outline": round(rates["outline_seconds"], 1),
+            "generation": round(generation_wall, 1),
+            "tts": round(tts_wall, 1),
+            "encode": round(encode_wall, 1),
+            "total": round(rates["outline_seconds"] + generation_wall + tts_wall + encode_wall, 1),
+        },
+        cost_usd={
+            "llm": round(llm_cost, 2),
+            "tts": round(tts_cost, 2),
+            "total": round(llm_cost + tts_cost, 2),
+        },
+        recommendations={
+            "tts_workers": tts_workers,
+            "generation_concurrency": 1,
+            "notes": notes,
+        },
+        rates=rates
+    )
+
+
+def print_plan(plan: EpisodePlan) -> None:
+    """Print a human-readable plan table."""
+    print(f"Plan for: {plan.topic}")
+    print("-" * 78)
+    print(f"{'#':>2}  {'Subtopic':<36} {'Words':>6} {'Out tok':>8} {'TTS chars':>10} {'Gen s':>6} {'TTS s':>6}")
+    for i, e in enumerate(plan.subtopics, 1):
+        title = e.title if len(e.title) <= 36 else e.title[:33] + "..."
+        print(f"{i:>2}  {title:<36} {e.words:>6} {e.output_tokens:>8} {e.tts_characters:>10} "
+              f"{e.generation_seconds:>6.0f} {e.tts_seconds:>6.0f}")
+    print("-" * 78)
+
+    totals = plan.totals
+    print(f"Words: {totals['words']:,}  |  Tokens in/out: {totals['input_tokens']:,}/{totals['output_tokens']:,}  |  "
+          f"TTS characters: {totals['tts_characters']:,}  |  Audio: ~{totals['audio_minutes']} min")
+    stages = plan.stage_seconds
+    print(f"Wall time: outline {stages['outline']:.0f}s, generation {stages['generation']:.0f}s, "
+          f"TTS {stages['tts']:.0f}s, encode {stages['encode']:.0f}s → ~{stages['total'] / 60:.1f} min total")
+    print(f"Cost: LLM ${plan.cost_usd['llm']:.2f} + TTS ${plan.cost_usd['tts']:.2f} = ${plan.cost_usd['total']:.2f}")
+    print(f"Recommended: --tts-workers {plan.recommendations['tts_workers']} "
+          f"(generation runs sequentially by design)")
+    for note in plan.recommendations["notes"]:
+        print(f"  • {note}")
+
+    sources = plan.rates.get("sources", {})
+    learned = sorted(name for name, source in sources.items() if source != "default")
+    if learned:
+        print(f"Rates from previous runs: {', '.join(learned)}")
+    else:
+        print("No run history yet; using default rates (data/metrics/stage_metrics.jsonl fills in after a run).")
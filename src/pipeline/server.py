@@ -0,0 +1,263 @@
+import json
+import os
+import threading
+import time
+import traceback
+from dataclasses import asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from langchain_core.messages import HumanMessage
+
+from src.audio_conversion.combine_audio import combine_all_audio_in_directory
+from src.audio_conversion.convert_audio import convert_all_subtopics
+from src.audio_conversion.tts_backends import TTSBackend, get_backend
+from src.llm.blob_store import get_blob_store
+from src.llm.graph import graph
+from src.pipeline.hedging import HedgePolicy
+from src.pipeline.jobs import JOBS_DB, TERMINAL_STATUSES, JobQueue
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job when cancellation was requested."""
+
+
+class EpisodeRunner:
+    """Runs episode jobs against the process-wide compiled graph and pooled TTS clients."""
+
+    def __init__(self, queue: JobQueue, tts_backend: str = "elevenlabs", tts_fallback: Optional[str] = None,
+                 tts_workers: int = 4, hedge: Optional[HedgePolicy] = None):
+        self.queue = queue
+        self.default_backend = tts_backend
+        self.default_fallback = tts_fallback
+        self.tts_workers = tts_workers
+        self.hedge = hedge
+        self._backends: dict[tuple, TTSBackend] = {}
+        self._lock = threading.Lock()
+
+    def backend(self, name: str, fallback: Optional[str]) -> TTSBackend:
+        """Return a shared backend instance so clients and connections stay warm between jobs."""
+        with self._lock:
+            key = (name, fallback)
+            if key not in self._backends:
+                self._backends[key] = get_backend(name, fallback=fallback, hedge=self.hedge)
+            return self._backends[key]
+
+    def _checkpoint(self, job_id: str) -> None:
+        if self.queue.is_cancel_requested(job_id):
+            raise JobCancelled()
+
+    def run(self, job: dict) -> dict:
+        """Generate, convert and combine one episode inside the job's workspace."""
+        job_id, params = job["id"], job["params"]
+        text_dir = os.path.join(job["workspace"], "text_output")
+        audio_dir = os.path.join(job["workspace"], "audio_output")
+
+        initial_state = {
+            'messages': [HumanMessage(content=params["message"])],
+            'topic': params["topic"],
+            'reference_document_ref': get_blob_store().put(params["reference"]) if params.get("reference") else '',
+            'speakers': params.get("speakers", []),
+            'text_output_dir': text_dir,
+            'hedge_policy': asdict(self.hedge) if self.hedge else {},
+            'word_budget': params.get("word_budget", {})
+        }
+
+        self.queue.add_event(job_id, "generate", "Generating podcast content")
+        for update in graph.stream(initial_state, stream_mode="updates"):
+            for node, node_update in update.items():
+                detail = ""
+                if node_update and node_update.get("current_subtopic"):
+                    detail = f": {node_update['current_subtopic']}"
+                self.queue.add_event(job_id, "generate", f"{node} finished{detail}")
+            self._checkpoint(job_id)
+
+        self.queue.add_event(job_id, "convert", "Converting text to audio")
+        backend = self.backend(params.get("tts_backend", self.default_backend),
+                               params.get("tts_fallback", self.default_fallback))
+        def file_ready(path: str) -> None:
+            self.queue.add_event(job_id, "convert", f"{os.path.basename(path)} ready")
+            # Stop between files so a cancelled job does not pay for the rest of the episode
+            self._checkpoint(job_id)
+
+        convert_all_subtopics(
+            backend=backend,
+            max_workers=params.get("tts_workers", self.tts_workers),
+            text_dir=text_dir,
+            audio_dir=audio_dir,
+            on_file_ready=file_ready
+        )
+        self._checkpoint(job_id)
+
+        self.queue.add_event(job_id, "combine", "Combining audio files")
+        episode_path = combine_all_audio_in_directory(audio_dir=audio_dir,
+                                                      summary_path=os.path.join(text_dir, "summary.json"))
+        return {"episode": episode_path, "text_dir": text_dir, "audio_dir": audio_dir}
+
+
+class WorkerPool:
+    """Threads that claim queued jobs and run them until stopped."""
+
+    def __init__(self, queue: JobQueue, runner: EpisodeRunner, workers: int = 2, poll_seconds: float = 0.5):
+        self.queue = queue
+        self.runner = runner
+        self.poll_seconds = poll_seconds
+        self.stop_event = threading.Event()
+        self.threads = [threading.Thread(target=self._loop, name=f"episode-worker-{i}", daemon=True)
+                        for i in range(workers)]
+
+    def start(self) -> None:
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self) -> None:
+        self.stop_event.set()
+
+    def _loop(self) -> None:
+        while not self.stop_event.is_set():
+            job = self.queue.claim()
+            if job is None:
+                self.stop_event.wait(self.poll_seconds)
+                continue
+
+            self.queue.add_event(job["id"], "running", f"Started on {threading.current_thread().name}")
+            try:
+                result = self.runner.run(job)
+                self.queue.finish(job["id"], "succeeded", result=result)
+            except JobCancelled:
+                self.queue.finish(job["id"], "cancelled")
+            except Exception as e:
+                traceback.print_exc()
+                self.queue.finish(job["id"], "failed", error=str(e))
+
+
+def make_handler(queue: JobQueue):
+    """Build the request handler class for the job API bound to a queue."""
+
+    class JobRequestHandler(BaseHTTPRequestHandler):
+        server_version = "PodcastWorker/1.0"
+
+        def _send_json(self, status: int, payload) -> None:
+            body = json.dumps(payload, indent=2).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _job_path(self) -> tuple[Optional[str], Optional[str]]:
+            # /jobs/<id> or /jobs/<id>/<action>
+            parts = [p for p in self.path.split("?")[0].split("/") if p]
+            if len(parts) < 2 or parts[0] != "jobs":
+                return None, None
+            return parts[1], parts[2] if len(parts) > 2 else None
+
+        def do_GET(self):
+            if self.path.split("?")[0].rstrip("/") in ("", "/health"):
+                return self._send_json(200, {"status": "ok"})
+            if self.path.split("?")[0].rstrip("/") == "/jobs":
+                return self._send_json(200, queue.list_jobs())
+
+            job_id, action = self._job_path()
+            job = queue.get(job_id) if job_id else None
+            if job is None:
+                return self._send_json(404, {"error": "job not found"})
+            if action is None:
+                return self._send_json(200, job)
+            if action == "events":
+                return self._stream_events(job_id)
+            return self._send_json(404, {"error": f"unknown action '{action}'"})
+
+        def do_POST(self):
+            if self.path.split("?")[0].rstrip("/") == "/jobs":
+                try:
+                    length = int(self.headers.get("Content-Length", 0))
+                    params = json.loads(self.rfile.read(length) or b"{}")
+                except json.JSONDecodeError:
+                    return self._send_json(400, {"error": "body must be JSON"})
+                if not params.get("topic") or not params.get("message"):
+                    return self._send_json(400, {"error": "'topic' and 'message' are required"})
+                return self._send_json(201, queue.submit(params))
+
+            job_id, action = self._job_path()
+            if job_id and action == "cancel":
+                return self._cancel(job_id)
+            return self._send_json(404, {"error": "not found"})
+
+        def do_DELETE(self):
+            job_id, action = self._job_path()
+            if job_id and action is None:
+                return self._cancel(job_id)
+            return self._send_json(404, {"error": "not found"})
+
+        def _cancel(self, job_id: str):
+            job = queue.cancel(job_id)
+            if job is None:
+                return self._send_json(404, {"error": "job not found"})
+            return self._send_json(202, job)
+
+        def _stream_events(self, job_id: str):
+            # Server-sent events until the job reaches a terminal status
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+
+            last_id = 0
+            try:
+                while True:
+                    for event in queue.events(job_id, last_id):
+                        last_id = event["id"]
+                        self.wfile.write(f"id: {event['id']}\ndata: {json.dumps(event)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+
+                    job = queue.get(job_id)
+                    if job["status"] in TERMINAL_STATUSES and not queue.events(job_id, last_id):
+                        break
+                    time.sleep(0.5)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def log_message(self, format, *args):
+            pass
+
+    return JobRequestHandler
+
+
+def serve(
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    workers: int = 2,
+    db_path: str = JOBS_DB,
+    tts_backend: str = "elevenlabs",
+    tts_fallback: Optional[str] = None,
+    tts_workers: int = 4,
+    hedge: Optional[HedgePolicy] = None) -> None:
+    """Run the long-lived episode worker: HTTP job API plus a pool of warm workers.
+
+    Args:
+        host (str): Interface to bind. Defaults to "127.0.0.1".
+        port (int): Port to bind. Defaults to 8765.
+        workers (int): Episodes processed concurrently. Defaults to 2.
+        db_path (str): SQLite job queue path. Defaults to data/jobs.db.
+        tts_backend (str): Default TTS backend for jobs that do not choose one.
+        tts_fallback (str, optional): Default TTS fallback backend.
+        tts_workers (int): Concurrent TTS requests per job. Defaults to 4.
+        hedge (HedgePolicy, optional): Hedge slow TTS and LLM requests for every job.
+    """
+    queue = JobQueue(db_path)
+    requeued = queue.requeue_running()
+    if requeued:
+        print(f"Re-queued {requeued} job(s) interrupted by a previous shutdown")
+
+    runner = EpisodeRunner(queue, tts_backend, tts_fallback, tts_workers, hedge)
+    pool = WorkerPool(queue, runner, workers)
+    pool.start()
+
+    httpd = ThreadingHTTPServer((host, port), make_handler(queue))
+    print(f"Serving episode jobs on http://{host}:{port} with {workers} worker(s)")
+    try:
+        httpd.serve_forever()
+    finally:
+        pool.stop()
+        httpd.server_close()
@@ -0,0 +1,206 @@
+import json
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+
+TASKS_DB = os.path.join("data", "tasks.db")
+
+TERMINAL_TASK_STATUSES = {"succeeded", "failed"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    batch TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    worker TEXT,
+    lease_expires_at REAL,
+    created_at REAL NOT NULL,
+    finished_at REAL,
+    error TEXT,
+    result TEXT
+);
+CREATE INDEX IF NOT EXISTS tasks_status_created ON tasks (status, created_at);
+CREATE INDEX IF NOT EXISTS tasks_batch ON tasks (batch);
+"""
+
+
+class TaskQueue:
+    """Lease-based task queue in a SQLite file that several hosts can share.
+
+    A worker leases a task for lease_seconds and must heartbeat to keep it. When
+    a worker dies, its lease expires and the next worker to ask takes the task
+    over, until max_attempts is used up. Completions from a worker that lost its
+    lease are rejected, so every task has exactly one accepted result.
+
+    The database uses the rollback journal instead of WAL because WAL needs
+    shared memory, which network filesystems do not provide.
+    """
+
+    def __init__(self, db_path: str = TASKS_DB):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=60, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=DELETE")
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _row_to_task(row: sqlite3.Row) -> dict:
+        task = dict(row)
+        task["params"] = json.loads(task["params"])
+        task["result"] = json.loads(task["result"]) if task["result"] else None
+        return task
+
+    def submit(self, kind: str, params: dict, batch: Optional[str] = None, max_attempts: int = 3) -> dict:
+        """Queue one task and return it."""
+        return self.submit_many(kind, [params], batch, max_attempts)[0]
+
+    def submit_many(self, kind: str, params_list: list[dict], batch: Optional[str] = None,
+                    max_attempts: int = 3) -> list[dict]:
+        """Queue tasks of one kind under a shared batch id, in order.
+
+        Args:
+            kind (str): Task kind, matching a registered handler (e.g. "tts_segment").
+            params_list (List[dict]): JSON-serializable parameters, one dict per task.
+            batch (str, optional): Batch id to group the tasks under. Defaults to a new id.
+            max_attempts (int): Leases (including expired ones) before a task fails. Defaults to 3.
+
+        Returns:
+            List[dict]: The queued tasks.
+        """
+        batch = batch or uuid.uuid4().hex[:12]
+        now = time.time()
+        task_ids = [uuid.uuid4().hex[:12] for _ in params_list]
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            # Small created_at offsets keep submission order for lease order
+            conn.executemany(
+                "INSERT INTO tasks (id, batch, kind, params, status, max_attempts, created_at) "
+                "VALUES (?, ?, ?, ?, 'queued', ?, ?)",
+                [(task_id, batch, kind, json.dumps(params), max_attempts, now + i * 1e-6)
+                 for i, (task_id, params) in enumerate(zip(task_ids, params_list))]
+            )
+            conn.execute("COMMIT")
+        return [self.get(task_id) for task_id in task_ids]
+
+    def lease(self, worker: str, lease_seconds: float = 60, kinds: Optional[list[str]] = None) -> Optional[dict]:
+        """Atomically take the oldest runnable task: queued, or leased with an expired lease.
+
+        Args:
+            worker (str): Id of the leasing worker.
+            lease_seconds (float): How long the lease lasts without a heartbeat. Defaults to 60.
+            kinds (List[str], optional): Only lease these task kinds. Defaults to any kind.
+
+        Returns:
+            Optional[dict]: The leased task, or None when nothing is runnable.
+        """
+        now = time.time()
+        kind_filter, kind_args = "", []
+        if kinds:
+            kind_filter = f" AND kind IN ({', '.join('?' * len(kinds))})"
+            kind_args = list(kinds)
+
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            # Expired leases with no attempts left fail for good instead of being retried
+            conn.execute(
+                "UPDATE tasks SET status = 'failed', finished_at = ?, "
+                "error = 'Lease of ' || worker || ' expired after ' || attempts || ' attempt(s)' "
+                "WHERE status = 'leased' AND lease_expires_at < ? AND attempts >= max_attempts",
+                (now, now)
+            )
+            row = conn.execute(
+                "SELECT id FROM tasks "
+                "WHERE (status = 'queued' OR (status = 'leased' AND lease_expires_at < ?))"
+                f"{kind_filter} ORDER BY created_at LIMIT 1",
+                [now, *kind_args]
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE tasks SET status = 'leased', worker = ?, lease_expires_at = ?, attempts = attempts + 1, "
+                "error = CASE WHEN status = 'leased' THEN 'Lease of ' || worker || ' expired; retried' ELSE error END "
+                "WHERE id = ?",
+                (worker, now + lease_seconds, row["id"])
+            )
+            conn.execute("COMMIT")
+        return self.get(row["id"])
+
+    def heartbeat(self, task_id: str, worker: str, lease_seconds: float = 60) -> bool:
+        """Extend a lease. Returns False if the worker no longer holds it."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET lease_expires_at = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+                (time.time() + lease_seconds, task_id, worker)
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, task_id: str, worker: str, result: Optional[dict] = None) -> bool:
+        """Record a result. Returns False (and keeps nothing) if the worker lost the lease."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET status = 'succeeded', finished_at = ?, result = ?, lease_expires_at = NULL "
+                "WHERE id = ? AND worker = ? AND status = 'leased'",
+                (time.time(), json.dumps(result) if result is not None else None, task_id, worker)
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, task_id: str, worker: str, error: str) -> Optional[str]:
+        """Release a failed attempt: re-queue it while attempts remain, otherwise fail it.
+
+        Returns:
+            Optional[str]: The new status, or None if the worker no longer held the lease.
+        """
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT attempts, max_attempts FROM tasks WHERE id = ? AND worker = ? AND status = 'leased'",
+                (task_id, worker)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            if row["attempts"] < row["max_attempts"]:
+                status = "queued"
+                conn.execute("UPDATE tasks SET status = 'queued', worker = NULL, lease_expires_at = NULL, error = ? "
+                             "WHERE id = ?", (error, task_id))
+            else:
+                status = "failed"
+                conn.execute("UPDATE tasks SET status = 'failed', finished_at = ?, lease_expires_at = NULL, error = ? "
+                             "WHERE id = ?", (time.time(), error, task_id))
+            conn.execute("COMMIT")
+        return status
+
+    def get(self, task_id: str) -> Optional[dict]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return self._row_to_task(row) if row else None
+
+    def batch_tasks(self, batch: str) -> list[dict]:
+        """All tasks of a batch in submission order."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT * FROM tasks WHERE batch = ? ORDER BY created_at", (batch,)).fetchall()
+        return [self._row_to_task(row) for row in rows]
+
+    def counts(self) -> dict[str, int]:
+        """Number of tasks per status."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) AS n FROM tasks GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
@@ -0,0 +1,90 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+audio_qa = pytest.importorskip("src.audio_conversion.audio_qa")
+
+RATE = 8000
+THRESHOLDS = audio_qa.QAThresholds()
+
+
+def tone(seconds: float, amplitude: float = 0.1) -> np.ndarray:
+    t = np.arange(int(seconds * RATE)) / RATE
+    return (amplitude * 32767 * np.sin(2 * np.pi * 440 * t)).astype(np.int16)
+
+
+def silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(seconds * RATE), dtype=np.int16)
+
+
+def analyze(*parts: np.ndarray) -> "audio_qa.SegmentReport":
+    return audio_qa.analyze_samples(np.concatenate(parts), RATE, THRESHOLDS, "segment.mp3")
+
+
+def kinds(report) -> list[str]:
+    return [issue.kind for issue in report.issues]
+
+
+@pytest.mark.parametrize("mask, starts, ends", [
+    ([False, True, True, False, True], [1, 4], [3, 5]),
+    ([True, True, True], [0], [3]),
+    ([False, False], [], []),
+    ([], [], []),
+])
+def test_runs(mask, starts, ends):
+    run_starts, run_ends = audio_qa._runs(np.array(mask, dtype=bool))
+    assert run_starts.tolist() == starts
+    assert run_ends.tolist() == ends
+
+
+def test_clean_segment():
+    report = analyze(silence(0.5), tone(3.0), silence(0.5))
+    assert report.ok
+    assert report.duration_seconds == 4.0
+    assert report.speech_seconds == pytest.approx(3.0, abs=0.02)
+    assert report.longest_silence_seconds == pytest.approx(0.5, abs=0.02)
+    assert report.rms_dbfs == pytest.approx(-23.0, abs=0.2)
+    assert report.peak_dbfs == pytest.approx(-20.0, abs=0.1)
+    assert report.clip_events == 0
+
+
+def test_internal_and_edge_silences():
+    report = analyze(silence(2.0), tone(1.0), silence(3.0), tone(1.0))
+    issues = [issue for issue in report.issues if issue.kind == "silence"]
+    assert [issue.detail for issue in issues] == ["2.0s leading silence", "3.0s internal silence"]
+    assert (issues[1].start, issues[1].end) == (3.0, 6.0)
+    assert report.longest_silence_seconds == pytest.approx(3.0)
+
+
+def test_short_pauses_pass():
+    assert analyze(tone(1.0), silence(1.9), tone(1.0), silence(1.4)).ok
+
+
+def test_empty_and_silent_segments():
+    assert kinds(audio_qa.analyze_samples(np.zeros(0, dtype=np.int16), RATE, THRESHOLDS)) == ["empty"]
+    report = analyze(silence(1.0))
+    assert report.speech_seconds == 0
+    assert report.issues[-1].detail == "segment is entirely silent"
+
+
+def test_clipping_regions():
+    wave = np.clip(tone(4.0).astype(np.int32) * 15, -32768, 32767).astype(np.int16)
+    report = analyze(wave)
+    assert report.clip_events > THRESHOLDS.max_clip_events_per_minute
+    clipping = [issue for issue in report.issues if issue.kind == "clipping"]
+    assert len(clipping) == 1
+    assert clipping[0].start == 0.0 and clipping[0].end == pytest.approx(4.0, abs=0.11)
+    assert "rms" in kinds(report)
+
+
+def test_isolated_full_scale_samples_are_not_clipping():
+    wave = tone(3.0)
+    wave[::4000] = 32767
+    report = analyze(wave)
+    assert report.clip_events == 0
+    assert report.ok
+
+
+def test_quiet_segment():
+    report = analyze(tone(2.0, amplitude=0.005))
+    assert kinds(report) == ["rms"]
+    assert report.issues[0].detail.startswith("too quiet")
@@ -0,0 +1,32 @@
+import pytest
+
+combine_audio = pytest.importorskip("src.audio_conversion.combine_audio")
+
+
+@pytest.fixture
+def audio_dir(tmp_path):
+    for name in ["subtopic_01.mp3", "subtopic_02.mp3", "combined_episode.mp3", "combined_episode_64k.mp3"]:
+        (tmp_path / name).write_bytes(b"")
+    return tmp_path
+
+
+def test_default_renditions_are_not_segments(audio_dir):
+    assert combine_audio.list_audio_files(str(audio_dir)) == ["subtopic_01.mp3", "subtopic_02.mp3"]
+
+
+def test_recorded_custom_outputs_are_not_segments(audio_dir):
+    (audio_dir / "my_show.mp3").write_bytes(b"")
+    assert "my_show.mp3" in combine_audio.list_audio_files(str(audio_dir))
+
+    combine_audio.record_combined_outputs(str(audio_dir), ["my_show.mp3"])
+    combine_audio.record_combined_outputs(str(audio_dir), [str(audio_dir / "my_show.opus")])
+    assert combine_audio.load_combined_outputs(str(audio_dir)) == {"my_show.mp3", "my_show.opus"}
+    assert combine_audio.list_audio_files(str(audio_dir)) == ["subtopic_01.mp3", "subtopic_02.mp3"]
+    assert combine_audio.is_combined_output(str(audio_dir / "my_show.mp3"))
+    assert not combine_audio.is_combined_output(str(audio_dir / "subtopic_01.mp3"))
+
+
+def test_exclude_and_missing_directory(audio_dir):
+    assert combine_audio.list_audio_files(str(audio_dir), exclude=["subtopic_02.mp3"]) == ["subtopic_01.mp3"]
+    with pytest.raises(FileNotFoundError):
+        combine_audio.list_audio_files(str(audio_dir / "missing"))
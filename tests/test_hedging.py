@@ -0,0 +1,118 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.pipeline import hedging
+from src.pipeline.hedging import HedgeBudget, Hedger, HedgePolicy
+from src.pipeline.metrics import load_stage_metrics
+
+DELAY = 0.1
+
+
+def test_budget_never_lets_the_first_request_hedge():
+    budget = HedgeBudget()
+    budget.count_request()
+    assert not budget.try_spend(0.10)
+
+
+def test_budget_caps_hedges_at_the_fraction():
+    budget = HedgeBudget()
+    granted = 0
+    for _ in range(100):
+        budget.count_request()
+        granted += budget.try_spend(0.10)
+    assert granted == 10
+    assert budget.hedges == 10
+
+
+@pytest.fixture
+def hedger(tmp_path):
+    budget = HedgeBudget()
+    budget.requests = 100
+    hedger = Hedger("test", HedgePolicy(min_samples=5, min_delay_seconds=DELAY), budget,
+                    metrics_file=str(tmp_path / "metrics.jsonl"))
+    hedger.latencies.extend([0.001] * 5)
+    return hedger
+
+
+class FakeRequest:
+    """Attempts run in call order; each behaves as its entry in `behaviours` says."""
+
+    def __init__(self, *behaviours):
+        self.behaviours = list(behaviours)
+        self.events = []
+        self._lock = threading.Lock()
+
+    def __call__(self, cancel: threading.Event):
+        with self._lock:
+            index = len(self.events)
+            self.events.append(cancel)
+        kind, seconds = self.behaviours[index]
+        if kind == "hang":
+            cancel.wait(seconds)
+            return f"attempt {index}"
+        time.sleep(seconds)
+        if kind == "fail":
+            raise ValueError(f"attempt {index} failed")
+        return f"attempt {index}"
+
+
+def test_fast_request_is_not_hedged(hedger):
+    request = FakeRequest(("ok", 0))
+    assert hedger.call(request) == "attempt 0"
+    assert len(request.events) == 1
+    assert hedger.budget.hedges == 0
+
+
+def test_backup_fires_after_the_delay_and_wins(hedger):
+    request = FakeRequest(("hang", 5), ("ok", 0))
+    start = time.perf_counter()
+    assert hedger.call(request) == "attempt 1"
+    assert DELAY <= time.perf_counter() - start < 2
+
+    assert len(request.events) == 2
+    assert request.events[0].is_set()
+    assert not request.events[1].is_set()
+    assert hedger.budget.hedges == 1
+    [record] = load_stage_metrics(hedger.metrics_file, "hedge")
+    assert record["backup_won"] is True
+
+
+def test_primary_can_still_win_after_hedging(hedger):
+    request = FakeRequest(("ok", DELAY * 1.5), ("hang", 5))
+    assert hedger.call(request) == "attempt 0"
+    assert request.events[1].is_set()
+
+
+def test_failed_attempt_loses_to_the_other(hedger):
+    request = FakeRequest(("fail", DELAY * 1.5), ("ok", DELAY))
+    assert hedger.call(request) == "attempt 1"
+
+
+def test_error_propagates_when_both_attempts_fail(hedger):
+    request = FakeRequest(("fail", DELAY * 1.5), ("fail", 0))
+    with pytest.raises(ValueError):
+        hedger.call(request)
+    assert len(request.events) == 2
+
+
+def test_no_history_means_no_hedging(tmp_path):
+    hedger = Hedger("cold", HedgePolicy(min_delay_seconds=DELAY), HedgeBudget(),
+                    metrics_file=str(tmp_path / "metrics.jsonl"))
+    request = FakeRequest(("ok", DELAY * 2))
+    assert hedger.call(request) == "attempt 0"
+    assert len(request.events) == 1
+
+
+def test_waiting_for_a_thread_does_not_count_towards_the_delay(hedger, monkeypatch):
+    pool = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(hedging, "_executor", pool)
+    pool.submit(time.sleep, DELAY * 3)
+
+    request = FakeRequest(("ok", DELAY / 4))
+    assert hedger.call(request) == "attempt 0"
+    assert len(request.events) == 1
+    assert hedger.budget.hedges == 0
+    pool.shutdown()
@@ -0,0 +1,95 @@
+import os
+
+import pytest
+
+from src.audio_conversion.id3_chapters import Chapter, read_chapters, write_chapters
+from src.audio_conversion.mp3_info import scan_mp3
+
+# MPEG1 Layer III, 128 kbps, 44.1 kHz, mono: 417-byte frames
+MPEG1_FRAME = bytes([0xFF, 0xFB, 0x90, 0xC0]) + bytes(413)
+
+CHAPTERS = [
+    Chapter("Introduction", 0, 61_500),
+    Chapter("Dynamic Programming", 61_500, 1_800_250),
+    Chapter("Zusammenfassung – Schlüsse", 1_800_250, 2_400_000),
+    Chapter("总结", 2_400_000, 2_460_000),
+]
+
+
+def tag(version: int, frames: bytes) -> bytes:
+    size = len(frames)
+    return b"ID3" + bytes([version, 0, 0]) + bytes([(size >> 21) & 0x7F, (size >> 14) & 0x7F,
+                                                    (size >> 7) & 0x7F, size & 0x7F]) + frames
+
+
+def title_frame(text: str) -> bytes:
+    body = b"\x00" + text.encode("latin-1")
+    return b"TIT2" + len(body).to_bytes(4, "big") + b"\x00\x00" + body
+
+
+@pytest.fixture
+def mp3(tmp_path):
+    path = tmp_path / "episode.mp3"
+    path.write_bytes(MPEG1_FRAME * 20)
+    return str(path)
+
+
+def test_round_trip_without_existing_tag(mp3):
+    write_chapters(mp3, CHAPTERS, toc_title="Episode")
+    assert read_chapters(mp3) == CHAPTERS
+
+    info = scan_mp3(mp3)
+    assert info.frames == 20
+    assert info.id3_size == os.path.getsize(mp3) - 20 * len(MPEG1_FRAME)
+
+
+def test_rewrite_fits_in_padding_and_replaces_chapters(mp3):
+    write_chapters(mp3, CHAPTERS)
+    size = os.path.getsize(mp3)
+
+    write_chapters(mp3, CHAPTERS[:2])
+    assert os.path.getsize(mp3) == size
+    assert read_chapters(mp3) == CHAPTERS[:2]
+    assert scan_mp3(mp3).frames == 20
+
+
+def test_keeps_other_frames_of_a_v23_tag(mp3):
+    with open(mp3, "rb") as f:
+        audio = f.read()
+    with open(mp3, "wb") as f:
+        f.write(tag(3, title_frame("My Podcast")) + audio)
+
+    write_chapters(mp3, CHAPTERS)
+    with open(mp3, "rb") as f:
+        data = f.read()
+    assert data[3] == 3
+    assert b"My Podcast" in data
+    assert read_chapters(mp3) == CHAPTERS
+    assert data.endswith(audio)
+
+
+def test_round_trip_in_a_v24_tag(mp3):
+    with open(mp3, "rb") as f:
+        audio = f.read()
+    with open(mp3, "wb") as f:
+        f.write(tag(4, bytes(64)) + audio)
+
+    write_chapters(mp3, CHAPTERS)
+    assert read_chapters(mp3) == CHAPTERS
+
+
+def test_no_chapters(mp3):
+    assert read_chapters(mp3) == []
+
+
+def test_rejects_unsupported_tags(mp3):
+    with open(mp3, "rb") as f:
+        audio = f.read()
+    with open(mp3, "wb") as f:
+        f.write(tag(2, bytes(16)) + audio)
+    with pytest.raises(ValueError):
+        write_chapters(mp3, CHAPTERS)
+    with pytest.raises(ValueError):
+        write_chapters(mp3, [Chapter("x", i, i + 1) for i in range(256)])
+    with pytest.raises(FileNotFoundError):
+        write_chapters(mp3 + ".missing", CHAPTERS)
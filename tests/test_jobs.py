@@ -0,0 +1,136 @@
+import json
+import threading
+
+import pytest
+
+from src.pipeline.jobs import JobQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(str(tmp_path / "jobs.db"), workspace_root=str(tmp_path / "jobs"))
+
+
+def stages(queue, job_id):
+    return [event["stage"] for event in queue.events(job_id)]
+
+
+def test_submit_claim_finish(queue, tmp_path):
+    first = queue.submit({"topic": "graphs"})
+    second = queue.submit({"topic": "heaps"})
+    assert first["status"] == "queued"
+    assert first["params"] == {"topic": "graphs"}
+    assert first["workspace"] == str(tmp_path / "jobs" / first["id"])
+
+    claimed = queue.claim()
+    assert claimed["id"] == first["id"] and claimed["status"] == "running"
+    assert queue.claim()["id"] == second["id"]
+    assert queue.claim() is None
+
+    queue.finish(first["id"], "succeeded", result={"episode": "combined_episode.mp3"})
+    done = queue.get(first["id"])
+    assert done["status"] == "succeeded"
+    assert done["result"] == {"episode": "combined_episode.mp3"}
+    assert stages(queue, first["id"]) == ["queued", "succeeded"]
+
+
+def test_concurrent_claims_take_each_job_once(queue):
+    ids = {queue.submit({"n": i})["id"] for i in range(20)}
+    claimed, lock = [], threading.Lock()
+
+    def claim_all():
+        while (job := queue.claim()) is not None:
+            with lock:
+                claimed.append(job["id"])
+
+    threads = [threading.Thread(target=claim_all) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(claimed) == sorted(ids)
+
+
+def test_cancel_queued_job_is_immediate(queue):
+    job = queue.submit({})
+    cancelled = queue.cancel(job["id"])
+    assert cancelled["status"] == "cancelled"
+    assert queue.claim() is None
+    assert stages(queue, job["id"]) == ["queued", "cancel"]
+
+
+def test_cancel_running_job_sets_the_flag(queue):
+    job = queue.submit({})
+    queue.claim()
+    assert not queue.is_cancel_requested(job["id"])
+
+    assert queue.cancel(job["id"])["status"] == "running"
+    assert queue.is_cancel_requested(job["id"])
+    queue.finish(job["id"], "cancelled")
+    assert queue.get(job["id"])["status"] == "cancelled"
+
+
+def test_cancel_finished_or_unknown_job(queue):
+    job = queue.submit({})
+    queue.claim()
+    queue.finish(job["id"], "failed", error="boom")
+    assert queue.cancel(job["id"])["status"] == "failed"
+    assert not queue.is_cancel_requested(job["id"])
+    assert "cancel" not in stages(queue, job["id"])
+    assert queue.cancel("missing") is None
+
+
+def test_events_after_id_and_requeue(queue):
+    job = queue.submit({})
+    queue.claim()
+    queue.add_event(job["id"], "convert", "subtopic_01.mp3 ready")
+    first_id = queue.events(job["id"])[0]["id"]
+    assert [event["message"] for event in queue.events(job["id"], after_id=first_id)] == ["subtopic_01.mp3 ready"]
+
+    assert queue.requeue_running() == 1
+    assert queue.get(job["id"])["status"] == "queued"
+    assert queue.claim()["id"] == job["id"]
+
+
+class CountingBackend:
+    name = "counting"
+    dialogue_voices = ["a", "b"]
+
+    def __init__(self):
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def synthesize(self, text, voice=None):
+        with self._lock:
+            self.calls += 1
+        return b"ID3"
+
+
+class Cancelled(Exception):
+    pass
+
+
+def test_cancelling_from_on_file_ready_skips_remaining_subtopics(tmp_path, monkeypatch):
+    convert_audio = pytest.importorskip("src.audio_conversion.convert_audio")
+    monkeypatch.chdir(tmp_path)
+    text_dir = tmp_path / "text"
+    text_dir.mkdir()
+    files = [f"subtopic_{i:02d}.txt" for i in range(1, 9)]
+    for name in files:
+        (text_dir / name).write_text(f"Text of {name}.", encoding="utf-8")
+    (text_dir / "summary.json").write_text(json.dumps({"topic": "t", "subtopic_files_generated": files}),
+                                           encoding="utf-8")
+
+    ready = []
+
+    def on_file_ready(path):
+        ready.append(path)
+        raise Cancelled()
+
+    backend = CountingBackend()
+    with pytest.raises(Cancelled):
+        convert_audio.convert_all_subtopics(backend=backend, max_workers=1, preprocessor=None,
+                                            text_dir=str(text_dir), audio_dir=str(tmp_path / "audio"),
+                                            on_file_ready=on_file_ready)
+    assert len(ready) == 1
+    assert backend.calls <= 2
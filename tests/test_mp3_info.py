@@ -0,0 +1,93 @@
+import pytest
+
+from src.audio_conversion.mp3_info import format_ms, parse_frame_header, scan_mp3
+
+# MPEG1 Layer III, no CRC, 128 kbps, 44.1 kHz, mono: 417-byte frames
+MPEG1_HEADER = bytes([0xFF, 0xFB, 0x90, 0xC0])
+MPEG1_FRAME = MPEG1_HEADER + bytes(413)
+
+
+def id3v2(body: bytes = b"") -> bytes:
+    size = len(body)
+    return b"ID3\x03\x00\x00" + bytes([(size >> 21) & 0x7F, (size >> 14) & 0x7F, (size >> 7) & 0x7F, size & 0x7F]) + body
+
+
+def info_frame(delay: int, padding: int) -> bytes:
+    # Info tag after the 17-byte mono side info, no optional fields, then the LAME extension
+    frame = bytearray(MPEG1_FRAME)
+    start = 4 + 17
+    frame[start:start + 8] = b"Info" + bytes(4)
+    lame = start + 8
+    frame[lame:lame + 4] = b"LAME"
+    frame[lame + 21:lame + 24] = (delay << 12 | padding).to_bytes(3, "big")
+    return bytes(frame)
+
+
+def write(tmp_path, data: bytes) -> str:
+    path = tmp_path / "episode.mp3"
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_parse_mpeg1_header():
+    header = parse_frame_header(MPEG1_HEADER, 0)
+    assert (header.version, header.sample_rate, header.bitrate_kbps) == (3, 44100, 128)
+    assert (header.channels, header.samples, header.length, header.crc) == (1, 1152, 417, False)
+
+
+def test_parse_padding_bit_and_mpeg2_header():
+    assert parse_frame_header(bytes([0xFF, 0xFB, 0x92, 0x00]), 0).length == 418
+    header = parse_frame_header(bytes([0xFF, 0xF3, 0x80, 0x00]), 0)
+    assert (header.version, header.sample_rate, header.bitrate_kbps) == (2, 22050, 64)
+    assert (header.channels, header.samples, header.length) == (2, 576, 208)
+
+
+@pytest.mark.parametrize("data", [
+    bytes([0xFF, 0xFB, 0x90]),          # truncated
+    bytes([0xFE, 0xFB, 0x90, 0xC0]),    # no frame sync
+    bytes([0xFF, 0xEB, 0x90, 0xC0]),    # reserved version
+    bytes([0xFF, 0xFD, 0x90, 0xC0]),    # Layer II
+    bytes([0xFF, 0xFB, 0xF0, 0xC0]),    # bad bitrate index
+    bytes([0xFF, 0xFB, 0x9C, 0xC0]),    # reserved sample rate
+])
+def test_parse_rejects_non_layer3_headers(data):
+    assert parse_frame_header(data, 0) is None
+
+
+def test_scan_counts_frames_between_tags(tmp_path):
+    id3v1 = b"TAG" + bytes(125)
+    info = scan_mp3(write(tmp_path, id3v2(bytes(20)) + MPEG1_FRAME * 10 + id3v1))
+    assert info.id3_size == 30
+    assert (info.mpeg_version, info.sample_rate, info.channels) == ("1", 44100, 1)
+    assert (info.frames, info.audio_bytes) == (10, 4170)
+    assert info.duration_ms == pytest.approx(10 * 1152 * 1000 / 44100)
+    assert info.bitrate_kbps == pytest.approx(128, rel=0.01)
+
+
+def test_scan_resyncs_after_junk(tmp_path):
+    junk = b"\xff\x00junk\xff\xfb"
+    assert scan_mp3(write(tmp_path, MPEG1_FRAME * 3 + junk + MPEG1_FRAME * 4)).frames == 7
+
+
+def test_scan_drops_truncated_last_frame(tmp_path):
+    assert scan_mp3(write(tmp_path, MPEG1_FRAME * 5 + MPEG1_FRAME[:100])).frames == 5
+
+
+def test_scan_subtracts_encoder_delay_and_padding(tmp_path):
+    info = scan_mp3(write(tmp_path, info_frame(576, 1000) + MPEG1_FRAME * 10))
+    assert info.frames == 10
+    assert (info.encoder_delay, info.encoder_padding) == (576, 1000)
+    assert info.samples == 10 * 1152 - 576 - 1000
+
+
+def test_scan_errors(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        scan_mp3(str(tmp_path / "missing.mp3"))
+    with pytest.raises(ValueError):
+        scan_mp3(write(tmp_path, b""))
+    with pytest.raises(ValueError):
+        scan_mp3(write(tmp_path, b"not audio at all" * 10))
+
+
+def test_format_ms():
+    assert format_ms(3_723_004.4) == "1:02:03.004"
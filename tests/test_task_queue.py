@@ -0,0 +1,99 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from src.pipeline.task_queue import TaskQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return TaskQueue(str(tmp_path / "tasks.db"))
+
+
+def test_late_completion_after_lease_expiry_is_rejected(queue):
+    task = queue.submit("tts_segment", {"text_file": "subtopic_01.txt"})
+
+    first = queue.lease("worker-a", lease_seconds=0.05)
+    assert first["id"] == task["id"] and first["attempts"] == 1
+    assert queue.lease("worker-b", lease_seconds=0.05) is None
+
+    time.sleep(0.1)
+    second = queue.lease("worker-b", lease_seconds=60)
+    assert second["id"] == task["id"] and second["worker"] == "worker-b" and second["attempts"] == 2
+
+    assert not queue.heartbeat(task["id"], "worker-a")
+    assert not queue.complete(task["id"], "worker-a", {"from": "a"})
+    assert queue.complete(task["id"], "worker-b", {"from": "b"})
+
+    done = queue.get(task["id"])
+    assert done["status"] == "succeeded"
+    assert done["result"] == {"from": "b"}
+
+
+def test_expired_lease_without_attempts_left_fails(queue):
+    task = queue.submit("tts_segment", {}, max_attempts=1)
+    queue.lease("worker-a", lease_seconds=0.05)
+    time.sleep(0.1)
+
+    assert queue.lease("worker-b") is None
+    assert queue.get(task["id"])["status"] == "failed"
+
+
+def test_heartbeat_survives_database_errors(queue):
+    distributed = pytest.importorskip("src.pipeline.distributed")
+    task = queue.submit("tts_segment", {})
+    queue.lease("worker-a", lease_seconds=0.3)
+
+    calls = []
+    real_heartbeat = queue.heartbeat
+
+    def flaky_heartbeat(task_id, worker, lease_seconds):
+        calls.append(time.time())
+        if len(calls) == 1:
+            raise sqlite3.OperationalError("database is locked")
+        return real_heartbeat(task_id, worker, lease_seconds)
+
+    queue.heartbeat = flaky_heartbeat
+    worker = distributed.TaskWorker(queue, lease_seconds=0.3)
+    done = threading.Event()
+    beats = threading.Thread(target=worker._heartbeat, args=(task["id"], "worker-a", done))
+    beats.start()
+    time.sleep(0.5)
+    done.set()
+    beats.join()
+
+    assert len(calls) >= 3
+    assert queue.get(task["id"])["lease_expires_at"] > time.time()
+
+
+class FailingBackend:
+    name = "failing"
+    dialogue_voices = ["a", "b"]
+
+    def synthesize(self, text, voice=None):
+        raise RuntimeError("quota exceeded")
+
+
+def test_failed_dialogue_segment_is_retried_not_succeeded(queue, tmp_path, monkeypatch):
+    distributed = pytest.importorskip("src.pipeline.distributed")
+    from src.audio_conversion.tts_backends import TTS_BACKENDS
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setitem(TTS_BACKENDS, "failing", FailingBackend)
+    text_dir, audio_dir = tmp_path / "text", tmp_path / "audio"
+    text_dir.mkdir()
+    (text_dir / "subtopic_01.txt").write_text("HOST: Hello there.\nGUEST: Hi!\n", encoding="utf-8")
+
+    task = queue.submit("tts_segment", {"text_file": "subtopic_01.txt", "text_dir": str(text_dir),
+                                        "audio_dir": str(audio_dir), "dialogue": True,
+                                        "speakers": ["HOST", "GUEST"], "tts_backend": "failing"})
+    worker = distributed.TaskWorker(queue, lease_seconds=60)
+    worker._run_task(queue.lease("worker-a"), "worker-a")
+
+    failed = queue.get(task["id"])
+    assert failed["status"] == "queued"
+    assert "RuntimeError" in failed["error"]
+    assert not (audio_dir / "subtopic_01.mp3").exists()
+    assert worker.completed == 0
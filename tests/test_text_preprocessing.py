@@ -0,0 +1,65 @@
+import pytest
+
+from src.audio_conversion.text_preprocessing import DEFAULT_PREPROCESSOR, ENGLISH_RULES, TextPreprocessor
+
+
+def spoken(text: str) -> str:
+    return DEFAULT_PREPROCESSOR.process(text).text
+
+
+@pytest.mark.parametrize("text", [
+    "Use nums[i] and dp[i-1] here.",
+    "As shown in [citation] and (see above).",
+    "2*3*4 is 24",
+    "call __init__ first",
+    "snake_case_name stays",
+    "10 - 3 = 7",
+    "10-3 = 7 and 5-3+1",
+    "Phone 555-1234",
+    "Dates like 2024-01-15 and 1.5-2 hours",
+    "Use the -> operator",
+    "-> next",
+])
+def test_content_is_left_alone(text):
+    assert spoken(text) == text
+
+
+def test_emphasis_is_stripped():
+    assert spoken("*really* **very** ***big***") == "really very big"
+    assert spoken("a __really important__ point") == "a really important point"
+
+
+def test_known_stage_cues_are_stripped():
+    result = DEFAULT_PREPROCESSOR.process("[laughs] okay (sighs) fine [Music fades out]")
+    assert result.text == "okay fine"
+    assert result.rule_hits["stage_directions"] == 3
+
+
+def test_code_spans_are_protected_and_spoken():
+    result = DEFAULT_PREPROCESSOR.process("Override `__init__` and `*args*` or `nums[i]`.")
+    assert result.text == "Override dunder init and *args* or nums[i]."
+    assert result.rule_hits["emphasis"] == 0
+    assert result.rule_hits["inline_code"] == 3
+
+
+def test_numbers_and_symbols():
+    assert spoken("It cost $5 million, 20% more, over 3-5 years") == \
+        "It cost 5 million dollars, 20 percent more, over 3 to 5 years"
+    assert spoken("Read pages 10-20. Then 1990–2000.") == "Read pages 10 to 20. Then 1990 to 2000."
+    assert spoken("input -> output & more") == "input to output and more"
+    assert spoken("map=>filter") == "map to filter"
+
+
+def test_markdown_and_urls():
+    text = "## Intro\n- see [the docs](https://example.com/a) at https://www.example.org/x\n\n\n\nEnd"
+    assert spoken(text) == "Intro\nsee the docs at example.org\n\nEnd"
+
+
+def test_without_english_rules_keeps_symbols():
+    preprocessor = DEFAULT_PREPROCESSOR.without(ENGLISH_RULES)
+    assert preprocessor.process("**Kosten**: 20% [laughs]").text == "Kosten: 20%"
+
+
+def test_unknown_disabled_rule():
+    with pytest.raises(ValueError):
+        TextPreprocessor(disabled_rules=["nope"])